@@ -10,6 +10,10 @@ from alembic import context
 from app.core.config import settings
 from app.models.video import Video  # Import all models here
 from app.models.qa_history import QAHistory
+from app.models.qa_session import QASession
+from app.models.ingestion_job import IngestionJob
+from app.models.keyword_index import KeywordIndex
+from app.models.transcript import TranscriptBlock
 from app.db.base import Base
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,41 @@
+"""add ingestion jobs
+
+Revision ID: c41d7e2a9f10
+Revises: 3bfe0575dc77
+Create Date: 2025-05-05 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e2a9f10'
+down_revision: Union[str, None] = '3bfe0575dc77'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ingestion_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('video_id', sa.UUID(), nullable=False),
+    sa.Column('stage', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('artifacts', postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default='{}'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ingestion_jobs_video_id', 'ingestion_jobs', ['video_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingestion_jobs_video_id', table_name='ingestion_jobs')
+    op.drop_table('ingestion_jobs')
@@ -0,0 +1,34 @@
+"""add keyword indexes
+
+Revision ID: 5e2b7c9d1a43
+Revises: c41d7e2a9f10
+Create Date: 2025-06-01 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b7c9d1a43'
+down_revision: Union[str, None] = 'c41d7e2a9f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('keyword_indexes',
+    sa.Column('video_id', sa.UUID(), nullable=False),
+    sa.Column('chunk_count', sa.Integer(), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('video_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('keyword_indexes')
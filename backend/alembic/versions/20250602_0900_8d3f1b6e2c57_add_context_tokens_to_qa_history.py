@@ -0,0 +1,26 @@
+"""add context tokens to qa history
+
+Revision ID: 8d3f1b6e2c57
+Revises: 5e2b7c9d1a43
+Create Date: 2025-06-02 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f1b6e2c57'
+down_revision: Union[str, None] = '5e2b7c9d1a43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('qa_history', sa.Column('context_tokens', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('qa_history', 'context_tokens')
@@ -0,0 +1,46 @@
+"""add qa sessions
+
+Revision ID: a7c4e91f3b28
+Revises: 8d3f1b6e2c57
+Create Date: 2025-06-03 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e91f3b28'
+down_revision: Union[str, None] = '8d3f1b6e2c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('qa_sessions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('video_id', sa.UUID(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('turn_count', sa.Integer(), nullable=False),
+    sa.Column('summarized_turns', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_qa_sessions_video_id', 'qa_sessions', ['video_id'], unique=False)
+    op.add_column('qa_history', sa.Column('session_id', sa.UUID(), nullable=True))
+    op.create_index('ix_qa_history_session_id', 'qa_history', ['session_id'], unique=False)
+    op.create_foreign_key(
+        'qa_history_session_id_fkey', 'qa_history', 'qa_sessions', ['session_id'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('qa_history_session_id_fkey', 'qa_history', type_='foreignkey')
+    op.drop_index('ix_qa_history_session_id', table_name='qa_history')
+    op.drop_column('qa_history', 'session_id')
+    op.drop_index('ix_qa_sessions_video_id', table_name='qa_sessions')
+    op.drop_table('qa_sessions')
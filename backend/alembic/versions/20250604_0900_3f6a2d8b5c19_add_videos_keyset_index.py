@@ -0,0 +1,26 @@
+"""add videos keyset index
+
+Revision ID: 3f6a2d8b5c19
+Revises: a7c4e91f3b28
+Create Date: 2025-06-04 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6a2d8b5c19'
+down_revision: Union[str, None] = 'a7c4e91f3b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /videos pages on (created_at, id), newest first
+    op.create_index('ix_videos_created_at_id', 'videos', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_videos_created_at_id', table_name='videos')
@@ -0,0 +1,133 @@
+"""move transcriptions to transcript blocks
+
+Revision ID: b81e5f4a7d02
+Revises: 3f6a2d8b5c19
+Create Date: 2025-06-05 09:00:00.000000+00:00
+
+"""
+import json
+import re
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81e5f4a7d02'
+down_revision: Union[str, None] = '3f6a2d8b5c19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of the app.services.transcript_store format, so later changes there do not alter this migration
+BLOCK_MAX_CHARS = 8000
+SEGMENT_MAX_CHARS = 1000
+BATCH_SIZE = 100
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+blocks_table = sa.table(
+    'transcript_blocks',
+    sa.column('video_id', sa.UUID()),
+    sa.column('block_index', sa.Integer()),
+    sa.column('start', sa.Float()),
+    sa.column('end', sa.Float()),
+    sa.column('char_start', sa.Integer()),
+    sa.column('char_length', sa.Integer()),
+    sa.column('segment_count', sa.Integer()),
+    sa.column('data', sa.LargeBinary()),
+)
+
+
+def _sentences(text):
+    """Untimed pseudo-segments, one per sentence (legacy transcriptions have no timestamps)."""
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        while len(sentence) > SEGMENT_MAX_CHARS:
+            cut = sentence.rfind(" ", 0, SEGMENT_MAX_CHARS)
+            cut = cut if cut > 0 else SEGMENT_MAX_CHARS
+            yield sentence[:cut].strip()
+            sentence = sentence[cut:].strip()
+        if sentence:
+            yield sentence
+
+
+def _blocks(video_id, text):
+    rows, current, char_start, size = [], [], 0, 0
+
+    def flush():
+        data = zlib.compress(
+            json.dumps([[None, None, s] for s in current], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        rows.append({
+            'video_id': video_id, 'block_index': len(rows), 'start': None, 'end': None,
+            'char_start': char_start, 'char_length': size, 'segment_count': len(current), 'data': data,
+        })
+
+    for sentence in _sentences(text):
+        added = len(sentence) + (1 if current else 0)
+        if current and size + added > BLOCK_MAX_CHARS:
+            flush()
+            char_start += size + 1
+            current, size, added = [], 0, len(sentence)
+        current.append(sentence)
+        size += added
+    if current:
+        flush()
+    return rows
+
+
+def upgrade() -> None:
+    op.create_table('transcript_blocks',
+    sa.Column('video_id', sa.UUID(), nullable=False),
+    sa.Column('block_index', sa.Integer(), nullable=False),
+    sa.Column('start', sa.Float(), nullable=True),
+    sa.Column('end', sa.Float(), nullable=True),
+    sa.Column('char_start', sa.Integer(), nullable=False),
+    sa.Column('char_length', sa.Integer(), nullable=False),
+    sa.Column('segment_count', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('video_id', 'block_index')
+    )
+    # Blocks are already zlib-compressed: store them out of line without pglz
+    op.execute("ALTER TABLE transcript_blocks ALTER COLUMN data SET STORAGE EXTERNAL")
+
+    # Backfill, a batch of videos at a time so long transcriptions are never all in memory
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        query = "SELECT id, transcription FROM videos WHERE transcription IS NOT NULL"
+        params = {"limit": BATCH_SIZE}
+        if last_id is not None:
+            query += " AND id > :last_id"
+            params["last_id"] = last_id
+        rows = conn.execute(sa.text(query + " ORDER BY id LIMIT :limit"), params).all()
+        if not rows:
+            break
+        for video_id, transcription in rows:
+            blocks = _blocks(video_id, transcription)
+            if blocks:
+                op.bulk_insert(blocks_table, blocks)
+        last_id = rows[-1][0]
+
+    op.drop_column('videos', 'transcription')
+
+
+def downgrade() -> None:
+    op.add_column('videos', sa.Column('transcription', sa.Text(), nullable=True))
+    conn = op.get_bind()
+    video_ids = conn.execute(sa.text("SELECT DISTINCT video_id FROM transcript_blocks")).scalars().all()
+    for video_id in video_ids:
+        blocks = conn.execute(
+            sa.text("SELECT data FROM transcript_blocks WHERE video_id = :video_id ORDER BY block_index"),
+            {"video_id": video_id},
+        ).scalars().all()
+        text = " ".join(
+            " ".join(row[2] for row in json.loads(zlib.decompress(data).decode("utf-8"))) for data in blocks
+        )
+        conn.execute(
+            sa.text("UPDATE videos SET transcription = :text WHERE id = :video_id"),
+            {"text": text, "video_id": video_id},
+        )
+    op.drop_table('transcript_blocks')
@@ -0,0 +1,45 @@
+"""add qa history index and context refs
+
+Revision ID: c9d2a6f13e47
+Revises: b81e5f4a7d02
+Create Date: 2025-06-06 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d2a6f13e47'
+down_revision: Union[str, None] = 'b81e5f4a7d02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable without default: no table rewrite
+    op.add_column('qa_history', sa.Column('context_refs', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    # Built without blocking writes to qa_history (CONCURRENTLY cannot run inside a transaction)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_qa_history_video_id_created_at',
+            'qa_history',
+            ['video_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_qa_history_video_id_created_at',
+            table_name='qa_history',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('qa_history', 'context_refs')
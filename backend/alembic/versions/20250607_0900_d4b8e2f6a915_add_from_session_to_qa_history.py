@@ -0,0 +1,34 @@
+"""add from_session to qa history
+
+Revision ID: d4b8e2f6a915
+Revises: c9d2a6f13e47
+Create Date: 2025-06-07 09:00:00.000000+00:00
+
+The answer cache warm-up skips follow-up questions, which only make sense
+within their conversation. It used to test session_id IS NULL, but deleting
+a session sets session_id to NULL on its rows. Rows orphaned before this
+migration cannot be told apart any more and stay flagged as sessionless.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8e2f6a915'
+down_revision: Union[str, None] = 'c9d2a6f13e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'qa_history',
+        sa.Column('from_session', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+    op.execute("UPDATE qa_history SET from_session = true WHERE session_id IS NOT NULL")
+
+
+def downgrade() -> None:
+    op.drop_column('qa_history', 'from_session')
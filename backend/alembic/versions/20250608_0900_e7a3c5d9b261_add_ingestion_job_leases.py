@@ -0,0 +1,31 @@
+"""add ingestion job leases
+
+Revision ID: e7a3c5d9b261
+Revises: d4b8e2f6a915
+Create Date: 2025-06-08 09:00:00.000000+00:00
+
+Each API process runs its own ingestion workers. A stage is now claimed
+atomically, and a running job records its worker and a lease that the
+worker renews, so startup recovery only takes over jobs whose worker is gone.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c5d9b261'
+down_revision: Union[str, None] = 'd4b8e2f6a915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ingestion_jobs', sa.Column('claimed_by', sa.String(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ingestion_jobs', 'lease_expires_at')
+    op.drop_column('ingestion_jobs', 'claimed_by')
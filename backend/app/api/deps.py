@@ -0,0 +1,14 @@
+from fastapi import Request
+
+from app.core.resources import AppResources
+from app.services.ingestion_service import IngestionWorkerPool
+
+
+def get_resources(request: Request) -> AppResources:
+    """Shared clients created in the application lifespan"""
+    return request.app.state.resources
+
+
+def get_ingestion_pool(request: Request) -> IngestionWorkerPool:
+    """Ingestion worker pool started in the application lifespan"""
+    return request.app.state.ingestion_pool
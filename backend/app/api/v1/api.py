@@ -1,7 +1,8 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import videos, qa
+from app.api.v1.endpoints import videos, qa, search
 
 api_router = APIRouter()
 
 api_router.include_router(videos.router, prefix="/videos", tags=["videos"])
-api_router.include_router(qa.router, prefix="/qa", tags=["qa"]) 
\ No newline at end of file
+api_router.include_router(qa.router, prefix="/qa", tags=["qa"])
+api_router.include_router(search.router, prefix="/search", tags=["search"]) 
\ No newline at end of file
@@ -1,15 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Optional
 from uuid import UUID
+import json
+import logging
 
+from app.api.deps import get_resources
+from app.core.config import settings
+from app.core.pagination import InvalidCursorError
+from app.core.rate_limit import IntervalRateLimiter
+from app.core.resources import AppResources
 from app.db.base import get_db
-from app.schemas.qa import QuestionCreate, QAResponse, QAHistoryItem
+from app.schemas.qa import (
+    QuestionCreate, QAResponse, QAHistoryItem, QAHistoryPage, QASessionCreate, QASessionResponse, QASessionDetail
+)
 from app.services.qa_service import QAService
+from app.services.vector_store import EmbeddingModelMismatchError
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _reindex_required(e: EmbeddingModelMismatchError) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=(
+            f"La vidéo a été indexée avec le modèle {e.indexed_with} au lieu de {e.configured}, "
+            f"une réindexation est nécessaire"
+        )
+    )
+
+diagnostics_rate_limiter = IntervalRateLimiter(settings.QA_DIAGNOSTICS_MIN_INTERVAL_SECONDS)
+
+
 @router.get("/askeu")
 async def askeu_question(
     db: AsyncSession = Depends(get_db)
@@ -19,18 +43,153 @@ async def askeu_question(
 @router.post("/ask", response_model=QAResponse)
 async def ask_question(
     question: QuestionCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources)
 ):
-    qa_service = QAService(db)
+    qa_service = QAService(db, resources)
     try:
         return await qa_service.ask_question(question)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except EmbeddingModelMismatchError as e:
+        raise _reindex_required(e)
 
-@router.get("/history/{video_id}", response_model=List[QAHistoryItem])
+@router.post("/ask/stream")
+async def ask_question_stream(
+    question: QuestionCreate,
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources)
+):
+    """
+    Variante en streaming de /ask (Server-Sent Events).
+    Événements: `token` ({"content": ...}) au fil de la génération, puis `done`
+    (l'entrée d'historique enregistrée) ou `error`.
+    """
+    qa_service = QAService(db, resources)
+    try:
+        prepared = await qa_service.prepare_question(question)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except EmbeddingModelMismatchError as e:
+        raise _reindex_required(e)
+
+    async def event_stream():
+        try:
+            async for event, payload in qa_service.stream_answer(prepared):
+                if event == "token":
+                    data = json.dumps({"content": payload}, ensure_ascii=False)
+                else:
+                    data = QAResponse.model_validate(payload).model_dump_json()
+                yield f"event: {event}\ndata: {data}\n\n"
+        except Exception as e:
+            logger.error(f"Error while streaming answer: {str(e)}", exc_info=True)
+            data = json.dumps({"detail": "Une erreur inattendue s'est produite"}, ensure_ascii=False)
+            yield f"event: error\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/history/{video_id}", response_model=QAHistoryPage)
 async def get_video_qa_history(
     video_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources)
+):
+    """Historique des questions d'une vidéo, des plus récentes aux plus anciennes, page par page"""
+    qa_service = QAService(db, resources)
+    try:
+        items, next_cursor = await qa_service.get_video_history(video_id, limit=limit, cursor=cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+    return QAHistoryPage(items=items, next_cursor=next_cursor)
+
+@router.post("/sessions", response_model=QASessionResponse, status_code=201)
+async def create_qa_session(
+    session_in: QASessionCreate,
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources)
+):
+    """
+    Démarre une conversation sur une vidéo. Les questions envoyées à /ask ou
+    /ask/stream avec son `session_id` tiennent compte des échanges précédents.
+    """
+    qa_service = QAService(db, resources)
+    try:
+        return await qa_service.create_session(session_in.video_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/sessions/{session_id}", response_model=QASessionDetail)
+async def get_qa_session(
+    session_id: UUID,
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources)
+):
+    """La session, son résumé et ses `limit` derniers échanges"""
+    qa_service = QAService(db, resources)
+    session = await qa_service.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    detail = QASessionDetail.model_validate(session)
+    detail.turns = [QAHistoryItem.model_validate(turn) for turn in await qa_service.get_session_turns(session_id, limit)]
+    return detail
+
+@router.delete("/sessions/{session_id}")
+async def delete_qa_session(
+    session_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources)
+):
+    """Supprime la session; ses échanges restent dans l'historique de la vidéo"""
+    qa_service = QAService(db, resources)
+    if not await qa_service.delete_session(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"status": "success"}
+
+@router.get("/diagnostics/{video_id}")
+async def get_collection_diagnostics(
+    video_id: UUID,
+    limit: int = Query(100, ge=1),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources)
+):
+    """Contenu de la collection ChromaDB d'une vidéo (désactivé par défaut, limité en fréquence)"""
+    if not settings.QA_DIAGNOSTICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not diagnostics_rate_limiter.try_acquire(video_id):
+        retry_after = diagnostics_rate_limiter.retry_after(video_id)
+        raise HTTPException(
+            status_code=429,
+            detail="Trop de requêtes de diagnostic pour cette vidéo",
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
+
+    qa_service = QAService(db, resources)
+    try:
+        dump = await qa_service.dump_collection(
+            video_id,
+            limit=min(limit, settings.QA_DIAGNOSTICS_MAX_PAGE_SIZE),
+            offset=offset
+        )
+    except EmbeddingModelMismatchError as e:
+        raise _reindex_required(e)
+    if dump is None:
+        raise HTTPException(status_code=404, detail="Video not found")
+    return dump
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    resources: AppResources = Depends(get_resources)
 ):
-    qa_service = QAService(db)
-    return await qa_service.get_video_history(video_id) 
\ No newline at end of file
+    """Compteurs des caches du processus courant"""
+    return {
+        "embeddings": resources.embedding_cache.stats() if resources.embedding_cache else None,
+        "answers": resources.answer_cache.stats() if resources.answer_cache else None
+    }
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from app.api.deps import get_resources
+from app.core.resources import AppResources
+from app.db.base import get_db
+from app.schemas.search import SearchRequest, SearchResponse
+from app.services.search_service import SearchService
+from app.services.vector_store import EmbeddingModelMismatchError
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.post("", response_model=SearchResponse)
+async def search_videos(
+    request: SearchRequest,
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources)
+):
+    """
+    Recherche sémantique sur toutes les vidéos, ou sur `video_ids`.
+    Les passages trouvés sont regroupés par vidéo (la plus pertinente en premier),
+    puis triés par ordre chronologique dans chaque vidéo.
+    """
+    try:
+        return await SearchService(db, resources).search(request.query, request.video_ids, request.top_k)
+    except EmbeddingModelMismatchError as e:
+        raise HTTPException(
+            status_code=409,
+            detail=(
+                f"L'index a été construit avec le modèle {e.indexed_with} au lieu de {e.configured}, "
+                f"une réindexation est nécessaire"
+            )
+        )
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict
+from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel
 
+from app.api.deps import get_ingestion_pool, get_resources
+from app.core.pagination import InvalidCursorError
+from app.core.resources import AppResources
 from app.db.base import get_db
-from app.schemas.video import Video, VideoCreate, VideoUpdate
+from app.schemas.video import TranscriptPage, TranscriptSegments, Video, VideoCreate, VideoPage, VideoUpdate
+from app.schemas.ingestion import IngestionJob, VideoIngestionAccepted
 from app.services.video_service import VideoService, VideoProcessingError
+from app.services.ingestion_service import IngestionWorkerPool, get_video_jobs
 from app.services.transcription_service import transcription_service
+from app.services.whisper_pool import TranscriptionBusyError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,22 +33,28 @@ async def transcribe_video(
     """
     Transcrit une vidéo YouTube et retourne la transcription.
     """
-    result, error = await transcription_service.transcribe_youtube_video(request.url)
+    try:
+        result, error = await transcription_service.transcribe_youtube_video(request.url)
+    except TranscriptionBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     
     if error:
         raise HTTPException(status_code=400, detail=error)
     
     return TranscriptionResponse(**result)
 
-@router.post("/", response_model=Video)
+@router.post("/", response_model=VideoIngestionAccepted, status_code=202)
 async def create_video(
     video_in: VideoCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ingestion_pool: IngestionWorkerPool = Depends(get_ingestion_pool),
+    resources: AppResources = Depends(get_resources)
 ):
-    """Crée une nouvelle vidéo"""
+    """Crée une nouvelle vidéo et lance son traitement en arrière-plan"""
     try:
-        video_service = VideoService(db)
-        return await video_service.create_video(video_in)
+        video_service = VideoService(db, ingestion_pool, resources)
+        video, job = await video_service.create_video(video_in)
+        return {**Video.model_validate(video).model_dump(), "job_id": job.id}
     except VideoProcessingError as e:
         logger.error(f"Error creating video: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -65,15 +77,75 @@ async def get_video(
         logger.error(f"Error getting video {video_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Une erreur inattendue s'est produite")
 
+@router.get("/{video_id}/transcript", response_model=TranscriptPage)
+async def get_video_transcript(
+    video_id: UUID,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100_000, ge=1, le=1_000_000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Transcription d'une vidéo, par tranches de `limit` caractères à partir de
+    `offset`. Suivre `next_offset` jusqu'à ce qu'il soit nul pour tout lire.
+    """
+    try:
+        video_service = VideoService(db)
+        return await video_service.get_transcript(video_id, offset=offset, limit=limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting transcript of video {video_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Une erreur inattendue s'est produite")
+
+@router.get("/{video_id}/transcript/segments", response_model=TranscriptSegments)
+async def get_video_transcript_segments(
+    video_id: UUID,
+    start: Optional[float] = Query(None, ge=0),
+    end: Optional[float] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Segments horodatés de la transcription entre `start` et `end` (en
+    secondes), sans charger le reste de la transcription.
+    """
+    if start is not None and end is not None and end < start:
+        raise HTTPException(status_code=400, detail="`end` doit être supérieur ou égal à `start`")
+    try:
+        video_service = VideoService(db)
+        return await video_service.get_transcript_segments(video_id, start=start, end=end)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting transcript segments of video {video_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Une erreur inattendue s'est produite")
+
+@router.get("/{video_id}/jobs", response_model=List[IngestionJob])
+async def get_video_ingestion_jobs(
+    video_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Statut des jobs d'ingestion d'une vidéo, du plus récent au plus ancien"""
+    try:
+        video_service = VideoService(db)
+        await video_service.get_video(video_id)
+        return await get_video_jobs(db, video_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting ingestion jobs for video {video_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Une erreur inattendue s'est produite")
+
 @router.put("/{video_id}", response_model=Video)
 async def update_video(
     video_id: UUID,
     video_in: VideoUpdate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ingestion_pool: IngestionWorkerPool = Depends(get_ingestion_pool),
+    resources: AppResources = Depends(get_resources)
 ):
     """Met à jour une vidéo"""
     try:
-        video_service = VideoService(db)
+        video_service = VideoService(db, ingestion_pool, resources)
         return await video_service.update_video(video_id, video_in)
     except VideoProcessingError as e:
         logger.error(f"Error updating video {video_id}: {str(e)}")
@@ -87,11 +159,12 @@ async def update_video(
 @router.delete("/{video_id}")
 async def delete_video(
     video_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources)
 ):
     """Supprime une vidéo"""
     try:
-        video_service = VideoService(db)
+        video_service = VideoService(db, resources=resources)
         await video_service.delete_video(video_id)
         return {"status": "success"}
     except HTTPException:
@@ -100,16 +173,22 @@ async def delete_video(
         logger.error(f"Error deleting video {video_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Une erreur inattendue s'est produite")
 
-@router.get("/", response_model=List[Video])
+@router.get("/", response_model=VideoPage)
 async def list_videos(
-    skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Liste toutes les vidéos"""
+    """
+    Liste les vidéos, des plus récentes aux plus anciennes, sans leur
+    transcription (voir /videos/{video_id}/transcript). Passer `next_cursor`
+    en `cursor` pour obtenir la page suivante.
+    """
     try:
         video_service = VideoService(db)
-        return await video_service.get_videos(skip=skip, limit=limit)
+        return await video_service.get_videos(limit=limit, cursor=cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
     except Exception as e:
         logger.error(f"Error listing videos: {str(e)}")
         raise HTTPException(status_code=500, detail="Une erreur inattendue s'est produite") 
\ No newline at end of file
@@ -24,6 +24,17 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "videoqa_password"
     POSTGRES_DB: str = "videoqa"
     DATABASE_URL: Optional[str] = None
+    DB_ECHO: bool = False  # Journalise chaque requête SQL (débogage uniquement, indépendant de DEBUG)
+    # Pool de connexions par processus (scripts/bench_db_pool.py pour le dimensionner).
+    # Une question ne garde une connexion que pendant ses requêtes, pas pendant l'appel au LLM:
+    # (DB_POOL_SIZE + DB_MAX_OVERFLOW) x nombre de workers doit rester sous max_connections de PostgreSQL
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10  # Connexions supplémentaires ouvertes lors des pics, fermées ensuite
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0  # Attente maximale d'une connexion libre avant erreur
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Renouvelle les connexions plus anciennes (-1: jamais)
+    DB_POOL_PRE_PING: bool = True  # Vérifie la connexion à la sortie du pool (redémarrage de PostgreSQL)
+    # Requêtes préparées mises en cache par connexion asyncpg (0 derrière PgBouncer en mode transaction)
+    DB_STATEMENT_CACHE_SIZE: int = 100
 
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000"
@@ -34,11 +45,124 @@ class Settings(BaseSettings):
     CHROMA_AUTH_ENABLED: bool = False
     CHROMA_TENANT: str = "videochat"
     CHROMA_DATABASE: str = "videochat_db"
+    # "per_video": une collection par vidéo; "shared": une seule collection filtrée par video_id
+    # (migration: scripts/migrate_to_shared_collection.py)
+    VECTOR_LAYOUT: str = "per_video"
+    SHARED_COLLECTION_NAME: str = "videos"
+    # Index HNSW des collections créées (scripts/rebuild_collections.py pour les collections existantes,
+    # scripts/bench_hnsw.py pour choisir M et ef). Les collections créées avant le passage à cosine restent
+    # en l2 jusqu'à leur reconstruction : la recherche convertit leurs distances à l'échelle cosinus, ce qui
+    # n'est exact que pour des embeddings normalisés (OpenAI). Lancer scripts/rebuild_collections.py après mise à jour.
+    HNSW_SPACE: str = "cosine"  # Les embeddings OpenAI sont prévus pour la similarité cosinus
+    HNSW_M: int = 16
+    HNSW_CONSTRUCTION_EF: int = 100
+    HNSW_SEARCH_EF: int = 100
 
     # OpenAI
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4-turbo-preview"  # Modèle par défaut
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"  # Modèle d'embedding par défaut
+    OPENAI_MAX_CONNECTIONS: int = 20  # Pool HTTP partagé par tous les clients OpenAI
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_BASE_URL: Optional[str] = None  # Ex. http://localhost:8099/v1 pour scripts/fake_embedding_server.py
+
+    # Backend d'embedding: "openai" (API) ou "local" (sentence-transformers sur CPU, dans le processus;
+    # paquet sentence-transformers, requirements-optional.txt)
+    EMBEDDING_BACKEND: str = "openai"
+    LOCAL_EMBEDDING_MODEL: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    LOCAL_EMBEDDING_WORKERS: int = 1  # Processus, chacun avec sa copie du modèle
+    LOCAL_EMBEDDING_THREADS: int = 0  # Threads torch par processus, 0 = cœurs / processus
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 32
+    LOCAL_EMBEDDING_WARMUP: bool = False  # Charge le modèle au démarrage plutôt qu'à la première requête
+
+    # Planification des embeddings (backend openai)
+    EMBEDDING_TOKENS_PER_MINUTE: int = 1_000_000  # Budget TPM du modèle d'embedding
+    EMBEDDING_BATCH_MAX_TOKENS: int = 8000  # Lots regroupés par nombre de tokens
+    EMBEDDING_BATCH_MAX_SIZE: int = 256
+    EMBEDDING_CONCURRENCY: int = 4  # Lots envoyés simultanément
+    EMBEDDING_MAX_RETRIES: int = 5  # Par lot
+    EMBEDDING_RETRY_BACKOFF_SECONDS: float = 1.0  # Doublé à chaque nouvelle tentative
+
+    # Cache d'embeddings, clé (modèle, sha256 du texte)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache.sqlite3"  # Vide = cache mémoire uniquement
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 10000
+
+    # Threads réservés aux appels bloquants sans client async natif
+    BLOCKING_IO_THREADS: int = 8
+
+    # QA
+    RETRIEVAL_MODE: str = "hybrid"  # "vector" ou "hybrid" (vecteurs + BM25, fusion RRF)
+    RETRIEVAL_TOP_K: int = 8  # Chunks candidats pour le contexte, dans la limite de QA_CONTEXT_MAX_TOKENS
+    RETRIEVAL_CANDIDATES: int = 20  # Candidats de chaque source avant fusion (mode hybrid)
+    RETRIEVAL_RRF_K: int = 60  # Constante de la fusion par rang réciproque
+    RETRIEVAL_KEYWORD_WEIGHT: float = 1.0  # Poids du classement BM25 dans la fusion
+    KEYWORD_INDEX_CACHE_VIDEOS: int = 256  # Index BM25 gardés en mémoire
+    KEYWORD_INDEX_BUILD_RETRY_SECONDS: float = 300.0  # Délai avant de relancer la construction d'un index manquant qui a échoué
+    QA_CONTEXT_MAX_TOKENS: int = 2000  # Budget du contexte envoyé au LLM (tokens du modèle OPENAI_MODEL)
+    QA_NEIGHBOUR_WINDOW_SECONDS: float = 0.0  # Ajoute les chunks voisins (en temps) des résultats, 0 = désactivé
+
+    # Sessions de conversation (POST /qa/sessions)
+    QA_SESSION_WINDOW_TURNS: int = 4  # Derniers échanges repris tels quels dans le prompt
+    QA_SESSION_TURN_MAX_TOKENS: int = 400  # Par échange repris (question + réponse)
+    QA_SESSION_SUMMARY_MAX_TOKENS: int = 300  # Résumé glissant des échanges plus anciens
+    QA_SESSION_CACHE_SESSIONS: int = 1000  # Sessions gardées en mémoire
+
+    # Recherche multi-vidéos (POST /search)
+    SEARCH_MAX_RESULTS: int = 50
+    SEARCH_PER_VIDEO_CONCURRENCY: int = 8  # Requêtes simultanées en disposition per_video
+
+    # Cache de réponses par vidéo
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95  # Similarité cosinus minimale entre questions
+    ANSWER_CACHE_MAX_ENTRIES_PER_VIDEO: int = 500
+    ANSWER_CACHE_MAX_VIDEOS: int = 1000  # Vidéos gardées en mémoire (les moins récemment interrogées sortent)
+    ANSWER_CACHE_WARM_ROWS: int = 200  # Historique rechargé au premier accès à une vidéo
+
+    # Diagnostics
+    QA_DIAGNOSTICS_ENABLED: bool = False  # Expose GET /qa/diagnostics/{video_id}
+    QA_DIAGNOSTICS_MIN_INTERVAL_SECONDS: float = 60.0  # Par vidéo
+    QA_DIAGNOSTICS_MAX_PAGE_SIZE: int = 500
+    # Traces des questions (app.services.qa_tracing): étapes, chunks, scores, tokens, en JSONL
+    QA_TRACE_SAMPLE_RATE: float = 0.0  # Part des questions tracées (0 = désactivé, 1 = toutes)
+    QA_TRACE_DIR: str = "data/qa_traces"
+    QA_TRACE_MAX_BYTES: int = 50_000_000  # Taille d'un fichier avant rotation
+    QA_TRACE_BACKUPS: int = 5  # Fichiers pleins conservés; l'espace disque reste borné
+    QA_TRACE_QUEUE_SIZE: int = 1000  # Traces en attente d'écriture; au-delà elles sont abandonnées
+    QA_TRACE_BATCH_SIZE: int = 100
+    QA_TRACE_FLUSH_SECONDS: float = 2.0  # Délai maximal avant l'écriture d'un lot incomplet
+
+    # Transcription
+    TRANSCRIPTION_BACKEND: str = "whisper"  # whisper, faster-whisper (paquet faster-whisper, requirements-optional.txt) ou fake
+    WHISPER_MODEL: str = "base"  # Nom du modèle, pour whisper comme pour faster-whisper
+    TRANSCRIPTION_COMPUTE_TYPE: str = "int8"  # Quantification de faster-whisper
+    TRANSCRIPTION_WORD_TIMESTAMPS: bool = False  # Horodatage mot à mot dans les segments
+    # file : téléchargement d'un WAV complet puis décodage
+    # stream : ffmpeg décode le flux une seule fois en PCM 16 kHz, sans fichier temporaire. Pas encore couvert
+    # par les tests de bout en bout : à activer explicitement (scripts/bench_audio_pipeline.py pour comparer)
+    TRANSCRIPTION_AUDIO_MODE: str = "file"
+    TRANSCRIPTION_LONG_AUDIO_THRESHOLD_SECONDS: float = 600.0  # Au-delà, découpage en fenêtres parallèles (0 = jamais)
+    TRANSCRIPTION_WINDOW_SECONDS: float = 300.0  # Aussi la taille des fenêtres en mode stream
+    TRANSCRIPTION_WINDOW_OVERLAP_SECONDS: float = 5.0
+    TRANSCRIPTION_SILENCE_SEARCH_SECONDS: float = 10.0  # Recule chaque coupure vers le silence le plus proche
+    TRANSCRIPTION_WORKERS: int = 2  # Processus du pool Whisper, chacun avec son modèle (0 = nombre de cœurs)
+    TRANSCRIPTION_THREADS_PER_WORKER: int = 0  # Threads de calcul par processus (0 = cœurs / processus)
+    TRANSCRIPTION_MAX_CONCURRENT_JOBS: int = 2  # Transcriptions simultanées
+    TRANSCRIPTION_ADMISSION_QUEUE_SIZE: int = 8  # Transcriptions en attente avant rejet
+    TRANSCRIPTION_ADMISSION_TIMEOUT_SECONDS: float = 600.0  # Attente maximale d'une place
+    TRANSCRIPTION_WARMUP: bool = False  # Charge les modèles au démarrage plutôt qu'au premier usage
+
+    # Ingestion jobs
+    INGESTION_QUEUE_BACKEND: str = "memory"  # Seul backend disponible pour l'instant
+    INGESTION_DOWNLOAD_CONCURRENCY: int = 2
+    INGESTION_TRANSCRIBE_CONCURRENCY: int = 1
+    INGESTION_INDEX_CONCURRENCY: int = 4
+    INGESTION_MAX_ATTEMPTS: int = 3  # Tentatives par étape
+    INGESTION_RETRY_BACKOFF_SECONDS: float = 5.0  # Doublé à chaque nouvelle tentative
+    # Bail d'un job en cours, renouvelé par son processus: au démarrage, un autre worker uvicorn
+    # ne reprend que les jobs dont le bail a expiré
+    INGESTION_LEASE_SECONDS: float = 60.0
 
     class Config:
         case_sensitive = True
@@ -0,0 +1,24 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor that was not produced by encode_cursor."""
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Opaque keyset cursor: position of a row in (created_at, id) order."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,38 @@
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class IntervalRateLimiter:
+    """
+    Allows one call per key every `min_interval` seconds (process-local).
+    Keys are kept in call order, so the ones whose interval has elapsed are
+    pruned from the front on each acquire and only recently seen keys stay.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._last_call: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def retry_after(self, key: Hashable) -> float:
+        """Seconds to wait before `key` is allowed again, 0 if allowed now."""
+        last = self._last_call.get(key)
+        if last is None:
+            return 0.0
+        return max(0.0, self.min_interval - (time.monotonic() - last))
+
+    def _prune(self, now: float) -> None:
+        while self._last_call:
+            key, last = next(iter(self._last_call.items()))
+            if now - last < self.min_interval:
+                return
+            del self._last_call[key]
+
+    def try_acquire(self, key: Hashable) -> bool:
+        now = time.monotonic()
+        self._prune(now)
+        if self.retry_after(key) > 0:
+            return False
+        self._last_call[key] = now
+        self._last_call.move_to_end(key)
+        return True
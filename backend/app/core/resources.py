@@ -0,0 +1,228 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Union
+
+import httpx
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.language_models import BaseChatModel
+from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.services.answer_cache import AnswerCache
+from app.services.chunking import SegmentChunker
+from app.services.context_builder import ContextBuilder
+from app.services.embedding_cache import CachedEmbeddings, DiskEmbeddingStore, EmbeddingCache
+from app.services.embedding_scheduler import EmbeddingScheduler
+from app.services.embeddings import AsyncEmbeddings
+from app.services.keyword_index import KeywordIndexCache
+from app.services.local_embeddings import LocalEmbeddings
+from app.services.qa_sessions import ConversationMemory, SessionMemoryCache
+from app.services.qa_tracing import JsonlTraceSink, QATracer
+from app.services.retriever import Retriever
+from app.services.tokens import TokenCounter
+from app.services.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+class AppResources:
+    """
+    Process-wide clients shared by every request.
+
+    Built once in the application lifespan and injected through FastAPI
+    dependencies, so requests reuse the same HTTP connection pools instead of
+    paying for new clients, TLS handshakes and tokenizer loads each time.
+    """
+
+    def __init__(
+        self,
+        embeddings: Union[AsyncEmbeddings, EmbeddingScheduler, LocalEmbeddings, CachedEmbeddings],
+        llm: BaseChatModel,
+        text_splitter: RecursiveCharacterTextSplitter,
+        vector_store: VectorStore,
+        segment_chunker: Optional[SegmentChunker] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        answer_cache: Optional[AnswerCache] = None,
+        local_embeddings: Optional[LocalEmbeddings] = None,
+        retriever: Optional[Retriever] = None,
+        keyword_indexes: Optional[KeywordIndexCache] = None,
+        context_builder: Optional[ContextBuilder] = None,
+        session_memory: Optional[SessionMemoryCache] = None,
+        conversation: Optional[ConversationMemory] = None,
+        tracer: Optional[QATracer] = None,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ):
+        self.embeddings = embeddings
+        self.llm = llm
+        self.text_splitter = text_splitter
+        self.vector_store = vector_store
+        self.segment_chunker = segment_chunker or SegmentChunker(chunk_size=1000, chunk_overlap=200)
+        self.executor = executor
+        self._http_client = http_client
+        self._http_async_client = http_async_client
+        self.embedding_cache = embedding_cache
+        self.answer_cache = answer_cache
+        self.local_embeddings = local_embeddings
+        self.retriever = retriever or Retriever()
+        self.keyword_indexes = keyword_indexes or KeywordIndexCache(256)
+        self.context_builder = context_builder or ContextBuilder(
+            settings.QA_CONTEXT_MAX_TOKENS, TokenCounter(settings.OPENAI_MODEL)
+        )
+        self.session_memory = session_memory or SessionMemoryCache(1000)
+        self.conversation = conversation or ConversationMemory(llm, self.context_builder.counter)
+        self.tracer = tracer
+        # Sessions for background work that outlives the request that started it
+        self.session_factory = session_factory
+
+    @classmethod
+    async def create(cls) -> "AppResources":
+        limits = httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        )
+        timeout = httpx.Timeout(settings.OPENAI_TIMEOUT_SECONDS)
+        http_client = httpx.Client(limits=limits, timeout=timeout)
+        http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+        # Bounded pool for blocking calls that have no native async client
+        executor = ThreadPoolExecutor(
+            max_workers=settings.BLOCKING_IO_THREADS,
+            thread_name_prefix="blocking-io"
+        )
+
+        local_embeddings = None
+        embeddings: Union[EmbeddingScheduler, LocalEmbeddings, CachedEmbeddings]
+        if settings.EMBEDDING_BACKEND == "local":
+            local_embeddings = LocalEmbeddings(
+                settings.LOCAL_EMBEDDING_MODEL,
+                workers=settings.LOCAL_EMBEDDING_WORKERS,
+                threads=settings.LOCAL_EMBEDDING_THREADS,
+                batch_size=settings.LOCAL_EMBEDDING_BATCH_SIZE,
+            )
+            if settings.LOCAL_EMBEDDING_WARMUP:
+                await local_embeddings.warmup()
+            embeddings = local_embeddings
+        elif settings.EMBEDDING_BACKEND == "openai":
+            embeddings = EmbeddingScheduler(
+                AsyncEmbeddings(
+                    OpenAIEmbeddings(
+                        model=settings.OPENAI_EMBEDDING_MODEL,
+                        openai_api_key=settings.OPENAI_API_KEY,
+                        base_url=settings.OPENAI_BASE_URL,
+                        chunk_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                        # Retries are handled by the scheduler, per batch and per query
+                        max_retries=0,
+                        http_client=http_client,
+                        http_async_client=http_async_client,
+                    ),
+                    executor
+                ),
+                tokens_per_minute=settings.EMBEDDING_TOKENS_PER_MINUTE,
+                max_batch_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS,
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                concurrency=settings.EMBEDDING_CONCURRENCY,
+                max_retries=settings.EMBEDDING_MAX_RETRIES,
+                retry_backoff=settings.EMBEDDING_RETRY_BACKOFF_SECONDS,
+            )
+        else:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {settings.EMBEDDING_BACKEND}")
+
+        embedding_cache = None
+        if settings.EMBEDDING_CACHE_ENABLED:
+            disk = DiskEmbeddingStore(settings.EMBEDDING_CACHE_PATH) if settings.EMBEDDING_CACHE_PATH else None
+            embedding_cache = EmbeddingCache(settings.EMBEDDING_CACHE_MEMORY_ITEMS, disk, executor)
+            embeddings = CachedEmbeddings(embeddings, embedding_cache)
+
+        answer_cache = None
+        if settings.ANSWER_CACHE_ENABLED:
+            answer_cache = AnswerCache(
+                settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+                settings.ANSWER_CACHE_MAX_ENTRIES_PER_VIDEO,
+                settings.ANSWER_CACHE_MAX_VIDEOS,
+            )
+
+        llm = ChatOpenAI(
+            temperature=0,
+            model=settings.OPENAI_MODEL,
+            openai_api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=200,
+            length_function=len,
+            separators=["\n\n", "\n", " ", ""]
+        )
+        vector_store = await VectorStore.connect()
+        retriever = Retriever(
+            settings.RETRIEVAL_MODE,
+            top_k=settings.RETRIEVAL_TOP_K,
+            candidates=settings.RETRIEVAL_CANDIDATES,
+            rrf_k=settings.RETRIEVAL_RRF_K,
+            keyword_weight=settings.RETRIEVAL_KEYWORD_WEIGHT,
+        )
+
+        # Prompt-side token counts (context budget, conversation memory)
+        token_counter = TokenCounter(settings.OPENAI_MODEL)
+
+        tracer = None
+        if settings.QA_TRACE_SAMPLE_RATE > 0:
+            tracer = QATracer(
+                JsonlTraceSink(settings.QA_TRACE_DIR, settings.QA_TRACE_MAX_BYTES, settings.QA_TRACE_BACKUPS),
+                settings.QA_TRACE_SAMPLE_RATE,
+                token_counter,
+                queue_size=settings.QA_TRACE_QUEUE_SIZE,
+                batch_size=settings.QA_TRACE_BATCH_SIZE,
+                flush_interval=settings.QA_TRACE_FLUSH_SECONDS,
+            )
+            tracer.start()
+
+        logger.info("Application resources initialized")
+        return cls(
+            embeddings,
+            llm,
+            text_splitter,
+            vector_store,
+            executor=executor,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            embedding_cache=embedding_cache,
+            answer_cache=answer_cache,
+            local_embeddings=local_embeddings,
+            retriever=retriever,
+            keyword_indexes=KeywordIndexCache(
+                settings.KEYWORD_INDEX_CACHE_VIDEOS, settings.KEYWORD_INDEX_BUILD_RETRY_SECONDS
+            ),
+            context_builder=ContextBuilder(settings.QA_CONTEXT_MAX_TOKENS, token_counter),
+            session_memory=SessionMemoryCache(settings.QA_SESSION_CACHE_SESSIONS),
+            conversation=ConversationMemory(
+                llm,
+                token_counter,
+                window_turns=settings.QA_SESSION_WINDOW_TURNS,
+                summary_max_tokens=settings.QA_SESSION_SUMMARY_MAX_TOKENS,
+                turn_max_tokens=settings.QA_SESSION_TURN_MAX_TOKENS,
+            ),
+            tracer=tracer,
+        )
+
+    async def aclose(self) -> None:
+        if self.tracer is not None:
+            await self.tracer.stop()
+        if self._http_async_client is not None:
+            await self._http_async_client.aclose()
+        if self._http_client is not None:
+            self._http_client.close()
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.local_embeddings is not None:
+            self.local_embeddings.shutdown()
+        logger.info("Application resources closed")
@@ -1,27 +1,36 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
 from app.core.config import settings
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from sqlalchemy.ext.declarative import declarative_base
+
+
+def build_engine(url: Optional[str] = None, **overrides: Any) -> AsyncEngine:
+    """Async engine with the pool configured from the settings; `overrides` replace engine arguments."""
+    options = {
+        "echo": settings.DB_ECHO,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            # SQLAlchemy's prepared statement cache and asyncpg's own
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    }
+    options.update(overrides)
+    return create_async_engine(url or settings.DATABASE_URL, **options)
+
 
 # SQLAlchemy
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+engine = build_engine()
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 Base = declarative_base()
 
-def get_chroma_client():
-    return chromadb.HttpClient(
-        host=settings.CHROMA_HOST,
-        port=settings.CHROMA_PORT,
-        settings=ChromaSettings(
-            allow_reset=True,
-            anonymized_telemetry=False
-        )
-    )
-
 # Dependency
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -29,5 +38,3 @@ async def get_db():
             yield session
         finally:
             await session.close()
-
-chroma_client = settings.get_chroma_client() 
\ No newline at end of file
@@ -1,20 +0,0 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
-
-# Créer le moteur SQLAlchemy
-engine = create_engine(
-    settings.DATABASE_URL.replace("postgresql+asyncpg", "postgresql"),
-    pool_pre_ping=True
-)
-
-# Créer une classe de session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Fonction utilitaire pour obtenir une session de base de données
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close() 
\ No newline at end of file
@@ -1,12 +1,33 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.resources import AppResources
 from app.api.v1.api import api_router
+from app.db.base import engine
+from app.services.ingestion_service import IngestionWorkerPool, create_job_queue
+from app.services.transcription_service import transcription_service
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    resources = await AppResources.create()
+    if settings.TRANSCRIPTION_WARMUP:
+        await transcription_service.warmup()
+    app.state.resources = resources
+    ingestion_pool = IngestionWorkerPool(create_job_queue(settings.INGESTION_QUEUE_BACKEND), resources)
+    await ingestion_pool.start()
+    app.state.ingestion_pool = ingestion_pool
+    yield
+    await ingestion_pool.stop()
+    await resources.aclose()
+    await engine.dispose()
+    transcription_service.shutdown()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Text, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import uuid
+from app.db.base import Base
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id", ondelete="CASCADE"), nullable=False, index=True)
+    stage = Column(String, nullable=False)  # download | transcribe | index
+    status = Column(String, nullable=False)  # pending | running | retrying | completed | failed
+    attempts = Column(Integer, nullable=False, default=0)  # attempts for the current stage
+    error = Column(Text, nullable=True)
+    artifacts = Column(JSONB, nullable=False, default=dict)  # outputs handed from one stage to the next
+    claimed_by = Column(String, nullable=True)  # worker (host:pid:id) running the current stage
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # renewed while the stage runs
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
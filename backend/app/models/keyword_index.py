@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.db.base import Base
+
+class KeywordIndex(Base):
+    """BM25 inverted index of a video's chunks, rebuilt each time the video is indexed"""
+    __tablename__ = "keyword_indexes"
+
+    video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+    chunk_count = Column(Integer, nullable=False)
+    data = Column(JSONB, nullable=False)  # BM25Index.to_dict()
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
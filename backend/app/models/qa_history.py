@@ -1,14 +1,22 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, Column, String, Integer, ForeignKey, DateTime, Index, func, false
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 import uuid
 from app.db.base import Base
 
 class QAHistory(Base):
     __tablename__ = "qa_history"
+    __table_args__ = (
+        Index("ix_qa_history_video_id_created_at", "video_id", "created_at"),  # history pages, cache warm-up
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id", ondelete="CASCADE"), nullable=False)
+    session_id = Column(UUID(as_uuid=True), ForeignKey("qa_sessions.id", ondelete="SET NULL"), nullable=True, index=True)
+    # Asked within a session; kept when the session is deleted (session_id is then set to NULL)
+    from_session = Column(Boolean, nullable=False, default=False, server_default=false())
     question = Column(String, nullable=False)
     answer = Column(String, nullable=False)
-    context = Column(String, nullable=True)
+    context = Column(String, nullable=True)  # Legacy rows only, see context_refs
+    context_refs = Column(JSONB, nullable=True)  # {"mode": ..., "chunks": [[chunk_id, score], ...]}
+    context_tokens = Column(Integer, nullable=True)  # Prompt context size; null when served from cache
     created_at = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
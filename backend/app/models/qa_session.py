@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from app.db.base import Base
+
+class QASession(Base):
+    """Conversation about one video; its turns are the qa_history rows pointing to it"""
+    __tablename__ = "qa_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id", ondelete="CASCADE"), nullable=False, index=True)
+    summary = Column(Text, nullable=True)  # rolling summary of the turns older than the memory window
+    turn_count = Column(Integer, nullable=False, default=0)
+    summarized_turns = Column(Integer, nullable=False, default=0)  # first turns folded into `summary`
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
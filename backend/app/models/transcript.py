@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+class TranscriptBlock(Base):
+    """Ordered transcript segments of a video, stored by blocks of compressed JSON (see transcript_store)"""
+    __tablename__ = "transcript_blocks"
+
+    video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+    block_index = Column(Integer, primary_key=True)
+    start = Column(Float, nullable=True)  # seconds, null for untimed (edited or legacy) transcriptions
+    end = Column(Float, nullable=True)
+    char_start = Column(Integer, nullable=False)  # offset of the block's text in the full transcription
+    char_length = Column(Integer, nullable=False)
+    segment_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed JSON [[start, end, text], ...]
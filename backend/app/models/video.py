@@ -1,10 +1,13 @@
-from sqlalchemy import Column, String, Integer, DateTime, func, Text
+from sqlalchemy import Column, String, Integer, DateTime, Index, func, Text
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from app.db.base import Base
 
 class Video(Base):
     __tablename__ = "videos"
+    __table_args__ = (
+        Index("ix_videos_created_at_id", "created_at", "id"),  # keyset pagination of GET /videos
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     url = Column(String, nullable=False)
@@ -13,6 +16,6 @@ class Video(Base):
     duration = Column(Integer, nullable=True)  # in seconds
     status = Column(String, nullable=False)
     chroma_collection_id = Column(String, nullable=False)
-    transcription = Column(Text, nullable=True)  # New field for storing transcription
+    # The transcription lives in transcript_blocks (app.services.transcript_store)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now()) 
\ No newline at end of file
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+from uuid import UUID
+
+from app.schemas.video import Video
+
+class IngestionJob(BaseModel):
+    id: UUID
+    video_id: UUID
+    stage: str
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    artifacts: Dict[str, Any] = {}
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class VideoIngestionAccepted(Video):
+    """Video returned by POST /videos, along with the ingestion job processing it."""
+    job_id: UUID
@@ -1,18 +1,22 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 from uuid import UUID
 
 class QuestionCreate(BaseModel):
     video_id: UUID
     question: str
+    session_id: Optional[UUID] = None  # Conversation to continue (POST /qa/sessions)
 
 class QAResponse(BaseModel):
     id: UUID
     video_id: UUID
+    session_id: Optional[UUID] = None
     question: str
     answer: str
-    context: Optional[str] = None
+    context: Optional[str] = None  # Texte du contexte, uniquement pour les entrées antérieures à context_refs
+    context_refs: Optional[Dict[str, Any]] = None  # {"mode": ..., "chunks": [[chunk_id, score], ...]}
+    context_tokens: Optional[int] = None
     created_at: datetime
 
     class Config:
@@ -21,6 +25,28 @@ class QAResponse(BaseModel):
 class QAHistoryItem(QAResponse):
     pass
 
+class QAHistoryPage(BaseModel):
+    items: List[QAHistoryItem]
+    next_cursor: Optional[str] = None  # À passer en `cursor` pour la page suivante, None = dernière page
+
+class QASessionCreate(BaseModel):
+    video_id: UUID
+
+class QASessionResponse(BaseModel):
+    id: UUID
+    video_id: UUID
+    summary: Optional[str] = None
+    turn_count: int
+    summarized_turns: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class QASessionDetail(QASessionResponse):
+    turns: List[QAHistoryItem] = []  # Most recent turns, oldest first
+
 class QuestionRequest(BaseModel):
     question: str
 
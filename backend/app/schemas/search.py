@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from uuid import UUID
+
+class SearchRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    video_ids: Optional[List[UUID]] = None  # None = toute la bibliothèque
+    top_k: int = Field(10, ge=1)
+
+class SearchHit(BaseModel):
+    chunk_id: str
+    text: str
+    distance: float
+    start: Optional[float] = None
+    end: Optional[float] = None
+    timestamp: Optional[str] = None  # "mm:ss" du début du passage
+
+class VideoSearchResult(BaseModel):
+    video_id: UUID
+    title: Optional[str] = None
+    best_distance: float
+    hits: List[SearchHit]  # Par ordre chronologique dans la vidéo
+
+class SearchResponse(BaseModel):
+    query: str
+    total_hits: int
+    results: List[VideoSearchResult]  # Vidéo la plus pertinente en premier
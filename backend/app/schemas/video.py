@@ -1,5 +1,5 @@
-from pydantic import BaseModel, HttpUrl
-from typing import Optional
+from pydantic import BaseModel
+from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
 
@@ -7,13 +7,16 @@ class VideoBase(BaseModel):
     title: str
     url: str
     description: Optional[str] = None
-    transcription: Optional[str] = None
 
 class VideoCreate(VideoBase):
-    pass
+    transcription: Optional[str] = None
 
-class VideoUpdate(VideoBase):
-    pass
+class VideoUpdate(BaseModel):
+    """Partial update: only the fields sent are changed"""
+    title: Optional[str] = None
+    url: Optional[str] = None  # Une nouvelle URL relance l'ingestion complète de la vidéo
+    description: Optional[str] = None
+    transcription: Optional[str] = None  # Remplace la transcription (sans horodatage) et réindexe la vidéo
 
 class VideoInDB(VideoBase):
     id: UUID
@@ -26,4 +29,42 @@ class VideoInDB(VideoBase):
         from_attributes = True
 
 class Video(VideoInDB):
-    pass 
\ No newline at end of file
+    pass 
+
+class VideoSummary(BaseModel):
+    """Video without its transcription, for listings"""
+    id: UUID
+    title: Optional[str] = None
+    url: str
+    description: Optional[str] = None
+    duration: Optional[int] = None
+    status: str
+    has_transcription: bool = False
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class VideoPage(BaseModel):
+    items: List[VideoSummary]
+    next_cursor: Optional[str] = None  # À passer en `cursor` pour la page suivante, None = dernière page
+
+class TranscriptPage(BaseModel):
+    video_id: UUID
+    offset: int  # En caractères
+    length: int
+    total_length: int
+    text: str
+    next_offset: Optional[int] = None  # None = fin de la transcription
+
+class TranscriptSegment(BaseModel):
+    start: float  # En secondes
+    end: float
+    text: str
+
+class TranscriptSegments(BaseModel):
+    video_id: UUID
+    start: Optional[float] = None
+    end: Optional[float] = None
+    segments: List[TranscriptSegment]  # Segments horodatés recoupant [start, end], dans l'ordre
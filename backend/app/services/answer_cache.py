@@ -0,0 +1,158 @@
+import logging
+import re
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_question(question: str) -> str:
+    """Case, accent-compatibility, whitespace and trailing punctuation insensitive form."""
+    text = unicodedata.normalize("NFKC", question).lower().strip()
+    text = re.sub(r"\s+", " ", text)
+    return text.rstrip(" ?!.")
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    answer: str
+    context_refs: Optional[Dict[str, Any]]  # chunks the answer was generated from (see QAHistory.context_refs)
+    embedding: np.ndarray  # normalized to unit length
+
+
+class _VideoEntries:
+    """Cached answers of one video, tied to the video version they were computed for."""
+
+    def __init__(self, version: Any):
+        self.version = version
+        self.by_question: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_entries: List[CachedAnswer] = []
+
+    def matrix(self) -> Tuple[np.ndarray, List[CachedAnswer]]:
+        if self._matrix is None:
+            self._matrix_entries = list(self.by_question.values())
+            self._matrix = np.stack([entry.embedding for entry in self._matrix_entries])
+        return self._matrix, self._matrix_entries
+
+    def invalidate_matrix(self) -> None:
+        self._matrix = None
+        self._matrix_entries = []
+
+
+class AnswerCache:
+    """
+    Per-video answer cache with two tiers:
+    - exact: same normalized question text
+    - similar: previous question whose embedding cosine similarity is above the threshold
+
+    Entries are tagged with the video version (its updated_at) and dropped as
+    soon as the video changes, in this process or any other, and explicitly
+    when the video is re-indexed or deleted. Only the `max_videos` most
+    recently asked about videos are kept.
+    """
+
+    def __init__(self, similarity_threshold: float, max_entries_per_video: int, max_videos: int = 1000):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_video = max_entries_per_video
+        self.max_videos = max_videos
+        self._videos: "OrderedDict[UUID, _VideoEntries]" = OrderedDict()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def is_warm(self, video_id: UUID, version: Any) -> bool:
+        entries = self._videos.get(video_id)
+        return entries is not None and entries.version == version
+
+    def _entries(self, video_id: UUID, version: Any) -> _VideoEntries:
+        entries = self._videos.get(video_id)
+        if entries is None or entries.version != version:
+            if entries is not None:
+                self.invalidations += 1
+            entries = _VideoEntries(version)
+            self._videos[video_id] = entries
+        self._videos.move_to_end(video_id)
+        while len(self._videos) > self.max_videos:
+            self._videos.popitem(last=False)
+        return entries
+
+    def lookup_exact(self, video_id: UUID, version: Any, question: str) -> Optional[CachedAnswer]:
+        entries = self._entries(video_id, version)
+        hit = entries.by_question.get(normalize_question(question))
+        if hit is not None:
+            self.exact_hits += 1
+        return hit
+
+    def lookup_similar(
+        self, video_id: UUID, version: Any, embedding: List[float]
+    ) -> Optional[Tuple[CachedAnswer, float]]:
+        entries = self._entries(video_id, version)
+        if not entries.by_question:
+            self.misses += 1
+            return None
+
+        matrix, candidates = entries.matrix()
+        scores = matrix @ _unit(embedding)
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score >= self.similarity_threshold:
+            self.similar_hits += 1
+            return candidates[best], score
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        video_id: UUID,
+        version: Any,
+        question: str,
+        embedding: List[float],
+        answer: str,
+        context_refs: Optional[Dict[str, Any]]
+    ) -> None:
+        entries = self._entries(video_id, version)
+        key = normalize_question(question)
+        entries.by_question[key] = CachedAnswer(question, answer, context_refs, _unit(embedding))
+        entries.by_question.move_to_end(key)
+        while len(entries.by_question) > self.max_entries_per_video:
+            entries.by_question.popitem(last=False)
+        entries.invalidate_matrix()
+
+    def warm(
+        self, video_id: UUID, version: Any, items: List[Tuple[str, List[float], str, Optional[Dict[str, Any]]]]
+    ) -> None:
+        """Seed a video's entries from (question, embedding, answer, context_refs) tuples, oldest first."""
+        self._entries(video_id, version)
+        for question, embedding, answer, context_refs in items:
+            self.store(video_id, version, question, embedding, answer, context_refs)
+
+    def invalidate(self, video_id: UUID) -> None:
+        if self._videos.pop(video_id, None) is not None:
+            self.invalidations += 1
+            logger.info(f"Answer cache invalidated for video {video_id}")
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "videos": len(self._videos),
+            "entries": sum(len(entries.by_question) for entries in self._videos.values()),
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.exact_hits + self.similar_hits) / lookups if lookups else 0.0,
+        }
+
+
+def _unit(vector: List[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
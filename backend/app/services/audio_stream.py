@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, Optional
+
+import numpy as np
+
+from app.services.transcription_engines import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# ffmpeg error output kept for AudioDecodeError; the rest is read and dropped
+_STDERR_TAIL_BYTES = 8192
+
+
+class AudioDecodeError(Exception):
+    """Raised when ffmpeg cannot decode the audio source"""
+    pass
+
+
+async def _stderr_tail(stream: asyncio.StreamReader) -> bytes:
+    """Read `stream` to EOF, keeping its last bytes, so ffmpeg never blocks on a full stderr pipe."""
+    tail = b""
+    while True:
+        data = await stream.read(4096)
+        if not data:
+            return tail
+        tail = (tail + data)[-_STDERR_TAIL_BYTES:]
+
+
+def _ffmpeg_command(source: str, headers: Optional[Dict[str, str]]) -> list:
+    command = ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error"]
+    if headers:
+        command += ["-headers", "".join(f"{name}: {value}\r\n" for name, value in headers.items())]
+    return command + [
+        "-i", source,
+        "-vn", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-",
+    ]
+
+
+async def pcm_chunks(
+    source: str,
+    headers: Optional[Dict[str, str]] = None,
+    chunk_seconds: float = 1.0,
+) -> AsyncIterator[np.ndarray]:
+    """
+    Decode a local file or a media URL once, straight to 16 kHz mono float32
+    samples, yielded in chunks of `chunk_seconds`.
+
+    Nothing is written to disk, and only the chunk being read is held here,
+    whatever the duration of the source. Closing the generator early kills
+    ffmpeg.
+    """
+    chunk_bytes = int(chunk_seconds * SAMPLE_RATE) * 2  # s16le: 2 bytes per sample
+    process = await asyncio.create_subprocess_exec(
+        *_ffmpeg_command(source, headers),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stderr_reader = asyncio.create_task(_stderr_tail(process.stderr))
+    try:
+        while True:
+            try:
+                data = await process.stdout.readexactly(chunk_bytes)
+            except asyncio.IncompleteReadError as e:
+                data = e.partial
+            if data:
+                yield np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+            if len(data) < chunk_bytes:
+                break
+
+        stderr = await stderr_reader
+        if await process.wait() != 0:
+            raise AudioDecodeError(stderr.decode(errors="replace").strip() or "ffmpeg failed")
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        if not stderr_reader.done():
+            stderr_reader.cancel()
+
+
+async def decode_audio(source: str, headers: Optional[Dict[str, str]] = None) -> np.ndarray:
+    """Decode a whole source into memory (what whisper.load_audio does, without importing whisper)."""
+    chunks = [chunk async for chunk in pcm_chunks(source, headers, chunk_seconds=30.0)]
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
@@ -0,0 +1,146 @@
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+@dataclass
+class Chunk:
+    text: str
+    chunk_index: int
+    start: Optional[float] = None  # seconds
+    end: Optional[float] = None
+
+    def metadata(self) -> Dict[str, Any]:
+        """Chroma metadata for the chunk (Chroma rejects None values)."""
+        metadata: Dict[str, Any] = {"chunk_index": self.chunk_index}
+        if self.start is not None:
+            metadata["start"] = self.start
+        if self.end is not None:
+            metadata["end"] = self.end
+        return metadata
+
+
+def normalize_segments(raw_segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep only start/end/text from Whisper segments and drop empty ones."""
+    segments = []
+    for segment in raw_segments or []:
+        text = (segment.get("text") or "").strip()
+        if not text:
+            continue
+        segments.append({
+            "start": round(float(segment["start"]), 2),
+            "end": round(float(segment["end"]), 2),
+            "text": text,
+        })
+    return segments
+
+
+def text_segments(text: str, max_chars: int) -> List[Dict[str, Any]]:
+    """
+    Untimed pseudo-segments for a plain transcription: one per sentence, with
+    sentences longer than `max_chars` split on whitespace.
+    """
+    segments: List[Dict[str, Any]] = []
+    for sentence in _SENTENCE_END.split(text or ""):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            segments.append({"text": sentence[:cut].strip()})
+            sentence = sentence[cut:].strip()
+        if sentence:
+            segments.append({"text": sentence})
+    return segments
+
+
+def format_timestamp(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours:d}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+class SegmentChunker:
+    """
+    Builds retrieval chunks directly from Whisper segments.
+
+    Segments are packed in order into chunks of at most `chunk_size` characters;
+    the next chunk starts again from the trailing segments covering roughly
+    `chunk_overlap` characters. Chunks never cut a segment, so each one maps to
+    an exact [start, end] time range of the video.
+
+    Boundaries are content-defined: past `min_chunk_size`, a chunk ends after
+    any segment whose text hash is divisible by `boundary_divisor`. An edit only
+    changes the chunks around it, the boundaries after it fall back in the same
+    places, so re-indexing can keep the other chunks and their embeddings.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        min_chunk_size: Optional[int] = None,
+        boundary_divisor: int = 4,
+    ):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        # Above the overlap, so a boundary can never re-emit the overlap alone
+        self.min_chunk_size = max(min_chunk_size or chunk_size // 2, chunk_overlap + 1)
+        self.boundary_divisor = boundary_divisor
+
+    def _is_boundary(self, segment: Dict[str, Any]) -> bool:
+        return zlib.crc32(segment["text"].encode("utf-8")) % self.boundary_divisor == 0
+
+    def split_segments(self, segments: List[Dict[str, Any]]) -> List[Chunk]:
+        chunks: List[Chunk] = []
+        current: List[Dict[str, Any]] = []
+        current_size = 0
+        fresh = 0  # segments added since the last cut, beyond the overlap tail
+
+        def cut() -> None:
+            nonlocal current, current_size, fresh
+            chunks.append(self._make_chunk(current, len(chunks)))
+            current = self._overlap_tail(current)
+            current_size = sum(len(s["text"]) + 1 for s in current)
+            fresh = 0
+
+        for segment in segments:
+            segment_size = len(segment["text"]) + 1
+            if current and current_size + segment_size > self.chunk_size:
+                if fresh:
+                    cut()
+                if current and current_size + segment_size > self.chunk_size:
+                    current, current_size = [], 0
+            current.append(segment)
+            current_size += segment_size
+            fresh += 1
+            if current_size >= self.min_chunk_size and self._is_boundary(segment):
+                cut()
+
+        if fresh:
+            chunks.append(self._make_chunk(current, len(chunks)))
+        return chunks
+
+    def _overlap_tail(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        tail: List[Dict[str, Any]] = []
+        size = 0
+        for segment in reversed(segments[1:]):
+            size += len(segment["text"]) + 1
+            if size > self.chunk_overlap:
+                break
+            tail.insert(0, segment)
+        return tail
+
+    @staticmethod
+    def _make_chunk(segments: List[Dict[str, Any]], index: int) -> Chunk:
+        return Chunk(
+            text=" ".join(s["text"] for s in segments),
+            chunk_index=index,
+            start=segments[0].get("start"),
+            end=segments[-1].get("end"),
+        )
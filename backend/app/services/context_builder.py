@@ -0,0 +1,162 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+from app.services.chunking import format_timestamp
+from app.services.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+# Shortest text overlap stripped between two chunks; shorter matches are coincidences
+_MIN_OVERLAP_CHARS = 20
+# Gap (seconds) under which two timed chunks are considered contiguous
+_CONTIGUOUS_SECONDS = 1.0
+
+
+@dataclass
+class ContextChunk:
+    id: str
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class BuiltContext:
+    text: str
+    tokens: int
+    chunk_ids: List[str]  # chunks used, in passage order
+    passages: int
+    dropped: int  # candidates left out to stay within the budget
+    overlap_chars: int  # duplicated overlap stripped when merging chunks
+
+
+def _overlap(previous: str, following: str) -> int:
+    """Length of the longest prefix of `following` (ending on a word) that `previous` ends with."""
+    limit = min(len(previous), len(following))
+    cuts = [len(following)] + [i for i in range(len(following) - 1, 0, -1) if following[i] == " "]
+    for cut in cuts:
+        if cut < _MIN_OVERLAP_CHARS:
+            break
+        if cut <= limit and previous.endswith(following[:cut]):
+            return cut
+    return 0
+
+
+def _contiguous(previous: Dict[str, Any], following: Dict[str, Any]) -> bool:
+    if "end" in previous and "start" in following:
+        return following["start"] <= previous["end"] + _CONTIGUOUS_SECONDS
+    if "chunk_index" in previous and "chunk_index" in following:
+        return following["chunk_index"] - previous["chunk_index"] <= 1
+    return False
+
+
+class ContextBuilder:
+    """
+    Turns retrieved chunks into the prompt context within a token budget.
+
+    Candidates are taken in priority order (retrieval hits by rank, then
+    neighbour chunks) while the context fits in `max_tokens`, keeping a
+    running token total so that each candidate only costs the count of its
+    own text; the best hit is always kept. Selected chunks are put back in transcript order,
+    and contiguous ones are merged into a single passage with the overlap
+    they share (chunk_overlap) sent only once.
+    """
+
+    def __init__(self, max_tokens: int, counter: TokenCounter):
+        self.max_tokens = max_tokens
+        self.counter = counter
+
+    @staticmethod
+    def _order_key(chunk: ContextChunk):
+        return chunk.metadata.get("start", 0), chunk.metadata.get("chunk_index", 0)
+
+    def _passages(self, chunks: List[ContextChunk]) -> List[Dict[str, Any]]:
+        passages: List[Dict[str, Any]] = []
+        for chunk in sorted(chunks, key=self._order_key):
+            last = passages[-1] if passages else None
+            if last is not None and _contiguous(last["metadata"], chunk.metadata):
+                cut = _overlap(last["text"], chunk.text)
+                rest = chunk.text[cut:].strip()
+                if rest:
+                    last["text"] = f"{last['text']} {rest}"
+                last["overlap"] += cut
+                last["ids"].append(chunk.id)
+                if "end" in chunk.metadata:
+                    last["metadata"]["end"] = max(last["metadata"].get("end", 0), chunk.metadata["end"])
+                last["metadata"]["chunk_index"] = chunk.metadata.get("chunk_index", last["metadata"].get("chunk_index"))
+            else:
+                passages.append({"text": chunk.text.strip(), "metadata": dict(chunk.metadata), "ids": [chunk.id], "overlap": 0})
+        return passages
+
+    @staticmethod
+    def _render(passages: List[Dict[str, Any]]) -> str:
+        parts = []
+        for number, passage in enumerate(passages, 1):
+            meta = passage["metadata"]
+            header = f"[Segment {number}]"
+            if "start" in meta and "end" in meta:
+                header += f" [{format_timestamp(meta['start'])} - {format_timestamp(meta['end'])}]"
+            parts.append(f"{header}\n{passage['text']}")
+        return "\n\n".join(parts)
+
+    def _added_tokens(self, chunk: ContextChunk, selected: List[ContextChunk]) -> int:
+        """
+        Tokens `chunk` adds to the context of `selected`: the rest of its text
+        past the overlap when it extends a selected chunk, its own block
+        otherwise. Merging passages only ever shortens the rendered context, so
+        the running sum of these is an upper bound of its size.
+        """
+        key = self._order_key(chunk)
+        previous = [
+            other for other in selected
+            if self._order_key(other) <= key and _contiguous(other.metadata, chunk.metadata)
+        ]
+        if previous:
+            extended = max(previous, key=self._order_key)
+            rest = chunk.text[_overlap(extended.text, chunk.text):].strip()
+            return self.counter.count(f" {rest}") if rest else 0
+        block = self._render([{"text": chunk.text.strip(), "metadata": chunk.metadata}])
+        return self.counter.count(f"\n\n{block}" if selected else block)
+
+    def build(self, hits: Sequence[ContextChunk], neighbours: Sequence[ContextChunk] = ()) -> BuiltContext:
+        selected: List[ContextChunk] = []
+        seen_ids, seen_texts = set(), set()
+        estimate, dropped = 0, 0
+        for chunk in [*hits, *neighbours]:
+            if chunk.id in seen_ids or chunk.text in seen_texts:
+                continue
+            added = self._added_tokens(chunk, selected)
+            if selected and estimate + added > self.max_tokens:
+                dropped += 1
+                continue
+            selected.append(chunk)
+            seen_ids.add(chunk.id)
+            seen_texts.add(chunk.text)
+            estimate += added
+
+        # Rendered and counted once; the estimate is an upper bound up to tokenizer merges across blocks
+        passages = self._passages(selected)
+        text = self._render(passages)
+        tokens = self.counter.count(text)
+        while tokens > self.max_tokens and len(selected) > 1:
+            selected.pop()
+            dropped += 1
+            passages = self._passages(selected)
+            text = self._render(passages)
+            tokens = self.counter.count(text)
+
+        if tokens > self.max_tokens:
+            logger.warning(f"Best chunk alone is {tokens} tokens, above the {self.max_tokens} token context budget")
+        built = BuiltContext(
+            text=text,
+            tokens=tokens,
+            chunk_ids=[chunk_id for passage in passages for chunk_id in passage["ids"]],
+            passages=len(passages),
+            dropped=dropped,
+            overlap_chars=sum(passage["overlap"] for passage in passages),
+        )
+        logger.info(
+            f"Context: {len(selected)} chunks in {built.passages} passages, {built.tokens} tokens "
+            f"(budget {self.max_tokens}, {built.dropped} dropped, {built.overlap_chars} overlap chars stripped)"
+        )
+        return built
@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from app.services.embedding_scheduler import EmbeddingScheduler, ProgressCallback
+from app.services.embeddings import AsyncEmbeddings
+from app.services.local_embeddings import LocalEmbeddings
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]  # (model name, sha256 of the text)
+
+# SQLite limits the number of bound parameters per statement
+_SQLITE_BATCH = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """SQLite table of float32 vectors keyed by (model, text hash)."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " text_hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, text_hash))"
+            )
+            self._conn.commit()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for i in range(0, len(hashes), _SQLITE_BATCH):
+                batch = hashes[i:i + _SQLITE_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for hash_, blob in rows:
+                    found[hash_] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, List[float]]]) -> None:
+        rows = [(model, hash_, array("f", vector).tobytes()) for hash_, vector in items]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache: an in-memory LRU in front of an optional disk store.
+    Disk access runs in the given executor so it never blocks the event loop.
+    """
+
+    def __init__(self, memory_items: int, disk: Optional[DiskEmbeddingStore] = None, executor: Optional[Executor] = None):
+        self.memory_items = memory_items
+        self.disk = disk
+        self.executor = executor
+        self._memory: "OrderedDict[CacheKey, List[float]]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        missing: List[str] = []
+        for hash_ in hashes:
+            vector = self._memory.get((model, hash_))
+            if vector is not None:
+                self._memory.move_to_end((model, hash_))
+                found[hash_] = vector
+            else:
+                missing.append(hash_)
+        self.memory_hits += len(found)
+
+        if missing and self.disk is not None:
+            loop = asyncio.get_running_loop()
+            from_disk = await loop.run_in_executor(self.executor, self.disk.get_many, model, missing)
+            self.disk_hits += len(from_disk)
+            for hash_, vector in from_disk.items():
+                self._remember((model, hash_), vector)
+            found.update(from_disk)
+
+        self.misses += sum(1 for hash_ in hashes if hash_ not in found)
+        return found
+
+    async def put_many(self, model: str, items: Dict[str, List[float]]) -> None:
+        for hash_, vector in items.items():
+            self._remember((model, hash_), vector)
+        if items and self.disk is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self.disk.put_many, model, list(items.items()))
+
+    def _remember(self, key: CacheKey, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_items": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+
+class CachedEmbeddings:
+    """Embeddings front-end that only sends cache misses to the model."""
+
+    def __init__(self, embeddings: Union[AsyncEmbeddings, EmbeddingScheduler, LocalEmbeddings], cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    @property
+    def model_name(self) -> str:
+        return self.embeddings.model_name
+
+    async def embed_query(self, text: str) -> List[float]:
+        hash_ = text_hash(text)
+        cached = await self.cache.get_many(self.model_name, [hash_])
+        if hash_ in cached:
+            return cached[hash_]
+        vector = await self.embeddings.embed_query(text)
+        await self.cache.put_many(self.model_name, {hash_: vector})
+        return vector
+
+    async def embed_documents(self, texts: List[str], progress: Optional[ProgressCallback] = None) -> List[List[float]]:
+        if not texts:
+            return []
+        hashes = [text_hash(text) for text in texts]
+        vectors = await self.cache.get_many(self.model_name, hashes)
+
+        # Embed each distinct missing text once
+        missing: Dict[str, str] = {}
+        for hash_, text in zip(hashes, texts):
+            if hash_ not in vectors:
+                missing.setdefault(hash_, text)
+        cached_count = len(texts) - sum(1 for hash_ in hashes if hash_ in missing)
+        if missing:
+            missing_hashes = list(missing.keys())
+
+            async def store_batch(positions: List[int], batch_vectors: List[List[float]]) -> None:
+                # Persist each batch as soon as it is done: a later failure keeps it
+                batch = {missing_hashes[i]: vector for i, vector in zip(positions, batch_vectors)}
+                await self.cache.put_many(self.model_name, batch)
+                vectors.update(batch)
+
+            async def missing_progress(done: int, total: int) -> None:
+                if progress is not None:
+                    await progress(min(len(texts), cached_count + done), len(texts))
+
+            if isinstance(self.embeddings, EmbeddingScheduler):
+                await self.embeddings.embed_documents(
+                    list(missing.values()), progress=missing_progress, on_batch=store_batch
+                )
+            else:
+                computed = await self.embeddings.embed_documents(list(missing.values()))
+                await store_batch(list(range(len(computed))), computed)
+        if progress is not None:
+            await progress(len(texts), len(texts))
+
+        logger.info(f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} documents served from cache")
+        return [vectors[hash_] for hash_ in hashes]
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, Tuple, TypeVar
+
+from app.services.embeddings import AsyncEmbeddings
+from app.services.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+# progress(done, total): number of texts embedded so far, out of the request
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+# on_batch(positions, vectors): a batch of the request is done, positions index the input texts
+BatchCallback = Callable[[List[int], List[List[float]]], Awaitable[None]]
+
+T = TypeVar("T")
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds requested by a 429 Retry-After header, 0 when absent."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def pack_batches(token_counts: List[int], max_tokens: int, max_size: int) -> List[List[int]]:
+    """
+    Group text positions, in order, into batches of at most `max_tokens` tokens
+    and `max_size` texts. A text larger than `max_tokens` gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for position, tokens in enumerate(token_counts):
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(position)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class TokenBudget:
+    """
+    Tokens-per-minute budget over a sliding 60 s window, the way the API
+    counts it: acquire() waits until the tokens spent in the last minute leave
+    room for the request.
+    """
+
+    WINDOW_SECONDS = 60.0
+
+    def __init__(self, tokens_per_minute: int):
+        self.limit = tokens_per_minute
+        self._spent: Deque[Tuple[float, int]] = deque()  # (monotonic time, tokens)
+        self._total = 0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._spent and now - self._spent[0][0] >= self.WINDOW_SECONDS:
+            self._total -= self._spent.popleft()[1]
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        """Seconds until enough of the spent tokens leave the window."""
+        needed = self._total + tokens - self.limit
+        freed = 0
+        for spent_at, spent in self._spent:
+            freed += spent
+            if freed >= needed:
+                return spent_at + self.WINDOW_SECONDS - now
+        return self.WINDOW_SECONDS
+
+    async def acquire(self, tokens: int) -> None:
+        # A request larger than the whole budget waits for an empty window
+        tokens = min(tokens, self.limit)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                if self._total + tokens <= self.limit:
+                    break
+                await asyncio.sleep(max(self._wait_time(tokens, now), 0.01))
+            self._spent.append((now, tokens))
+            self._total += tokens
+
+
+class EmbeddingScheduler:
+    """
+    Embeds documents in token-packed batches, several at a time, within a
+    tokens-per-minute budget.
+
+    A failed batch is retried alone with exponential backoff; the batches that
+    already succeeded are kept (and handed to `on_batch` as soon as they are
+    done, so a cache can persist them even if the request fails later).
+    Query embeddings go through the same budget and retries.
+    Progress and batch callbacks are called one at a time from the calling
+    task, never concurrently, so they may use the caller's database session.
+    """
+
+    def __init__(
+        self,
+        embeddings: AsyncEmbeddings,
+        tokens_per_minute: int,
+        max_batch_tokens: int,
+        max_batch_size: int,
+        concurrency: int,
+        max_retries: int,
+        retry_backoff: float,
+    ):
+        self.embeddings = embeddings
+        self.budget = TokenBudget(tokens_per_minute)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tokens = TokenCounter(self.model_name)
+        self.batches = 0
+        self.retries = 0
+
+    @property
+    def model_name(self) -> str:
+        return self.embeddings.model_name
+
+    async def embed_query(self, text: str) -> List[float]:
+        """
+        One text, within the same budget and with the same retries as the
+        batches, but without waiting for a batch slot: a question is never
+        queued behind the indexing of a long video.
+        """
+        return await self._with_retries(
+            lambda: self.embeddings.embed_query(text), self._tokens.count(text), "Embedding query"
+        )
+
+    async def _embed_batch(self, texts: List[str], tokens: int) -> List[List[float]]:
+        async def call() -> List[List[float]]:
+            async with self._slots:
+                return await self.embeddings.embed_documents(texts)
+
+        return await self._with_retries(call, tokens, f"Embedding batch of {len(texts)} texts")
+
+    async def _with_retries(self, call: Callable[[], Awaitable[T]], tokens: int, label: str) -> T:
+        """
+        `call()` once `tokens` fit in the budget, retried with exponential
+        backoff (or the server's Retry-After, when longer) up to max_retries times.
+        """
+        attempt = 0
+        while True:
+            await self.budget.acquire(tokens)
+            try:
+                return await call()
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                self.retries += 1
+                delay = max(
+                    self.retry_backoff * 2 ** (attempt - 1) * (1 + random.random() / 2),
+                    _retry_after(e),
+                )
+                logger.warning(
+                    f"{label} failed ({type(e).__name__}: {e}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def embed_documents(
+        self,
+        texts: List[str],
+        progress: Optional[ProgressCallback] = None,
+        on_batch: Optional[BatchCallback] = None,
+    ) -> List[List[float]]:
+        if not texts:
+            return []
+        token_counts = await asyncio.to_thread(self._tokens.count_many, texts)
+        batches = pack_batches(token_counts, self.max_batch_tokens, self.max_batch_size)
+        logger.info(
+            f"Embedding {len(texts)} texts ({sum(token_counts)} tokens) in {len(batches)} batches"
+        )
+
+        async def run(positions: List[int]):
+            vectors = await self._embed_batch(
+                [texts[i] for i in positions], sum(token_counts[i] for i in positions)
+            )
+            return positions, vectors
+
+        tasks = [asyncio.create_task(run(positions)) for positions in batches]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        done = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                positions, vectors = await finished
+                self.batches += 1
+                for position, vector in zip(positions, vectors):
+                    results[position] = vector
+                done += len(positions)
+                if on_batch is not None:
+                    await on_batch(positions, vectors)
+                if progress is not None:
+                    await progress(done, len(texts))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return results
+
+    def stats(self) -> dict:
+        return {"batches": self.batches, "retries": self.retries}
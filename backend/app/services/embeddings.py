@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+def _has_native_async(model: Embeddings) -> bool:
+    """True when the model overrides the default (executor based) async methods."""
+    return (
+        type(model).aembed_query is not Embeddings.aembed_query
+        and type(model).aembed_documents is not Embeddings.aembed_documents
+    )
+
+
+class AsyncEmbeddings:
+    """
+    Async adapter over a LangChain embeddings model.
+
+    Uses the model's native async client when it has one (OpenAIEmbeddings),
+    otherwise runs the blocking calls in a bounded thread pool so they never
+    stall the event loop.
+    """
+
+    def __init__(self, model: Embeddings, executor: Optional[ThreadPoolExecutor] = None):
+        self.model = model
+        self.executor = executor
+        self.native_async = _has_native_async(model)
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.model, "model", None) or type(self.model).__name__
+
+    async def embed_query(self, text: str) -> List[float]:
+        if self.native_async:
+            return await self.model.aembed_query(text)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.model.embed_query, text)
+
+    async def embed_documents(
+        self, texts: List[str], progress: Optional[Callable[[int, int], Awaitable[None]]] = None
+    ) -> List[List[float]]:
+        if not texts:
+            return []
+        if self.native_async:
+            vectors = await self.model.aembed_documents(texts)
+        else:
+            loop = asyncio.get_running_loop()
+            vectors = await loop.run_in_executor(self.executor, self.model.embed_documents, texts)
+        if progress is not None:
+            await progress(len(texts), len(texts))
+        return vectors
@@ -0,0 +1,460 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from abc import ABC, abstractmethod
+from enum import Enum
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.resources import AppResources
+from app.db.base import AsyncSessionLocal
+from app.models.ingestion_job import IngestionJob
+from app.models.video import Video
+from app.services.chunking import normalize_segments
+from app.services.transcript_store import store_transcript, untimed_segments
+from app.services.transcription_service import transcription_service
+from app.services.video_service import VideoService
+from app.services.whisper_pool import TranscriptionBusyError
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionStage(str, Enum):
+    DOWNLOAD = "download"
+    TRANSCRIBE = "transcribe"
+    INDEX = "index"
+
+
+STAGE_ORDER: List[IngestionStage] = [
+    IngestionStage.DOWNLOAD,
+    IngestionStage.TRANSCRIBE,
+    IngestionStage.INDEX,
+]
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+ACTIVE_STATUSES = [JobStatus.PENDING.value, JobStatus.RUNNING.value, JobStatus.RETRYING.value]
+# Statuses a worker may claim a job's stage from
+CLAIMABLE_STATUSES = [JobStatus.PENDING.value, JobStatus.RETRYING.value]
+
+# Minimum delay between two embedding progress updates of a job
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+# A stage handler receives the job, its video and the session both are attached to.
+# Stages hand data to each other through job.artifacts and the video row, and
+# signal failure by raising.
+StageHandler = Callable[[IngestionJob, Video, AsyncSession], Awaitable[None]]
+
+
+class IngestionStageError(Exception):
+    """Stage failure that retrying will not fix (invalid URL, empty transcription...)"""
+    pass
+
+
+class JobQueue(ABC):
+    """Transport carrying job ids between stages. Job state itself lives in Postgres."""
+
+    @abstractmethod
+    async def put(self, stage: IngestionStage, job_id: UUID) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, stage: IngestionStage) -> UUID:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryJobQueue(JobQueue):
+    """
+    One asyncio queue per stage, local to the API process.
+    Jobs lost on shutdown are recovered from the database at the next start.
+    """
+
+    def __init__(self):
+        self._queues: Dict[IngestionStage, asyncio.Queue] = {
+            stage: asyncio.Queue() for stage in STAGE_ORDER
+        }
+
+    async def put(self, stage: IngestionStage, job_id: UUID) -> None:
+        await self._queues[stage].put(job_id)
+
+    async def get(self, stage: IngestionStage) -> UUID:
+        return await self._queues[stage].get()
+
+    def qsize(self, stage: IngestionStage) -> int:
+        return self._queues[stage].qsize()
+
+
+def create_job_queue(backend: str) -> JobQueue:
+    if backend == "memory":
+        return InMemoryJobQueue()
+    raise ValueError(f"Unknown ingestion queue backend: {backend}")
+
+
+async def download_stage(job: IngestionJob, video: Video, db: AsyncSession) -> None:
+    if not transcription_service.validate_youtube_url(video.url):
+        raise IngestionStageError("URL YouTube invalide")
+    if settings.TRANSCRIPTION_AUDIO_MODE == "stream":
+        # The transcribe stage decodes the stream itself, nothing to download
+        return
+    audio_path = await transcription_service.download_audio(video.url)
+    job.artifacts = {**(job.artifacts or {}), "audio_path": audio_path}
+
+
+async def transcribe_stage(job: IngestionJob, video: Video, db: AsyncSession) -> None:
+    artifacts = dict(job.artifacts or {})
+    audio_path = artifacts.get("audio_path")
+    if audio_path and Path(audio_path).exists():
+        result = await transcription_service.transcribe_audio(audio_path)
+    elif settings.TRANSCRIPTION_AUDIO_MODE == "stream":
+        # Decode errors stay retryable: they are usually a dropped connection
+        result = await transcription_service.transcribe_stream(video.url)
+    else:
+        raise IngestionStageError("Fichier audio introuvable, le téléchargement doit être relancé")
+
+    if not result or not result.get("text"):
+        raise IngestionStageError("La transcription a échoué. Aucun texte n'a été généré.")
+
+    # Timestamped segments, read back by the index stage
+    segments = normalize_segments(result.get("segments")) or untimed_segments(result["text"])
+    await store_transcript(db, video.id, segments)
+    if audio_path and Path(audio_path).exists():
+        transcription_service.cleanup_audio(audio_path)
+    artifacts.pop("audio_path", None)
+    job.artifacts = artifacts
+
+
+async def index_stage(job: IngestionJob, video: Video, db: AsyncSession, resources: AppResources) -> None:
+    artifacts = dict(job.artifacts or {})
+    last_report = 0.0
+
+    async def report_progress(done: int, total: int) -> None:
+        # Visible through GET /videos/{id}/jobs while the stage runs
+        nonlocal last_report
+        now = time.monotonic()
+        if done < total and now - last_report < PROGRESS_INTERVAL_SECONDS:
+            return
+        last_report = now
+        job.artifacts = {**(job.artifacts or {}), "embedding_progress": {"done": done, "total": total}}
+        await db.commit()
+
+    # Jobs queued before transcripts were stored still carry their segments
+    report = await VideoService(db, resources=resources)._update_chroma_collection(
+        video, artifacts.get("segments"), progress=report_progress
+    )
+    artifacts.pop("segments", None)
+    artifacts.pop("embedding_progress", None)
+    artifacts["reindex"] = report.as_dict()
+    job.artifacts = artifacts
+
+
+def default_stages(resources: AppResources) -> Dict[IngestionStage, StageHandler]:
+    return {
+        IngestionStage.DOWNLOAD: download_stage,
+        IngestionStage.TRANSCRIBE: transcribe_stage,
+        IngestionStage.INDEX: partial(index_stage, resources=resources),
+    }
+
+
+def default_concurrency() -> Dict[IngestionStage, int]:
+    return {
+        IngestionStage.DOWNLOAD: settings.INGESTION_DOWNLOAD_CONCURRENCY,
+        IngestionStage.TRANSCRIBE: settings.INGESTION_TRANSCRIBE_CONCURRENCY,
+        IngestionStage.INDEX: settings.INGESTION_INDEX_CONCURRENCY,
+    }
+
+
+async def get_video_jobs(db: AsyncSession, video_id: UUID) -> List[IngestionJob]:
+    result = await db.execute(
+        select(IngestionJob)
+        .where(IngestionJob.video_id == video_id)
+        .order_by(IngestionJob.created_at.desc())
+    )
+    return result.scalars().all()
+
+
+class IngestionWorkerPool:
+    """
+    Runs ingestion jobs stage by stage (download -> transcribe -> index).
+
+    Each stage has its own set of workers, so a slow transcription never holds
+    back downloads or indexing of other videos. Every stage opens its own DB
+    session and only keeps it for the duration of that stage.
+
+    Several API processes may run a pool against the same database: a stage
+    only runs once its job has been claimed with a conditional UPDATE, and
+    running jobs hold a lease renewed by their process. At startup a pool
+    only takes over running jobs whose lease has expired, i.e. whose process
+    is gone.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        resources: Optional[AppResources] = None,
+        stages: Optional[Dict[IngestionStage, StageHandler]] = None,
+        concurrency: Optional[Dict[IngestionStage, int]] = None,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        max_attempts: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+    ):
+        self.queue = queue
+        self.stages = stages or default_stages(resources)
+        self.concurrency = concurrency or default_concurrency()
+        self.session_factory = session_factory
+        self.max_attempts = max_attempts or settings.INGESTION_MAX_ATTEMPTS
+        self.retry_backoff = (
+            retry_backoff if retry_backoff is not None else settings.INGESTION_RETRY_BACKOFF_SECONDS
+        )
+        self.lease_seconds = lease_seconds or settings.INGESTION_LEASE_SECONDS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: Set[UUID] = set()  # jobs whose lease this process renews
+        self._workers: List[asyncio.Task] = []
+        self._retry_tasks: Set[asyncio.Task] = set()
+
+    async def start(self, recover: bool = True) -> None:
+        if recover:
+            await self._recover_jobs()
+        for stage in STAGE_ORDER:
+            for i in range(self.concurrency.get(stage, 1)):
+                self._workers.append(
+                    asyncio.create_task(self._worker(stage), name=f"ingestion-{stage.value}-{i}")
+                )
+        self._workers.append(asyncio.create_task(self._renew_leases(), name="ingestion-leases"))
+        logger.info(
+            "Ingestion workers started: "
+            + ", ".join(f"{stage.value}={self.concurrency.get(stage, 1)}" for stage in STAGE_ORDER)
+        )
+
+    async def stop(self) -> None:
+        tasks = [*self._workers, *self._retry_tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers.clear()
+        self._retry_tasks.clear()
+        await self.queue.close()
+        logger.info("Ingestion workers stopped")
+
+    async def submit(self, db: AsyncSession, video_id: UUID) -> IngestionJob:
+        """Create a job for the video and queue its first stage."""
+        job = IngestionJob(
+            video_id=video_id,
+            stage=IngestionStage.DOWNLOAD.value,
+            status=JobStatus.PENDING.value,
+            attempts=0,
+            artifacts={},
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        await self.queue.put(IngestionStage.DOWNLOAD, job.id)
+        logger.info(f"Queued ingestion job {job.id} for video {video_id}")
+        return job
+
+    async def _recover_jobs(self) -> None:
+        """
+        Re-queue jobs left unfinished by a previous process: pending and
+        retrying ones, and running ones whose lease expired. Jobs another live
+        process is running keep a valid lease and are left alone; rows locked
+        by a pool recovering at the same time are skipped.
+        """
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(IngestionJob)
+                .where(or_(
+                    IngestionJob.status.in_(CLAIMABLE_STATUSES),
+                    (IngestionJob.status == JobStatus.RUNNING.value) & or_(
+                        IngestionJob.lease_expires_at.is_(None), IngestionJob.lease_expires_at < func.now()
+                    ),
+                ))
+                .with_for_update(skip_locked=True)
+            )
+            jobs = result.scalars().all()
+            for job in jobs:
+                audio_path = (job.artifacts or {}).get("audio_path")
+                if (
+                    job.stage == IngestionStage.TRANSCRIBE.value
+                    and settings.TRANSCRIPTION_AUDIO_MODE != "stream"
+                    and not (audio_path and Path(audio_path).exists())
+                ):
+                    # The temporary audio file did not survive the restart
+                    job.stage = IngestionStage.DOWNLOAD.value
+                job.status = JobStatus.PENDING.value
+                job.attempts = 0
+                job.claimed_by = None
+                job.lease_expires_at = None
+            await db.commit()
+
+        for job in jobs:
+            await self.queue.put(IngestionStage(job.stage), job.id)
+        if jobs:
+            logger.info(f"Recovered {len(jobs)} unfinished ingestion jobs")
+
+    async def _claim(self, db: AsyncSession, stage: IngestionStage, job_id: UUID) -> bool:
+        """
+        Atomically mark the job's stage as running by this process. False when
+        another process claimed it first, or the job moved on since it was queued.
+        """
+        result = await db.execute(
+            update(IngestionJob)
+            .where(
+                IngestionJob.id == job_id,
+                IngestionJob.stage == stage.value,
+                IngestionJob.status.in_(CLAIMABLE_STATUSES),
+            )
+            .values(
+                status=JobStatus.RUNNING.value,
+                attempts=IngestionJob.attempts + 1,
+                error=None,
+                claimed_by=self.worker_id,
+                lease_expires_at=func.now() + timedelta(seconds=self.lease_seconds),
+            )
+            .returning(IngestionJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = result.scalar_one_or_none() is not None
+        await db.commit()
+        return claimed
+
+    async def _renew_leases(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not self._running:
+                continue
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(
+                        update(IngestionJob)
+                        .where(IngestionJob.id.in_(list(self._running)), IngestionJob.claimed_by == self.worker_id)
+                        .values(lease_expires_at=func.now() + timedelta(seconds=self.lease_seconds))
+                        .execution_options(synchronize_session=False)
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.error(f"Failed to renew ingestion job leases: {str(e)}")
+
+    async def _worker(self, stage: IngestionStage) -> None:
+        while True:
+            job_id = await self.queue.get(stage)
+            try:
+                await self._run_stage(stage, job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Unexpected error in {stage.value} worker for job {job_id}: {str(e)}", exc_info=True)
+
+    async def _run_stage(self, stage: IngestionStage, job_id: UUID) -> None:
+        next_stage = None
+        async with self.session_factory() as db:
+            if not await self._claim(db, stage, job_id):
+                logger.info(f"Stage {stage.value} of job {job_id} already claimed or no longer pending, skipping")
+                return
+            self._running.add(job_id)
+            try:
+                job = await db.get(IngestionJob, job_id)
+                if job is None:
+                    logger.warning(f"Ingestion job {job_id} no longer exists, skipping")
+                    return
+                video = await db.get(Video, job.video_id)
+                if video is None:
+                    # Not left running: recovery would take it over again once the lease expires
+                    logger.warning(f"Video {job.video_id} of job {job_id} no longer exists, failing the job")
+                    job.status = JobStatus.FAILED.value
+                    job.error = "Vidéo supprimée"
+                    job.claimed_by = None
+                    job.lease_expires_at = None
+                    await db.commit()
+                    return
+
+                video.status = "processing"
+                await db.commit()
+
+                logger.info(f"Running stage {stage.value} of job {job_id} (attempt {job.attempts})")
+                try:
+                    await self.stages[stage](job, video, db)
+                except Exception as e:
+                    logger.error(f"Stage {stage.value} of job {job_id} failed: {str(e)}")
+                    await db.rollback()
+                    await self._handle_failure(db, job_id, stage, e)
+                    return
+            finally:
+                self._running.discard(job_id)
+
+            next_stage = self._next_stage(stage)
+            if next_stage:
+                job.stage = next_stage.value
+                job.status = JobStatus.PENDING.value
+                job.attempts = 0
+            else:
+                job.status = JobStatus.COMPLETED.value
+                video.status = "completed"
+            await db.commit()
+
+        if next_stage:
+            await self.queue.put(next_stage, job_id)
+        else:
+            logger.info(f"Ingestion job {job_id} completed")
+
+    async def _handle_failure(self, db: AsyncSession, job_id: UUID, stage: IngestionStage, error: Exception) -> None:
+        job = await db.get(IngestionJob, job_id)
+        if job is None:
+            return
+        video = await db.get(Video, job.video_id)
+        job.error = str(error)
+
+        if isinstance(error, TranscriptionBusyError):
+            # Back-pressure from the Whisper pool, not a failure of the job: the
+            # attempt taken by the claim is given back
+            job.attempts -= 1
+            job.status = JobStatus.RETRYING.value
+            await db.commit()
+            logger.info(f"Transcription pool busy, requeueing job {job_id} in {self.retry_backoff:.1f}s")
+            self._schedule_retry(stage, job_id, self.retry_backoff)
+        elif not isinstance(error, IngestionStageError) and job.attempts < self.max_attempts:
+            delay = self.retry_backoff * 2 ** (job.attempts - 1)
+            job.status = JobStatus.RETRYING.value
+            await db.commit()
+            logger.info(f"Retrying stage {stage.value} of job {job_id} in {delay:.1f}s")
+            self._schedule_retry(stage, job_id, delay)
+        else:
+            job.status = JobStatus.FAILED.value
+            if video is not None:
+                video.status = "failed"
+            await db.commit()
+            logger.error(f"Ingestion job {job_id} failed at stage {stage.value}")
+
+    def _schedule_retry(self, stage: IngestionStage, job_id: UUID, delay: float) -> None:
+        async def _retry():
+            await asyncio.sleep(delay)
+            await self.queue.put(stage, job_id)
+
+        task = asyncio.create_task(_retry())
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+
+    @staticmethod
+    def _next_stage(stage: IngestionStage) -> Optional[IngestionStage]:
+        index = STAGE_ORDER.index(stage)
+        return STAGE_ORDER[index + 1] if index + 1 < len(STAGE_ORDER) else None
@@ -0,0 +1,242 @@
+import asyncio
+import heapq
+import logging
+import math
+import re
+import time
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.keyword_index import KeywordIndex
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+")
+
+# Page size used to read a collection's documents when building an index from it
+_LIST_PAGE = 1000
+
+# Function words carry no signal for keyword matching (French transcripts, English jargon)
+STOPWORDS = frozenset("""
+a ai alors au aux avec c ca ce ces cet cette ci comme d dans de des du elle elles en et
+est etait etre eu il ils j je l la le les leur leurs lui m ma mais me meme mes moi mon n
+ne ni nos notre nous on ou par pas peu plus pour qu que quel quelle quels qui s sa sans
+se ses si son sont sur t ta te tes toi ton tout tous tres tu un une vos votre vous y
+an and are as at be by for from has have in is it its of on or that the this to was
+were what when where which who why will with
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased, accent-folded word tokens without stopwords. Numbers are kept
+    whatever their length, other one-letter tokens are dropped. No stemming:
+    this index is for names, numbers and jargon, which stemming would blur.
+    """
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return [
+        token for token in _TOKEN.findall(folded)
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the chunks of one video: an inverted index from term to
+    (chunk position, term frequency) postings, plus chunk lengths. Serialized
+    as plain JSON to be stored next to the video.
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        ids: List[str],
+        lengths: List[int],
+        postings: Dict[str, List[Tuple[int, int]]],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.ids = ids
+        self.lengths = lengths
+        self.postings = postings
+        self.k1 = k1
+        self.b = b
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    @classmethod
+    def build(cls, ids: Sequence[str], texts: Sequence[str]) -> "BM25Index":
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        lengths = []
+        for position, text in enumerate(texts):
+            terms = tokenize(text)
+            lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                postings[term].append((position, frequency))
+        return cls(list(ids), lengths, dict(postings))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top `k` (chunk id, score) pairs for the query terms, best first. Chunks without any term are left out."""
+        if not self.ids:
+            return []
+        total = len(self.ids)
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[position] / (self.avg_length or 1))
+                scores[position] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.ids[position], score) for position, score in best]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.VERSION,
+            "ids": self.ids,
+            "lengths": self.lengths,
+            "postings": {term: [list(p) for p in postings] for term, postings in self.postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25Index":
+        postings = {term: [tuple(p) for p in postings] for term, postings in data["postings"].items()}
+        return cls(data["ids"], data["lengths"], postings)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = 60, weights: Optional[Sequence[float]] = None
+) -> List[Tuple[str, float]]:
+    """
+    Merge ranked id lists: each id scores sum(weight / (k + rank)) over the
+    lists it appears in (rank from 1). Only ranks matter, so BM25 scores and
+    vector distances need no common scale.
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, 1):
+            scores[item] += weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class KeywordIndexCache:
+    """
+    Deserialized indexes of the most recently queried videos, tagged with the
+    video version (its updated_at) like the answer cache, and invalidated
+    explicitly when a video is re-indexed.
+    """
+
+    def __init__(self, max_videos: int, failure_cooldown: float = 300.0):
+        self.max_videos = max_videos
+        self.failure_cooldown = failure_cooldown
+        self._entries: "OrderedDict[UUID, Tuple[Any, BM25Index]]" = OrderedDict()
+        self._building: Dict[UUID, asyncio.Task] = {}
+        self._failed: "OrderedDict[UUID, float]" = OrderedDict()  # monotonic time of the last failed build
+
+    def get(self, video_id: UUID, version: Any) -> Optional[BM25Index]:
+        entry = self._entries.get(video_id)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(video_id)
+        return entry[1]
+
+    def put(self, video_id: UUID, version: Any, index: BM25Index) -> None:
+        self._entries[video_id] = (version, index)
+        self._entries.move_to_end(video_id)
+        while len(self._entries) > self.max_videos:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, video_id: UUID) -> None:
+        """Drop the video's index; a build still running for it will not be cached."""
+        self._entries.pop(video_id, None)
+        self._building.pop(video_id, None)
+        self._failed.pop(video_id, None)
+
+    def build_in_background(
+        self, video_id: UUID, version: Any, build: Callable[[], Awaitable[Optional[BM25Index]]]
+    ) -> None:
+        """
+        Run `build` in a background task and cache its result (unless it is
+        None, or the video was invalidated meanwhile). No-op while a build for
+        the video is running, or for `failure_cooldown` seconds after one failed.
+        """
+        if video_id in self._building:
+            return
+        failed_at = self._failed.get(video_id)
+        if failed_at is not None and time.monotonic() - failed_at < self.failure_cooldown:
+            return
+
+        async def run() -> None:
+            task = asyncio.current_task()
+            try:
+                index = await build()
+                self._failed.pop(video_id, None)
+                if index is not None and self._building.get(video_id) is task:
+                    self.put(video_id, version, index)
+            except Exception as e:
+                self._failed[video_id] = time.monotonic()
+                while len(self._failed) > self.max_videos:
+                    self._failed.popitem(last=False)
+                logger.error(
+                    f"Failed to build keyword index for video {video_id}: {str(e)}, "
+                    f"next attempt in {self.failure_cooldown:.0f}s at the earliest"
+                )
+            finally:
+                if self._building.get(video_id) is task:
+                    del self._building[video_id]
+
+        self._building[video_id] = asyncio.create_task(run(), name=f"keyword-index-{video_id}")
+
+
+async def load_keyword_index(db: AsyncSession, video_id: UUID) -> Optional[BM25Index]:
+    row = await db.get(KeywordIndex, video_id)
+    return BM25Index.from_dict(row.data) if row is not None else None
+
+
+async def store_keyword_index(db: AsyncSession, video_id: UUID, index: BM25Index) -> None:
+    await db.merge(KeywordIndex(video_id=video_id, chunk_count=len(index), data=index.to_dict()))
+    await db.commit()
+
+
+async def store_missing_keyword_index(db: AsyncSession, video_id: UUID, index: BM25Index) -> bool:
+    """
+    Store `index` unless the video already has one, e.g. written by a re-index
+    that ran while this one was built. True when it was stored.
+    """
+    result = await db.execute(
+        insert(KeywordIndex)
+        .values(video_id=video_id, chunk_count=len(index), data=index.to_dict())
+        .on_conflict_do_nothing(index_elements=[KeywordIndex.video_id])
+        .returning(KeywordIndex.video_id)
+    )
+    stored = result.scalar_one_or_none() is not None
+    await db.commit()
+    return stored
+
+
+async def build_from_collection(collection) -> BM25Index:
+    """Index of the chunks already in a collection, for videos indexed before keyword indexes existed."""
+    ids: List[str] = []
+    texts: List[str] = []
+    offset = 0
+    while True:
+        page = await collection.get(limit=_LIST_PAGE, offset=offset, include=["documents"])
+        ids.extend(page["ids"])
+        texts.extend(page["documents"])
+        if len(page["ids"]) < _LIST_PAGE:
+            break
+        offset += _LIST_PAGE
+    # CPU bound on long transcripts
+    return await asyncio.to_thread(BM25Index.build, ids, texts)
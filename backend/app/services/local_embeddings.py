@@ -0,0 +1,105 @@
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Model loaded once per worker process by _init_worker
+_worker_model = None
+_worker_batch_size = 32
+
+
+def _init_worker(model_name: str, threads: int, batch_size: int) -> None:
+    global _worker_model, _worker_batch_size
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+    _worker_batch_size = batch_size
+
+
+def _encode(texts: List[str]) -> List[List[float]]:
+    """Runs in a worker process: batched, normalized embeddings of `texts`."""
+    vectors = _worker_model.encode(
+        texts,
+        batch_size=_worker_batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return vectors.tolist()
+
+
+class LocalEmbeddings:
+    """
+    In-process CPU embeddings with a sentence-transformers model, no network hop.
+
+    Worker processes each hold one copy of the model, with `threads` torch
+    threads each. A request is split into one contiguous slice per worker,
+    and each worker encodes its slice in batches of `batch_size`.
+    """
+
+    def __init__(self, model_name: str, workers: int = 1, threads: int = 0, batch_size: int = 32):
+        if importlib.util.find_spec("sentence_transformers") is None:
+            raise RuntimeError(
+                "EMBEDDING_BACKEND=local requires the sentence-transformers package (sentence_transformers is missing): "
+                "pip install sentence-transformers, see requirements-optional.txt"
+            )
+        self._model_name = model_name
+        self.workers = max(1, workers)
+        self.threads = threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self.batch_size = batch_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logger.info(
+                f"Starting local embedding pool: {self.workers} processes x {self.threads} threads "
+                f"(model={self._model_name})"
+            )
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._model_name, self.threads, self.batch_size),
+            )
+        return self._executor
+
+    async def warmup(self) -> None:
+        """Load the model in every worker now instead of on the first request."""
+        await asyncio.gather(*(self._run(["warmup"]) for _ in range(self.workers)))
+        logger.info("Local embedding pool warmed up")
+
+    async def _run(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), _encode, texts)
+
+    async def embed_query(self, text: str) -> List[float]:
+        return (await self._run([text]))[0]
+
+    async def embed_documents(
+        self, texts: List[str], progress: Optional[Callable[[int, int], Awaitable[None]]] = None
+    ) -> List[List[float]]:
+        if not texts:
+            return []
+        # Slices of at least one batch, so small requests use a single worker
+        size = max(self.batch_size, -(-len(texts) // self.workers))
+        slices = [texts[i:i + size] for i in range(0, len(texts), size)]
+        results = await asyncio.gather(*(self._run(part) for part in slices))
+        if progress is not None:
+            await progress(len(texts), len(texts))
+        return [vector for part in results for vector in part]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.whisper_pool import SAMPLE_RATE, WhisperInferencePool
+
+logger = logging.getLogger(__name__)
+
+_FRAME = SAMPLE_RATE // 10  # 100 ms frames for silence detection
+
+
+@dataclass
+class AudioWindow:
+    index: int
+    offset: float  # seconds from the start of the file
+    samples: np.ndarray
+
+    @property
+    def end(self) -> float:
+        return self.offset + len(self.samples) / SAMPLE_RATE
+
+
+def _quietest_frame(audio: np.ndarray, start: int, stop: int) -> int:
+    """Sample index of the lowest-energy 100 ms frame in [start, stop)."""
+    start, stop = max(0, start), min(len(audio), stop)
+    n_frames = (stop - start) // _FRAME
+    if n_frames <= 1:
+        return stop
+    frames = audio[start:start + n_frames * _FRAME].reshape(n_frames, _FRAME)
+    energy = np.square(frames).mean(axis=1)
+    return start + int(np.argmin(energy)) * _FRAME
+
+
+def split_windows(
+    audio: np.ndarray,
+    window_seconds: float,
+    overlap_seconds: float,
+    silence_search_seconds: float = 0.0,
+) -> List[AudioWindow]:
+    """
+    Cut audio into windows of about `window_seconds`, each overlapping the next
+    by `overlap_seconds`. With a silence search, every cut is moved to the
+    quietest frame within that many seconds before the nominal cut, so words are
+    less likely to be split.
+    """
+    window = int(window_seconds * SAMPLE_RATE)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    search = int(silence_search_seconds * SAMPLE_RATE)
+    windows: List[AudioWindow] = []
+
+    start = 0
+    while start < len(audio):
+        end = min(len(audio), start + window)
+        if end < len(audio) and search:
+            end = _quietest_frame(audio, end - search, end)
+        windows.append(AudioWindow(len(windows), start / SAMPLE_RATE, audio[start:end]))
+        if end >= len(audio):
+            break
+        start = max(end - overlap, start + 1)
+    return windows
+
+
+async def stream_windows(
+    chunks: AsyncIterator[np.ndarray],
+    window_seconds: float,
+    overlap_seconds: float,
+    silence_search_seconds: float = 0.0,
+) -> AsyncIterator[AudioWindow]:
+    """
+    Same cuts as split_windows, but over a stream of sample chunks: each window
+    is yielded as soon as enough audio has arrived, so memory stays bounded by
+    about one window whatever the total duration.
+    """
+    window = int(window_seconds * SAMPLE_RATE)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    search = int(silence_search_seconds * SAMPLE_RATE)
+    pending: List[np.ndarray] = []
+    pending_len = 0
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0  # sample index of buffer[0] in the whole stream
+    index = 0
+
+    async for chunk in chunks:
+        pending.append(chunk)
+        pending_len += len(chunk)
+        # Only cut once audio exists past the nominal end, as split_windows does
+        if len(buffer) + pending_len <= window:
+            continue
+        buffer = np.concatenate([buffer, *pending])
+        pending, pending_len = [], 0
+        while len(buffer) > window:
+            end = _quietest_frame(buffer, window - search, window) if search else window
+            yield AudioWindow(index, offset / SAMPLE_RATE, buffer[:end])
+            index += 1
+            start = max(end - overlap, 1)
+            buffer = buffer[start:].copy()
+            offset += start
+
+    buffer = np.concatenate([buffer, *pending])
+    if len(buffer):
+        yield AudioWindow(index, offset / SAMPLE_RATE, buffer)
+
+
+def _normalized(text: str) -> str:
+    return re.sub(r"[^\w]+", " ", text.lower()).strip()
+
+
+def stitch_segments(spans: List[Tuple[float, float]], results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Merge per-window segments (already shifted to absolute timestamps), given
+    the (start, end) span of each window in seconds.
+
+    In each overlap, segments starting before its midpoint are kept from the
+    earlier window and the others from the later one. A segment repeating the
+    previous kept text is then dropped.
+    """
+    merged: List[Dict[str, Any]] = []
+    for i, segments in enumerate(results):
+        lower = (spans[i][0] + spans[i - 1][1]) / 2 if i > 0 else float("-inf")
+        upper = (spans[i + 1][0] + spans[i][1]) / 2 if i + 1 < len(spans) else float("inf")
+        for segment in segments:
+            if not lower <= segment["start"] < upper:
+                continue
+            if merged and _normalized(merged[-1]["text"]) == _normalized(segment["text"]):
+                continue
+            merged.append(segment)
+    return merged
+
+
+class LongAudioTranscriber:
+    """
+    Transcribes long audio by fanning fixed windows out to the Whisper
+    inference pool, then stitching the segments back together.
+    """
+
+    def __init__(
+        self,
+        pool: WhisperInferencePool,
+        window_seconds: float,
+        overlap_seconds: float,
+        silence_search_seconds: float = 0.0,
+    ):
+        self.pool = pool
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.silence_search_seconds = silence_search_seconds
+
+    async def transcribe(self, audio: np.ndarray) -> Dict[str, Any]:
+        windows = split_windows(audio, self.window_seconds, self.overlap_seconds, self.silence_search_seconds)
+        logger.info(
+            f"Long audio mode: {len(audio) / SAMPLE_RATE:.0f}s split into {len(windows)} windows "
+            f"across {self.pool.workers} processes"
+        )
+        results = await asyncio.gather(*(
+            self.pool.transcribe_samples(window.samples, window.offset)
+            for window in windows
+        ))
+        return _result([(window.offset, window.end) for window in windows], results)
+
+    async def transcribe_stream(
+        self, chunks: AsyncIterator[np.ndarray], max_in_flight: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a stream of sample chunks (see audio_stream.pcm_chunks).
+
+        Windows are sent to the pool as soon as they are cut. Reading stops
+        while `max_in_flight` windows (default: one per worker) are waiting or
+        being transcribed, so at most that many windows plus the one being
+        filled are held in memory.
+        """
+        in_flight = asyncio.Semaphore(max_in_flight or self.pool.workers)
+        spans: List[Tuple[float, float]] = []
+        tasks: List[asyncio.Task] = []
+
+        async def run(window: AudioWindow) -> List[Dict[str, Any]]:
+            try:
+                return await self.pool.transcribe_samples(window.samples, window.offset)
+            finally:
+                in_flight.release()
+
+        windows = stream_windows(chunks, self.window_seconds, self.overlap_seconds, self.silence_search_seconds)
+        try:
+            async for window in windows:
+                await in_flight.acquire()
+                spans.append((window.offset, window.end))
+                tasks.append(asyncio.create_task(run(window)))
+                del window
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            await windows.aclose()
+
+        logger.info(f"Streamed {spans[-1][1] if spans else 0:.0f}s of audio in {len(spans)} windows")
+        return _result(spans, results)
+
+
+def _result(spans: List[Tuple[float, float]], results: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    segments = stitch_segments(spans, results)
+    return {
+        "text": "".join(segment["text"] for segment in segments).strip(),
+        "segments": segments,
+    }
@@ -1,243 +1,591 @@
-import os
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import tuple_, update
 from sqlalchemy.future import select
 from app.models.qa_history import QAHistory
+from app.models.qa_session import QASession
 from app.models.video import Video
 from app.schemas.qa import QuestionCreate
-from app.db.base import chroma_client
-from typing import Tuple, List, Dict, Any
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from typing import AsyncIterator, Tuple, List, Dict, Any, Optional, Union
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnableParallel, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.resources import AppResources
+from app.services.answer_cache import CachedAnswer
+from app.services.context_builder import ContextChunk
+from app.services.keyword_index import (
+    BM25Index, build_from_collection, load_keyword_index, store_missing_keyword_index
+)
+from app.services.qa_sessions import SessionMemory, Turn
+from app.services.qa_tracing import QATrace
+from app.services.vector_store import check_embedding_model
+import asyncio
 import logging
-from datetime import datetime
+import time
+from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+QA_PROMPT_TEMPLATE = """
+Tu es un assistant spécialisé dans la réponse aux questions sur des vidéos.
+Utilise uniquement le contexte fourni pour répondre à la question.
+Si tu ne peux pas répondre à la question avec le contexte donné, réponds "Je ne peux pas répondre à cette question avec le contexte disponible."
+
+Le contexte est divisé en segments numérotés. Tu peux te référer à ces segments dans ta réponse si nécessaire.
+Si tu cites un segment spécifique, indique son numéro entre crochets, par exemple: [Segment 1].
+Quand un segment indique sa plage horaire, cite le moment exact de la vidéo, par exemple: [03:25].
+
+Contexte:
+{context}
+
+Question: {question}
+
+Réponse:"""
+
+CONVERSATION_PROMPT_TEMPLATE = """
+Tu es un assistant spécialisé dans la réponse aux questions sur des vidéos.
+Utilise uniquement le contexte fourni pour répondre à la question.
+L'historique de la conversation sert seulement à comprendre la question; les faits doivent venir du contexte.
+Si tu ne peux pas répondre à la question avec le contexte donné, réponds "Je ne peux pas répondre à cette question avec le contexte disponible."
+
+Le contexte est divisé en segments numérotés. Tu peux te référer à ces segments dans ta réponse si nécessaire.
+Si tu cites un segment spécifique, indique son numéro entre crochets, par exemple: [Segment 1].
+Quand un segment indique sa plage horaire, cite le moment exact de la vidéo, par exemple: [03:25].
+
+Historique de la conversation:
+{history}
+
+Contexte:
+{context}
+
+Question: {question}
+
+Réponse:"""
+
+
+@dataclass
+class PreparedQuestion:
+    """Result of retrieval, ready to be sent to the LLM (or served from the answer cache)."""
+    video: Video
+    question: str
+    embedding: Optional[List[float]] = None
+    context: Optional[str] = None
+    context_tokens: Optional[int] = None  # tokens of `context`, as sent to the LLM
+    context_refs: Optional[Dict[str, Any]] = None  # what `context` was built from, as recorded in the history
+    cached: Optional[CachedAnswer] = None
+    query: Optional[str] = None  # standalone form of a follow-up question, used for retrieval and caching
+    session: Optional[SessionMemory] = None
+    history: Optional[str] = None  # conversation memory rendered for the prompt
+    trace: Optional[QATrace] = None
+
+
 class QAService:
-    def __init__(self, db: AsyncSession):
-        logger.info("Initializing QAService")
-        os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
+    def __init__(self, db: AsyncSession, resources: AppResources):
         self.db = db
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.OPENAI_EMBEDDING_MODEL,
-            openai_api_key=settings.OPENAI_API_KEY,
-            chunk_size=1000
-        )
-        self.llm = ChatOpenAI(
-            temperature=0,
-            model=settings.OPENAI_MODEL,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        self.embeddings = resources.embeddings
+        self.llm = resources.llm
+        self.vector_store = resources.vector_store
+        self.answer_cache = resources.answer_cache
+        self.retriever = resources.retriever
+        self.context_builder = resources.context_builder
+        self.keyword_indexes = resources.keyword_indexes
+        self.sessions = resources.session_memory
+        self.conversation = resources.conversation
+        self.tracer = resources.tracer
+        self.session_factory = resources.session_factory
         self.output_parser = StrOutputParser()
-        
-        # Create debug directory if it doesn't exist
-        os.makedirs("debug_qa", exist_ok=True)
 
-    async def debug_collection(self, video_id: UUID) -> None:
-        """Debug function to check ChromaDB collection state."""
+    async def dump_collection(self, video_id: UUID, limit: int = 100, offset: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Diagnostics dump of a video's ChromaDB collection, one page at a time.
+        Never called on the question path: only by the opt-in diagnostics endpoint.
+        """
         collection = await self.get_video_collection(video_id)
         if not collection:
-            logger.error("Collection not found")
-            return
-            
-        # Get collection info
-        collection_info = collection.get()
-        
-        debug_content = f"""
-{'='*80}
-DEBUG INFO - ChromaDB Collection State
-{'='*80}
-
-VIDEO ID: {video_id}
-TIMESTAMP: {datetime.now().isoformat()}
-COLLECTION NAME: {collection.name}
-
-Number of documents: {len(collection_info['ids'])}
-
-Documents and metadata:
-"""
-        
-        for i, (doc, meta) in enumerate(zip(collection_info['documents'], collection_info['metadatas'])):
-            debug_content += f"\n--- Document {i+1} ---\n"
-            debug_content += f"Metadata: {meta}\n"
-            debug_content += f"Content:\n{doc}\n"
-            debug_content += "-" * 40 + "\n"
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"debug_qa/collection_debug_{video_id}_{timestamp}.txt"
-        
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(debug_content)
-        logger.info(f"Collection debug information saved to {filename}")
-
-    def _save_debug_info(self, video_id: UUID, question: str, context: str, answer: str) -> None:
-        """Save debug information to a file for analysis."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"debug_qa/qa_debug_{video_id}_{timestamp}.txt"
-        
-        debug_content = f"""
-{'='*80}
-DEBUG INFO - Question/Answer Session
-{'='*80}
-
-VIDEO ID: {video_id}
-TIMESTAMP: {datetime.now().isoformat()}
-
-QUESTION:
-{question}
-
-{'='*80}
-CONTEXT:
-{context}
+            return None
+
+        page = await collection.get(limit=limit, offset=offset, include=["documents", "metadatas"])
+        return {
+            "video_id": str(video_id),
+            "collection_name": collection.name,
+            "total_documents": await collection.count(),
+            "offset": offset,
+            "limit": limit,
+            "documents": [
+                {"id": doc_id, "metadata": meta, "content": doc}
+                for doc_id, doc, meta in zip(page["ids"], page["documents"], page["metadatas"])
+            ],
+        }
 
-{'='*80}
-ANSWER:
-{answer}
-{'='*80}
-"""
-        
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(debug_content)
-        logger.info(f"Debug information saved to {filename}")
-
-    async def get_video_collection(self, video_id: UUID):
+    async def _get_video(self, video_id: UUID) -> Optional[Video]:
         result = await self.db.execute(
             select(Video).where(Video.id == video_id)
         )
         video = result.scalar_one_or_none()
         if not video:
             logger.warning(f"Video not found: {video_id}")
+        return video
+
+    async def _release_connection(self) -> None:
+        """
+        End the current read transaction so its connection goes back to the
+        pool before a slow call (embedding, LLM); the next query checks out
+        another one. Loaded objects stay usable (expire_on_commit=False).
+        Without this a question holds a pooled connection for its whole
+        generation, and the pool, not the database, caps concurrent questions.
+        """
+        await self.db.commit()
+
+    async def get_video_collection(self, video_id: UUID, video: Optional[Video] = None):
+        """
+        The video's collection. Raises EmbeddingModelMismatchError when it was
+        built with another embedding model than the configured one: querying it
+        with our vectors would return unrelated chunks.
+        """
+        video = video or await self._get_video(video_id)
+        if not video:
             return None
-        logger.info(f"Retrieved video collection: {video.chroma_collection_id}")
-        return chroma_client.get_collection(name=video.chroma_collection_id)
-
-    def _format_context(self, documents: List[str], metadatas: List[Dict[str, Any]]) -> str:
-        """Format the context by combining document content with their metadata."""
-        context_parts = []
-        for i, (doc, meta) in enumerate(zip(documents, metadatas), 1):
-            # Add metadata information if available
-            timestamp = meta.get('timestamp', 'N/A')
-            chunk_index = meta.get('chunk_index', i)
-            
-            # Format the segment header
-            header = f"\n{'='*50}\n"
-            header += f"SEGMENT {chunk_index}"
-            if timestamp != 'N/A':
-                header += f" (Timestamp: {timestamp})"
-            header += f"\n{'='*50}\n"
-            
-            # Add the formatted content
-            context_parts.append(f"{header}\n{doc.strip()}\n")
-        
-        formatted_context = "\n".join(context_parts)
-        logger.info(f"Formatted context ({len(documents)} segments):\n{formatted_context}")
-        return formatted_context
+        collection = await self.vector_store.get_video_collection(video)
+        logger.info(f"Retrieved video collection: {collection.name}")
+        check_embedding_model(collection, self.embeddings.model_name)
+        return collection
 
-    async def ask_question(self, question_in: QuestionCreate) -> QAHistory:
+    async def _keyword_index(self, video: Video, collection) -> Optional[BM25Index]:
+        """
+        The video's BM25 index: from the in-process cache, else from the database.
+        Videos indexed before keyword indexes existed get one built from their
+        collection in the background; their questions use vector retrieval
+        until it is ready.
+        """
+        index = self.keyword_indexes.get(video.id, video.updated_at)
+        if index is not None:
+            return index
+        index = await load_keyword_index(self.db, video.id)
+        if index is None:
+            version = video.updated_at
+            self.keyword_indexes.build_in_background(
+                video.id, version, lambda: self._build_keyword_index(video.id, version, collection)
+            )
+            return None
+        self.keyword_indexes.put(video.id, video.updated_at, index)
+        return index
+
+    async def _build_keyword_index(self, video_id: UUID, version: Any, collection) -> Optional[BM25Index]:
+        """
+        Index of the chunks in the collection, stored unless the video changed
+        while it was built (None then: the fresher index wins).
+        """
+        index = await build_from_collection(collection)
+        # Outlives the request: uses its own session
+        async with self.session_factory() as db:
+            video = await db.get(Video, video_id)
+            if video is None or video.updated_at != version:
+                logger.info(f"Video {video_id} changed while its keyword index was built, discarding it")
+                return None
+            if not await store_missing_keyword_index(db, video_id, index):
+                logger.info(f"Video {video_id} was re-indexed while its keyword index was built, discarding it")
+                return None
+        logger.info(f"Built missing keyword index for video {video_id} ({len(index)} chunks)")
+        return index
+
+    async def _warm_answer_cache(self, video: Video) -> None:
+        """Seed the answer cache from the history recorded since the video was last updated."""
+        if self.answer_cache.is_warm(video.id, video.updated_at):
+            return
+        query = (
+            select(QAHistory)
+            # Follow-up questions of a session only make sense within their conversation
+            .where(QAHistory.video_id == video.id, QAHistory.from_session.is_(False))
+            .order_by(QAHistory.created_at.desc())
+            .limit(settings.ANSWER_CACHE_WARM_ROWS)
+        )
+        if video.updated_at is not None:
+            query = query.where(QAHistory.created_at >= video.updated_at)
+        rows = list(reversed((await self.db.execute(query)).scalars().all()))
+        await self._release_connection()
+        embeddings = await self.embeddings.embed_documents([row.question for row in rows])
+        self.answer_cache.warm(
+            video.id,
+            video.updated_at,
+            [(row.question, emb, row.answer, row.context_refs) for row, emb in zip(rows, embeddings)]
+        )
+        logger.info(f"Answer cache warmed with {len(rows)} entries for video {video.id}")
+
+    async def _lookup_cached_answer(
+        self, video: Video, question: str, question_embedding: Optional[List[float]]
+    ) -> Optional[CachedAnswer]:
+        """Exact tier when no embedding is given yet, similarity tier otherwise."""
+        if self.answer_cache is None:
+            return None
+        if question_embedding is None:
+            await self._warm_answer_cache(video)
+            hit = self.answer_cache.lookup_exact(video.id, video.updated_at, question)
+            if hit:
+                logger.info("Answer cache hit (exact)")
+            return hit
+        similar = self.answer_cache.lookup_similar(video.id, video.updated_at, question_embedding)
+        if similar:
+            logger.info(f"Answer cache hit (similarity {similar[1]:.3f}): {similar[0].question}")
+            return similar[0]
+        return None
+
+    async def _save_history(
+        self,
+        video_id: UUID,
+        question: str,
+        answer: str,
+        context_refs: Optional[Dict[str, Any]],
+        context_tokens: Optional[int] = None,
+        session: Optional[SessionMemory] = None
+    ) -> QAHistory:
+        # The context text is not stored: its chunk ids and scores are enough to trace an answer
+        qa_history = QAHistory(
+            video_id=video_id,
+            session_id=session.session_id if session else None,
+            from_session=session is not None,
+            question=question,
+            answer=answer,
+            context_refs=context_refs,
+            context_tokens=context_tokens
+        )
+        self.db.add(qa_history)
+        if session is not None:
+            # Same transaction as the turn, so the counter always matches the session's qa_history rows
+            await self.db.execute(
+                update(QASession)
+                .where(QASession.id == session.session_id)
+                .values(turn_count=QASession.turn_count + 1)
+            )
+        await self.db.commit()
+        await self.db.refresh(qa_history)
+        if session is not None:
+            session.turns.append(Turn(question, answer))
+            session.turn_count += 1
+            self.sessions.put(session)
+        return qa_history
+
+    async def create_session(self, video_id: UUID) -> QASession:
+        if not await self._get_video(video_id):
+            raise ValueError("Video not found")
+        session = QASession(video_id=video_id, turn_count=0, summarized_turns=0)
+        self.db.add(session)
+        await self.db.commit()
+        await self.db.refresh(session)
+        return session
+
+    async def get_session(self, session_id: UUID) -> Optional[QASession]:
+        return await self.db.get(QASession, session_id)
+
+    async def get_session_turns(self, session_id: UUID, limit: int) -> List[QAHistory]:
+        result = await self.db.execute(
+            select(QAHistory)
+            .where(QAHistory.session_id == session_id)
+            .order_by(QAHistory.created_at.desc())
+            .limit(limit)
+        )
+        return list(reversed(result.scalars().all()))
+
+    async def delete_session(self, session_id: UUID) -> bool:
+        """Delete a session; its turns stay in the video's history."""
+        session = await self.db.get(QASession, session_id)
+        if session is None:
+            return False
+        await self.db.delete(session)
+        await self.db.commit()
+        self.sessions.invalidate(session_id)
+        return True
+
+    async def _session_memory(self, session_id: UUID, video: Video) -> SessionMemory:
+        """
+        The session's memory, from the in-process cache when it is up to date,
+        else rebuilt from qa_sessions and the turns not yet summarized.
+        """
+        row = await self.db.get(QASession, session_id)
+        if row is None or row.video_id != video.id:
+            raise ValueError("Session not found")
+        memory = self.sessions.get(session_id, (row.turn_count, row.summarized_turns))
+        if memory is not None:
+            return memory
+
+        pending = row.turn_count - row.summarized_turns
+        turns: List[QAHistory] = await self.get_session_turns(session_id, pending) if pending > 0 else []
+        memory = SessionMemory(
+            session_id=session_id,
+            video_id=video.id,
+            summary=row.summary,
+            summarized_turns=row.summarized_turns,
+            turn_count=row.turn_count,
+            turns=[Turn(turn.question, turn.answer) for turn in turns],
+        )
+        self.sessions.put(memory)
+        logger.info(f"Loaded session {session_id}: {row.turn_count} turns, {row.summarized_turns} summarized")
+        return memory
+
+    async def _compact_session(self, session: SessionMemory) -> None:
+        """
+        Fold the turns that left the memory window into the rolling summary.
+        A failure only delays it: the turns stay pending and the next turn retries.
+        """
         try:
-            logger.info(f"Processing question: {question_in.question}")
-            
-            # Debug collection state
-            await self.debug_collection(question_in.video_id)
-            
-            # Get video collection
-            collection = await self.get_video_collection(question_in.video_id)
-            if not collection:
+            if not await self.conversation.compact(session):
+                return
+            await self.db.execute(
+                update(QASession)
+                .where(QASession.id == session.session_id)
+                .values(summary=session.summary, summarized_turns=session.summarized_turns)
+            )
+            await self.db.commit()
+            self.sessions.put(session)
+        except Exception as e:
+            await self.db.rollback()
+            self.sessions.invalidate(session.session_id)
+            logger.warning(f"Could not summarize session {session.session_id}: {str(e)}")
+
+    async def _fetch_neighbours(self, collection, hits: List[ContextChunk]) -> List[ContextChunk]:
+        """
+        Chunks whose time range falls within QA_NEIGHBOUR_WINDOW_SECONDS of a hit, hits excluded.
+        Only needs timestamp metadata, so it is a single filtered get() bounded by top-k.
+        """
+        window = settings.QA_NEIGHBOUR_WINDOW_SECONDS
+        timed = [hit.metadata for hit in hits if "start" in hit.metadata and "end" in hit.metadata]
+        if window <= 0 or not timed:
+            return []
+
+        clauses = [
+            {"$and": [{"start": {"$lte": meta["end"] + window}}, {"end": {"$gte": meta["start"] - window}}]}
+            for meta in timed
+        ]
+        where = clauses[0] if len(clauses) == 1 else {"$or": clauses}
+        found = await collection.get(where=where, include=["documents", "metadatas"])
+
+        hit_ids = {hit.id for hit in hits}
+        neighbours = [
+            ContextChunk(doc_id, doc, meta)
+            for doc_id, doc, meta in zip(found["ids"], found["documents"], found["metadatas"])
+            if doc_id not in hit_ids
+        ]
+        logger.info(f"Neighbour expansion: {len(neighbours)} candidate chunks around {len(hits)} hits")
+        return neighbours
+
+    def _new_trace(self, question_in: QuestionCreate) -> QATrace:
+        if self.tracer is None:
+            return QATrace(question_in.video_id, question_in.question)
+        return self.tracer.new_trace(question_in.video_id, question_in.question)
+
+    def _record_trace(self, prepared: PreparedQuestion, answer: str) -> None:
+        if self.tracer is None:
+            return
+        trace = prepared.trace
+        trace.answer = answer
+        trace.context_refs = prepared.cached.context_refs if prepared.cached else prepared.context_refs
+        trace.context_tokens = prepared.context_tokens
+        self.tracer.record(trace)
+
+    async def prepare_question(self, question_in: QuestionCreate) -> PreparedQuestion:
+        """Everything before generation: cache lookups, retrieval and context formatting."""
+        logger.info(f"Processing question: {question_in.question}")
+        trace = self._new_trace(question_in)
+
+        with trace.stage("load"):
+            video = await self._get_video(question_in.video_id)
+            if not video:
                 raise ValueError("Video not found")
 
-            # Get collection info
-            collection_info = collection.get()
-            logger.info(f"Collection size: {len(collection_info['ids'])} documents")
+            # Follow-ups are retrieved (and cached) under their standalone form
+            session, history, query = None, None, question_in.question
+            if question_in.session_id is not None:
+                session = await self._session_memory(question_in.session_id, video)
+                trace.session_id = session.session_id
+        if session is not None and session.has_history:
+            await self._release_connection()
+            with trace.stage("rewrite"):
+                history = self.conversation.render(session)
+                query = await self.conversation.rewrite(history, question_in.question)
+            logger.info(f"Follow-up rewritten as: {query}")
+        trace.query = query
+        conversation = {"query": query, "session": session, "history": history, "trace": trace}
+
+        with trace.stage("answer_cache"):
+            cached = await self._lookup_cached_answer(video, query, None)
+        if cached:
+            trace.cache = "exact"
+            return PreparedQuestion(video, question_in.question, cached=cached, **conversation)
+
+        await self._release_connection()
 
-            # Generate embeddings for the question
-            question_embedding = self.embeddings.embed_query(question_in.question)
-            logger.info("Generated question embedding")
+        # Get video collection
+        collection = await self.get_video_collection(video.id, video)
 
-            # Search for relevant context using similarity search
-            results = collection.query(
-                query_embeddings=[question_embedding],
-                n_results=3,
-                include=["documents", "metadatas"]
+        # Generate embeddings for the question
+        with trace.stage("embedding"):
+            question_embedding = await self.embeddings.embed_query(query)
+        logger.info("Generated question embedding")
+
+        with trace.stage("answer_cache"):
+            cached = await self._lookup_cached_answer(video, query, question_embedding)
+        if cached:
+            trace.cache = "similar"
+            return PreparedQuestion(video, question_in.question, question_embedding, cached=cached, **conversation)
+
+        # Search for relevant context (vector, or vector + BM25 fused)
+        with trace.stage("retrieval"):
+            keyword_index = await self._keyword_index(video, collection) if self.retriever.hybrid else None
+            retrieved = await self.retriever.retrieve(collection, query, question_embedding, keyword_index)
+
+        logger.info(f"Found {len(retrieved.documents)} relevant documents")
+
+        # Hits, then their neighbours, merged and deduplicated within the token budget
+        hits = [
+            ContextChunk(chunk_id, doc, meta)
+            for chunk_id, doc, meta in zip(retrieved.ids, retrieved.documents, retrieved.metadatas)
+        ]
+        with trace.stage("context"):
+            neighbours = await self._fetch_neighbours(collection, hits)
+            built = await asyncio.to_thread(self.context_builder.build, hits, neighbours)
+        context, context_tokens = built.text, built.tokens
+        hit_scores = dict(zip(retrieved.ids, retrieved.scores))
+        context_refs = {
+            "mode": self.retriever.mode if keyword_index is not None else "vector",
+            # [chunk id, retrieval score] in context order; neighbour chunks have no score
+            "chunks": [[chunk_id, hit_scores.get(chunk_id)] for chunk_id in built.chunk_ids],
+        }
+
+        if not context:
+            logger.warning("No context found for the question")
+            context = "Aucun contexte trouvé dans la vidéo."
+            context_tokens = self.context_builder.counter.count(context)
+
+        # The keyword index may have been read: no connection held during generation
+        await self._release_connection()
+
+        return PreparedQuestion(
+            video, question_in.question, question_embedding, context, context_tokens, context_refs, **conversation
+        )
+
+    def _build_chain(self, prepared: PreparedQuestion):
+        template = CONVERSATION_PROMPT_TEMPLATE if prepared.history else QA_PROMPT_TEMPLATE
+        prompt = ChatPromptTemplate.from_template(template)
+        return prompt | self.llm | self.output_parser
+
+    @staticmethod
+    def _chain_input(prepared: PreparedQuestion) -> Dict[str, str]:
+        chain_input = {"context": prepared.context, "question": prepared.question}
+        if prepared.history:
+            chain_input["history"] = prepared.history
+        return chain_input
+
+    async def _finish(self, prepared: PreparedQuestion, answer: str) -> QAHistory:
+        """Record a freshly generated answer."""
+        logger.info(f"Generated answer: {answer}")
+
+        if self.answer_cache is not None:
+            self.answer_cache.store(
+                prepared.video.id,
+                prepared.video.updated_at,
+                prepared.query or prepared.question,
+                prepared.embedding,
+                answer,
+                prepared.context_refs
             )
-            
-            logger.info(f"Found {len(results['documents'][0])} relevant documents")
-
-            # Format context with metadata
-            context = self._format_context(
-                results["documents"][0],
-                results["metadatas"][0]
-            ) if results["documents"] else ""
-
-            if not context:
-                logger.warning("No context found for the question")
-                context = "Aucun contexte trouvé dans la vidéo."
-
-            # Define the prompt template
-            template = """
-            Tu es un assistant spécialisé dans la réponse aux questions sur des vidéos.
-            Utilise uniquement le contexte fourni pour répondre à la question.
-            Si tu ne peux pas répondre à la question avec le contexte donné, réponds "Je ne peux pas répondre à cette question avec le contexte disponible."
-            
-            Le contexte est divisé en segments numérotés. Tu peux te référer à ces segments dans ta réponse si nécessaire.
-            Si tu cites un segment spécifique, indique son numéro entre crochets, par exemple: [Segment 1].
-
-            Contexte:
-            {context}
-
-            Question: {question}
-
-            Réponse:"""
-
-            # Create the prompt
-            prompt = ChatPromptTemplate.from_template(template)
-
-            # Create the chain
-            chain = (
-                {"context": RunnablePassthrough(), "question": RunnablePassthrough()}
-                | prompt
-                | self.llm
-                | self.output_parser
+
+        # Save to history
+        with prepared.trace.stage("save"):
+            history = await self._save_history(
+                prepared.video.id,
+                prepared.question,
+                answer,
+                prepared.context_refs,
+                prepared.context_tokens,
+                prepared.session
             )
+        self._record_trace(prepared, answer)
+        return history
 
-            # Get the answer
-            answer = await chain.ainvoke({
-                "context": context,
-                "question": question_in.question
-            })
-            
-            logger.info(f"Generated answer: {answer}")
-            
-            # Save debug information
-            self._save_debug_info(question_in.video_id, question_in.question, context, answer)
-
-            # Save to history
-            qa_history = QAHistory(
-                video_id=question_in.video_id,
-                question=question_in.question,
-                answer=answer,
-                context=context
+    async def _finish_cached(self, prepared: PreparedQuestion) -> QAHistory:
+        """Record an answer served from the answer cache."""
+        with prepared.trace.stage("save"):
+            history = await self._save_history(
+                prepared.video.id,
+                prepared.question,
+                prepared.cached.answer,
+                prepared.cached.context_refs,
+                session=prepared.session
             )
-            self.db.add(qa_history)
-            await self.db.commit()
-            await self.db.refresh(qa_history)
-            
-            return qa_history
+        self._record_trace(prepared, prepared.cached.answer)
+        return history
+
+    async def ask_question(self, question_in: QuestionCreate) -> QAHistory:
+        try:
+            prepared = await self.prepare_question(question_in)
+            if prepared.cached:
+                history = await self._finish_cached(prepared)
+            else:
+                # Get the answer
+                with prepared.trace.stage("generation"):
+                    answer = await self._build_chain(prepared).ainvoke(self._chain_input(prepared))
+                history = await self._finish(prepared, answer)
+
+            if prepared.session is not None:
+                await self._compact_session(prepared.session)
+            return history
 
         except Exception as e:
             logger.error(f"Error in ask_question: {str(e)}", exc_info=True)
             raise
 
-    async def get_video_history(self, video_id: UUID) -> list[QAHistory]:
-        result = await self.db.execute(
+    async def stream_answer(self, prepared: PreparedQuestion) -> AsyncIterator[Tuple[str, Union[str, QAHistory]]]:
+        """
+        Yield ("token", text) events as the model produces them, then a single
+        ("done", QAHistory) once the answer is complete and persisted.
+        Nothing is persisted if the consumer stops early.
+        """
+        trace = prepared.trace
+        trace.streamed = True
+        if prepared.cached:
+            yield "token", prepared.cached.answer
+            yield "done", await self._finish_cached(prepared)
+        else:
+            parts: List[str] = []
+            start = time.perf_counter()
+            async for token in self._build_chain(prepared).astream(self._chain_input(prepared)):
+                if token:
+                    if not parts:
+                        trace.add("first_token", time.perf_counter() - start)
+                    parts.append(token)
+                    yield "token", token
+            # Includes the time the consumer took to read the tokens
+            trace.add("generation", time.perf_counter() - start)
+
+            yield "done", await self._finish(prepared, "".join(parts))
+
+        # After `done`, so summarizing the session does not delay the answer
+        if prepared.session is not None:
+            await self._compact_session(prepared.session)
+
+    async def get_video_history(
+        self, video_id: UUID, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[QAHistory], Optional[str]]:
+        """
+        A page of the video's history, newest first, and the cursor of the next
+        page (None on the last one). Keyset-paginated on (created_at, id), so
+        every page is an index range scan of ix_qa_history_video_id_created_at.
+        """
+        query = (
             select(QAHistory)
             .where(QAHistory.video_id == video_id)
-            .order_by(QAHistory.created_at.desc())
+            .order_by(QAHistory.created_at.desc(), QAHistory.id.desc())
+            .limit(limit + 1)
         )
-        return result.scalars().all()
+        if cursor:
+            created_at, row_id = decode_cursor(cursor)
+            query = query.where(tuple_(QAHistory.created_at, QAHistory.id) < tuple_(created_at, row_id))
+        rows = list((await self.db.execute(query)).scalars().all())
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return rows[:limit], next_cursor
 
     async def askQuestion(self, video_id: UUID, question: str) -> Tuple[str, float]:
         """
@@ -0,0 +1,158 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from langchain.prompts import ChatPromptTemplate
+from langchain_core.language_models import BaseChatModel
+from langchain_core.output_parsers import StrOutputParser
+
+from app.services.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+CONDENSE_PROMPT_TEMPLATE = """
+Voici l'historique d'une conversation à propos d'une vidéo, suivi d'une nouvelle question.
+Reformule la nouvelle question en une question autonome, compréhensible sans l'historique
+(remplace les pronoms et les références implicites par ce qu'ils désignent).
+Si elle est déjà autonome, recopie-la telle quelle. Réponds uniquement par la question.
+
+Historique:
+{history}
+
+Nouvelle question: {question}
+
+Question autonome:"""
+
+SUMMARY_PROMPT_TEMPLATE = """
+Tu tiens à jour le résumé d'une conversation à propos d'une vidéo.
+Intègre les nouveaux échanges au résumé existant, en {max_words} mots au maximum.
+Conserve les sujets abordés, les faits établis et les moments de la vidéo cités; omets les formules de politesse.
+
+Résumé existant:
+{summary}
+
+Nouveaux échanges:
+{turns}
+
+Nouveau résumé:"""
+
+
+@dataclass
+class Turn:
+    question: str
+    answer: str
+
+
+@dataclass
+class SessionMemory:
+    """What a QA session remembers: a rolling summary, then the turns not folded into it yet (oldest first)."""
+    session_id: UUID
+    video_id: UUID
+    summary: Optional[str] = None
+    summarized_turns: int = 0
+    turn_count: int = 0
+    turns: List[Turn] = field(default_factory=list)
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        return self.turn_count, self.summarized_turns
+
+    @property
+    def has_history(self) -> bool:
+        return bool(self.summary or self.turns)
+
+
+class SessionMemoryCache:
+    """
+    Memory of the most recently used sessions. Entries are tagged with the
+    session's turn and summary counters, so a session updated by another
+    process is reloaded from the database instead of being served stale.
+    """
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self._entries: "OrderedDict[UUID, SessionMemory]" = OrderedDict()
+
+    def get(self, session_id: UUID, version: Tuple[int, int]) -> Optional[SessionMemory]:
+        memory = self._entries.get(session_id)
+        if memory is None or memory.version != version:
+            return None
+        self._entries.move_to_end(session_id)
+        return memory
+
+    def put(self, memory: SessionMemory) -> None:
+        self._entries[memory.session_id] = memory
+        self._entries.move_to_end(memory.session_id)
+        while len(self._entries) > self.max_sessions:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, session_id: UUID) -> None:
+        self._entries.pop(session_id, None)
+
+
+class ConversationMemory:
+    """
+    Bounded conversation history for the QA prompt.
+
+    The prompt gets the rolling summary (at most `summary_max_tokens`) and the
+    last `window_turns` turns (each at most `turn_max_tokens`), so its size
+    does not grow with the length of the session. Older turns are folded into
+    the summary by `compact`.
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        counter: TokenCounter,
+        window_turns: int = 4,
+        summary_max_tokens: int = 300,
+        turn_max_tokens: int = 400,
+    ):
+        self.llm = llm
+        self.counter = counter
+        self.window_turns = window_turns
+        self.summary_max_tokens = summary_max_tokens
+        self.turn_max_tokens = turn_max_tokens
+        self.output_parser = StrOutputParser()
+
+    def _render_turn(self, turn: Turn) -> str:
+        return self.counter.truncate(f"Utilisateur: {turn.question}\nAssistant: {turn.answer}", self.turn_max_tokens)
+
+    def render(self, memory: SessionMemory) -> str:
+        parts = []
+        if memory.summary:
+            parts.append(f"Résumé des échanges précédents: {memory.summary}")
+        window = memory.turns[-self.window_turns:] if self.window_turns > 0 else []
+        parts.extend(self._render_turn(turn) for turn in window)
+        return "\n\n".join(parts)
+
+    async def rewrite(self, history: str, question: str) -> str:
+        """`question` rewritten as a standalone retrieval query, given the rendered history."""
+        chain = ChatPromptTemplate.from_template(CONDENSE_PROMPT_TEMPLATE) | self.llm | self.output_parser
+        rewritten = (await chain.ainvoke({"history": history, "question": question})).strip()
+        return self.counter.truncate(rewritten, self.turn_max_tokens) if rewritten else question
+
+    async def compact(self, memory: SessionMemory) -> bool:
+        """Fold the turns that left the window into the summary. Returns whether the memory changed."""
+        overflow = len(memory.turns) - self.window_turns
+        if overflow <= 0:
+            return False
+
+        folded = memory.turns[:overflow]
+        chain = ChatPromptTemplate.from_template(SUMMARY_PROMPT_TEMPLATE) | self.llm | self.output_parser
+        summary = await chain.ainvoke({
+            "summary": memory.summary or "(aucun)",
+            "turns": "\n\n".join(self._render_turn(turn) for turn in folded),
+            # ~0.75 word per token; the hard limit is the truncation below
+            "max_words": max(self.summary_max_tokens * 3 // 4, 20),
+        })
+        memory.summary = self.counter.truncate(summary.strip(), self.summary_max_tokens)
+        memory.summarized_turns += overflow
+        memory.turns = memory.turns[overflow:]
+        logger.info(
+            f"Session {memory.session_id}: folded {overflow} turns into the summary "
+            f"({memory.summarized_turns} summarized, {len(memory.turns)} in the window)"
+        )
+        return True
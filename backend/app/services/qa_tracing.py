@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from app.services.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE = "qa_traces.jsonl"
+
+
+@dataclass
+class QATrace:
+    """
+    What happened while answering one question. Stage latencies are
+    accumulated in milliseconds; the context is recorded as chunk ids and
+    retrieval scores, like context_refs in the history.
+    """
+    video_id: UUID
+    question: str
+    sampled: bool = False
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    session_id: Optional[UUID] = None
+    query: Optional[str] = None  # standalone form of a follow-up question
+    cache: Optional[str] = None  # "exact" or "similar" on an answer cache hit
+    context_refs: Optional[Dict[str, Any]] = None
+    context_tokens: Optional[int] = None
+    answer: Optional[str] = None
+    streamed: bool = False
+    stages: Dict[str, float] = field(default_factory=dict)
+    total_ms: Optional[float] = None  # set when the trace is recorded
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds * 1000
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def to_record(self, counter: Optional[TokenCounter] = None) -> Dict[str, Any]:
+        refs = self.context_refs or {}
+        chunks = refs.get("chunks") or []
+        return {
+            "trace_id": self.trace_id,
+            "created_at": self.created_at.isoformat(),
+            "video_id": str(self.video_id),
+            "session_id": str(self.session_id) if self.session_id else None,
+            "question": self.question,
+            "query": self.query if self.query != self.question else None,
+            "cache": self.cache,
+            "retrieval_mode": refs.get("mode"),
+            "chunk_ids": [chunk[0] for chunk in chunks],
+            "scores": [chunk[1] for chunk in chunks],
+            "context_tokens": self.context_tokens,
+            "answer": self.answer,
+            "answer_tokens": counter.count(self.answer) if counter is not None and self.answer else None,
+            "streamed": self.streamed,
+            "stages_ms": {name: round(ms, 2) for name, ms in self.stages.items()},
+            "total_ms": round(self.total_ms, 2) if self.total_ms is not None else None,
+        }
+
+
+class JsonlTraceSink:
+    """
+    Appends records as JSON lines to `directory/qa_traces.jsonl`. The file is
+    rotated to .1, .2... once it reaches `max_bytes` and only `backups` full
+    files are kept, so the traces never take more than
+    (backups + 1) * max_bytes. Blocking: called from the tracer's thread.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, backups: int):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, TRACE_FILE)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        # The writer's batch may still be in flight when the tracer flushes on shutdown
+        self._lock = threading.Lock()
+
+    def _rotate(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        data = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records)
+        with self._lock:
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            if size and size + len(data.encode("utf-8")) > self.max_bytes:
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+
+
+class QATracer:
+    """
+    Sampled question tracing, off the request path.
+
+    `new_trace` decides whether a question is traced (`sample_rate`); `record`
+    only puts sampled traces on a bounded queue, and drops them when it is
+    full rather than slowing the request down. A background task writes the
+    queue to the sink in batches of `batch_size`, or every `flush_interval`
+    seconds, in a thread; answer tokens are counted there too.
+    """
+
+    def __init__(
+        self,
+        sink: JsonlTraceSink,
+        sample_rate: float,
+        counter: Optional[TokenCounter] = None,
+        queue_size: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+    ):
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.counter = counter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._reported_drops = 0
+        self._queue: "asyncio.Queue[QATrace]" = asyncio.Queue(maxsize=queue_size)
+        self._task: Optional[asyncio.Task] = None
+
+    def new_trace(self, video_id: UUID, question: str) -> QATrace:
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        return QATrace(video_id, question, sampled=sampled)
+
+    def record(self, trace: QATrace) -> None:
+        if not trace.sampled:
+            return
+        trace.total_ms = (time.perf_counter() - trace._start) * 1000
+        try:
+            self._queue.put_nowait(trace)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def start(self) -> None:
+        """Start the background writer; needs a running event loop."""
+        self._task = asyncio.create_task(self._writer(), name="qa-tracer")
+        logger.info(f"QA tracing enabled: {self.sample_rate:.0%} of questions to {self.sink.path}")
+
+    async def _writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        batch: List[QATrace] = []
+        try:
+            while True:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                # A batch handed to the thread is written even if the task is cancelled meanwhile
+                pending, batch = batch, []
+                await self._flush(pending)
+        except asyncio.CancelledError:
+            if batch:
+                await self._flush(batch)
+            raise
+
+    async def _flush(self, batch: List[QATrace]) -> None:
+        if self.dropped > self._reported_drops:
+            logger.warning(f"QA trace queue full: {self.dropped - self._reported_drops} traces dropped")
+            self._reported_drops = self.dropped
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} QA traces: {str(e)}")
+
+    def _write(self, batch: List[QATrace]) -> None:
+        self.sink.write([trace.to_record(self.counter) for trace in batch])
+
+    async def stop(self) -> None:
+        """Stop the writer and flush what is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        batch = []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch:
+            await self._flush(batch)
@@ -0,0 +1,117 @@
+import logging
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from chromadb.api.models.AsyncCollection import AsyncCollection
+
+from app.services.chunking import Chunk
+from app.services.embedding_cache import text_hash
+from app.services.embedding_scheduler import ProgressCallback
+
+logger = logging.getLogger(__name__)
+
+# Page size used to list the ids already in a collection
+_LIST_PAGE = 1000
+
+
+def chunk_ids(chunks: List[Chunk]) -> List[str]:
+    """
+    Content-addressed ids: the hash of the chunk text, suffixed with its
+    occurrence number when the same text appears more than once. Inserting or
+    removing a chunk leaves the ids of every other chunk unchanged.
+    """
+    seen: Counter = Counter()
+    ids = []
+    for chunk in chunks:
+        digest = text_hash(chunk.text)[:32]
+        ids.append(f"{digest}-{seen[digest]}" if seen[digest] else digest)
+        seen[digest] += 1
+    return ids
+
+
+@dataclass
+class ReindexReport:
+    added: int = 0  # new or changed text, embedded
+    updated: int = 0  # same text, only the metadata (position, timestamps) changed
+    unchanged: int = 0
+    deleted: int = 0
+
+    @property
+    def embeddings_saved(self) -> int:
+        return self.updated + self.unchanged
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.deleted)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {**asdict(self), "embeddings_saved": self.embeddings_saved}
+
+
+async def _existing_metadatas(collection: AsyncCollection) -> Dict[str, Dict[str, Any]]:
+    existing: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    while True:
+        page = await collection.get(limit=_LIST_PAGE, offset=offset, include=["metadatas"])
+        existing.update(zip(page["ids"], page["metadatas"] or [{}] * len(page["ids"])))
+        if len(page["ids"]) < _LIST_PAGE:
+            return existing
+        offset += _LIST_PAGE
+
+
+async def reindex_collection(
+    collection: AsyncCollection,
+    chunks: List[Chunk],
+    embeddings: Any,
+    base_metadata: Dict[str, Any],
+    progress: Optional[ProgressCallback] = None,
+) -> ReindexReport:
+    """
+    Bring `collection` in line with `chunks` by diffing on content-addressed ids:
+    only new texts are embedded and upserted, chunks that only moved get a
+    metadata update, and chunks that disappeared are deleted once the new ones
+    are in.
+    """
+    ids = chunk_ids(chunks)
+    metadatas = [{**base_metadata, **chunk.metadata()} for chunk in chunks]
+    existing = await _existing_metadatas(collection)
+    report = ReindexReport()
+
+    new_positions = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing]
+    moved_positions = [
+        i for i, chunk_id in enumerate(ids)
+        if chunk_id in existing and existing[chunk_id] != metadatas[i]
+    ]
+    removed_ids = list(existing.keys() - set(ids))
+
+    if new_positions:
+        documents = [chunks[i].text for i in new_positions]
+        vectors = await embeddings.embed_documents(documents, progress=progress)
+        await collection.upsert(
+            ids=[ids[i] for i in new_positions],
+            documents=documents,
+            embeddings=vectors,
+            metadatas=[metadatas[i] for i in new_positions],
+        )
+        report.added = len(new_positions)
+
+    if moved_positions:
+        await collection.update(
+            ids=[ids[i] for i in moved_positions],
+            metadatas=[metadatas[i] for i in moved_positions],
+        )
+        report.updated = len(moved_positions)
+
+    # Last: if embedding fails above, the collection still holds the previous version whole
+    if removed_ids:
+        await collection.delete(ids=removed_ids)
+        report.deleted = len(removed_ids)
+
+    report.unchanged = len(chunks) - report.added - report.updated
+    logger.info(
+        f"Reindexed {collection.name}: {report.added} added, {report.updated} metadata-only, "
+        f"{report.unchanged} unchanged, {report.deleted} deleted "
+        f"({report.embeddings_saved} embeddings saved)"
+    )
+    return report
@@ -0,0 +1,101 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.services.keyword_index import BM25Index, reciprocal_rank_fusion
+
+logger = logging.getLogger(__name__)
+
+VECTOR_MODE = "vector"
+HYBRID_MODE = "hybrid"
+
+
+@dataclass
+class RetrievedChunks:
+    ids: List[str] = field(default_factory=list)
+    documents: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+    # Vector mode: distance (lower is closer). Hybrid mode: fused RRF score (higher is better)
+    scores: List[float] = field(default_factory=list)
+
+
+class Retriever:
+    """
+    Chunk retrieval for a question within one video's collection.
+
+    - vector: the `top_k` nearest chunks.
+    - hybrid: the `candidates` nearest chunks and the `candidates` best BM25
+      chunks, merged with reciprocal rank fusion, keeping the `top_k` best.
+      Chunks found only by BM25 are fetched from the collection by id.
+      Without a keyword index (video indexed before it existed), this falls
+      back to vector retrieval.
+    """
+
+    def __init__(
+        self,
+        mode: str = HYBRID_MODE,
+        top_k: int = 3,
+        candidates: int = 20,
+        rrf_k: int = 60,
+        keyword_weight: float = 1.0,
+    ):
+        if mode not in (VECTOR_MODE, HYBRID_MODE):
+            raise ValueError(f"Unknown RETRIEVAL_MODE: {mode}")
+        self.mode = mode
+        self.top_k = top_k
+        self.candidates = max(candidates, top_k)
+        self.rrf_k = rrf_k
+        self.keyword_weight = keyword_weight
+
+    @property
+    def hybrid(self) -> bool:
+        return self.mode == HYBRID_MODE
+
+    async def retrieve(
+        self,
+        collection,
+        question: str,
+        embedding: List[float],
+        keyword_index: Optional[BM25Index] = None,
+    ) -> RetrievedChunks:
+        hybrid = self.hybrid and keyword_index is not None
+        results = await collection.query(
+            query_embeddings=[embedding],
+            n_results=self.candidates if hybrid else self.top_k,
+            include=["documents", "metadatas", "distances"]
+        )
+        found = {
+            chunk_id: (doc, meta)
+            for chunk_id, doc, meta in zip(results["ids"][0], results["documents"][0], results["metadatas"][0])
+        }
+        if not hybrid:
+            return RetrievedChunks(
+                list(found),
+                [doc for doc, _ in found.values()],
+                [meta for _, meta in found.values()],
+                list(results["distances"][0]),
+            )
+
+        keyword_ids = [chunk_id for chunk_id, _ in keyword_index.search(question, self.candidates)]
+        fused = reciprocal_rank_fusion(
+            [results["ids"][0], keyword_ids], k=self.rrf_k, weights=[1.0, self.keyword_weight]
+        )
+        fused_scores = dict(fused[:self.top_k])
+        selected = list(fused_scores)
+
+        missing = [chunk_id for chunk_id in selected if chunk_id not in found]
+        if missing:
+            extra = await collection.get(ids=missing, include=["documents", "metadatas"])
+            found.update(zip(extra["ids"], zip(extra["documents"], extra["metadatas"])))
+        # An id missing from the collection (index out of date) is skipped
+        selected = [chunk_id for chunk_id in selected if chunk_id in found]
+        logger.info(
+            f"Hybrid retrieval: {len(selected)} chunks, "
+            f"{len(set(selected) & set(keyword_ids) - set(results['ids'][0]))} found by keywords only"
+        )
+        return RetrievedChunks(
+            selected,
+            [found[chunk_id][0] for chunk_id in selected],
+            [found[chunk_id][1] for chunk_id in selected],
+            [fused_scores[chunk_id] for chunk_id in selected],
+        )
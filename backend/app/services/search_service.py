@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.resources import AppResources
+from app.models.video import Video
+from app.schemas.search import SearchHit, SearchResponse, VideoSearchResult
+from app.services.chunking import format_timestamp
+from app.services.vector_store import (
+    EMBEDDING_MODEL_KEY,
+    VIDEO_ID_KEY,
+    check_embedding_model,
+    collection_space,
+    cosine_distance,
+)
+
+logger = logging.getLogger(__name__)
+
+# (video_id, chunk_id, document, metadata, distance)
+Hit = Tuple[str, str, str, Dict[str, Any], float]
+
+
+class SearchService:
+    """
+    Top-k semantic search across videos.
+
+    With the shared layout this is a single query on the shared collection,
+    filtered on video_id when a subset is requested. With per-video
+    collections it falls back to one query per video, merged by distance.
+    Distances are reported on the cosine scale whatever the metric of the
+    collection: collections created before HNSW_SPACE defaulted to cosine are
+    still in l2 until rebuilt.
+    """
+
+    def __init__(self, db: AsyncSession, resources: AppResources):
+        self.db = db
+        self.embeddings = resources.embeddings
+        self.vector_store = resources.vector_store
+
+    async def _videos(self, video_ids: Optional[List[UUID]]) -> List[Video]:
+        query = select(Video).where(Video.status == "completed")
+        if video_ids is not None:
+            query = query.where(Video.id.in_(video_ids))
+        return list((await self.db.execute(query)).scalars().all())
+
+    async def _search_shared(self, embedding: List[float], video_ids: Optional[List[UUID]], top_k: int) -> List[Hit]:
+        # Created empty (for the configured model) when nothing was indexed yet
+        collection = await self.vector_store.get_shared_collection({EMBEDDING_MODEL_KEY: self.embeddings.model_name})
+        check_embedding_model(collection, self.embeddings.model_name)
+        where = None
+        if video_ids is not None:
+            ids = [str(video_id) for video_id in video_ids]
+            where = {VIDEO_ID_KEY: ids[0]} if len(ids) == 1 else {VIDEO_ID_KEY: {"$in": ids}}
+        results = await collection.query(
+            query_embeddings=[embedding],
+            n_results=top_k,
+            where=where,
+            include=["documents", "metadatas", "distances"]
+        )
+        space = collection_space(collection)
+        # Shared ids are "<video_id>:<chunk id>", report the chunk id as in a per-video collection
+        return [
+            (meta[VIDEO_ID_KEY], chunk_id.partition(":")[2], doc, meta, cosine_distance(space, distance))
+            for chunk_id, doc, meta, distance in zip(
+                results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+            )
+        ]
+
+    async def _search_per_video(self, embedding: List[float], videos: List[Video], top_k: int) -> List[Hit]:
+        slots = asyncio.Semaphore(settings.SEARCH_PER_VIDEO_CONCURRENCY)
+
+        async def search_one(video: Video) -> List[Hit]:
+            async with slots:
+                try:
+                    collection = await self.vector_store.get_video_collection(video)
+                    check_embedding_model(collection, self.embeddings.model_name)
+                    results = await collection.query(
+                        query_embeddings=[embedding],
+                        n_results=top_k,
+                        include=["documents", "metadatas", "distances"]
+                    )
+                except Exception as e:
+                    # Missing collection, or one built with another embedding model
+                    logger.warning(f"Skipping video {video.id} in search: {type(e).__name__}: {e}")
+                    return []
+            space = collection_space(collection)
+            return [
+                (str(video.id), chunk_id, doc, meta, cosine_distance(space, distance))
+                for chunk_id, doc, meta, distance in zip(
+                    results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+                )
+            ]
+
+        per_video = await asyncio.gather(*(search_one(video) for video in videos))
+        hits = [hit for hits in per_video for hit in hits]
+        return sorted(hits, key=lambda hit: hit[4])[:top_k]
+
+    async def search(self, query: str, video_ids: Optional[List[UUID]] = None, top_k: int = 10) -> SearchResponse:
+        top_k = min(top_k, settings.SEARCH_MAX_RESULTS)
+        if video_ids is not None and not video_ids:
+            return SearchResponse(query=query, total_hits=0, results=[])
+        embedding = await self.embeddings.embed_query(query)
+
+        if self.vector_store.shared:
+            hits = await self._search_shared(embedding, video_ids, top_k)
+            videos = await self._videos([UUID(video_id) for video_id in {hit[0] for hit in hits}])
+        else:
+            videos = await self._videos(video_ids)
+            hits = await self._search_per_video(embedding, videos, top_k)
+        titles = {str(video.id): video.title for video in videos}
+
+        grouped: Dict[str, List[Hit]] = defaultdict(list)
+        for hit in hits:
+            # Chunks of videos deleted or not completed yet are not reported
+            if hit[0] in titles:
+                grouped[hit[0]].append(hit)
+
+        results = []
+        for video_id, video_hits in grouped.items():
+            video_hits.sort(key=lambda hit: hit[3].get("start", 0))
+            results.append(VideoSearchResult(
+                video_id=video_id,
+                title=titles[video_id],
+                best_distance=min(hit[4] for hit in video_hits),
+                hits=[
+                    SearchHit(
+                        chunk_id=chunk_id,
+                        text=doc,
+                        distance=distance,
+                        start=meta.get("start"),
+                        end=meta.get("end"),
+                        timestamp=format_timestamp(meta["start"]) if "start" in meta else None,
+                    )
+                    for _, chunk_id, doc, meta, distance in video_hits
+                ],
+            ))
+        results.sort(key=lambda result: result.best_distance)
+        logger.info(f"Search '{query}': {sum(len(r.hits) for r in results)} hits in {len(results)} videos")
+        return SearchResponse(query=query, total_hits=sum(len(r.hits) for r in results), results=results)
@@ -0,0 +1,51 @@
+import logging
+from typing import List, Optional
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token, used when no tokenizer can be loaded
+CHARS_PER_TOKEN = 4
+
+
+def encoding_for(model_name: str) -> Optional[tiktoken.Encoding]:
+    """tiktoken encoding of `model_name` (cl100k_base for unknown models), None when none can be loaded."""
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # tiktoken downloads its vocabularies on first use, which fails offline
+        logger.warning(f"No tokenizer for {model_name} ({e}), estimating tokens from text length")
+        return None
+
+
+class TokenCounter:
+    """Token counts for one model, estimated from the text length when tiktoken is unavailable."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.encoding = encoding_for(model_name)
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if self.encoding is None:
+            return len(text) // CHARS_PER_TOKEN + 1
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def count_many(self, texts: List[str]) -> List[int]:
+        if self.encoding is None:
+            return [len(text) // CHARS_PER_TOKEN + 1 for text in texts]
+        return [len(tokens) for tokens in self.encoding.encode_batch(texts, disallowed_special=())]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """`text` cut to at most `max_tokens` tokens."""
+        if self.encoding is None:
+            return text if self.count(text) <= max_tokens else text[:max(max_tokens - 1, 0) * CHARS_PER_TOKEN]
+        tokens = self.encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else self.encoding.decode(tokens[:max_tokens])
@@ -0,0 +1,166 @@
+import json
+import logging
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.transcript import TranscriptBlock
+from app.services.chunking import text_segments
+
+logger = logging.getLogger(__name__)
+
+# Text per block: large enough to compress well, small enough that a time or
+# character range only decompresses a few kilobytes around it
+BLOCK_MAX_CHARS = 8000
+# Longest pseudo-segment cut from an untimed transcription
+UNTIMED_SEGMENT_MAX_CHARS = 1000
+# Segments are joined with this separator to form the full transcription
+SEPARATOR = " "
+
+
+def encode_segments(segments: List[Dict[str, Any]]) -> bytes:
+    rows = [[segment.get("start"), segment.get("end"), segment["text"]] for segment in segments]
+    return zlib.compress(json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_segments(data: bytes) -> List[Dict[str, Any]]:
+    segments = []
+    for start, end, text in json.loads(zlib.decompress(data).decode("utf-8")):
+        segment: Dict[str, Any] = {"text": text}
+        if start is not None:
+            segment["start"], segment["end"] = start, end
+        segments.append(segment)
+    return segments
+
+
+def untimed_segments(text: str) -> List[Dict[str, Any]]:
+    """Sentence pseudo-segments for a transcription without timestamps (edited by hand, legacy)."""
+    return text_segments(text, UNTIMED_SEGMENT_MAX_CHARS)
+
+
+def transcript_text(segments: List[Dict[str, Any]]) -> str:
+    return SEPARATOR.join(segment["text"] for segment in segments)
+
+
+def build_blocks(video_id: UUID, segments: List[Dict[str, Any]]) -> List[TranscriptBlock]:
+    """Consecutive segments packed into blocks of about BLOCK_MAX_CHARS characters."""
+    blocks: List[TranscriptBlock] = []
+    current: List[Dict[str, Any]] = []
+    char_start = size = 0
+
+    def flush() -> None:
+        nonlocal current, char_start, size
+        timed = [segment for segment in current if "start" in segment]
+        blocks.append(TranscriptBlock(
+            video_id=video_id,
+            block_index=len(blocks),
+            start=min(segment["start"] for segment in timed) if timed else None,
+            end=max(segment["end"] for segment in timed) if timed else None,
+            char_start=char_start,
+            char_length=size,
+            segment_count=len(current),
+            data=encode_segments(current),
+        ))
+        char_start += size + len(SEPARATOR)
+        current, size = [], 0
+
+    for segment in segments:
+        added = len(segment["text"]) + (len(SEPARATOR) if current else 0)
+        if current and size + added > BLOCK_MAX_CHARS:
+            flush()
+            added = len(segment["text"])
+        current.append(segment)
+        size += added
+    if current:
+        flush()
+    return blocks
+
+
+async def store_transcript(db: AsyncSession, video_id: UUID, segments: List[Dict[str, Any]]) -> int:
+    """
+    Replace the video's transcript with `segments` ({start, end, text} dicts,
+    or {text} for untimed ones). Not committed: part of the caller's transaction.
+    Returns the length of the full transcription.
+    """
+    await db.execute(delete(TranscriptBlock).where(TranscriptBlock.video_id == video_id))
+    blocks = build_blocks(video_id, segments)
+    db.add_all(blocks)
+    total = blocks[-1].char_start + blocks[-1].char_length if blocks else 0
+    stored = sum(len(block.data) for block in blocks)
+    logger.info(
+        f"Stored transcript of video {video_id}: {len(segments)} segments in {len(blocks)} blocks, "
+        f"{total} characters compressed to {stored} bytes"
+    )
+    return total
+
+
+async def load_segments(
+    db: AsyncSession, video_id: UUID, start: Optional[float] = None, end: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    The video's segments in order, or only the timed ones overlapping
+    [start, end] seconds when a range is given. Only the blocks covering the
+    range are read and decompressed.
+    """
+    query = (
+        select(TranscriptBlock.data)
+        .where(TranscriptBlock.video_id == video_id)
+        .order_by(TranscriptBlock.block_index)
+    )
+    ranged = start is not None or end is not None
+    if start is not None:
+        query = query.where(TranscriptBlock.end >= start)
+    if end is not None:
+        query = query.where(TranscriptBlock.start <= end)
+
+    segments: List[Dict[str, Any]] = []
+    for data in (await db.execute(query)).scalars():
+        segments.extend(decode_segments(data))
+    if ranged:
+        segments = [
+            segment for segment in segments
+            if "start" in segment
+            and (start is None or segment["end"] >= start)
+            and (end is None or segment["start"] <= end)
+        ]
+    return segments
+
+
+def slice_blocks(rows: List[Tuple[int, bytes]], offset: int, limit: int) -> str:
+    """text[offset:offset + limit] of the transcription, from the (char_start, data) of the consecutive blocks covering it."""
+    if not rows:
+        return ""
+    base = rows[0][0]
+    text = SEPARATOR.join(transcript_text(decode_segments(data)) for _, data in rows)
+    return text[offset - base:offset - base + limit]
+
+
+async def transcript_length(db: AsyncSession, video_id: UUID) -> int:
+    result = await db.execute(
+        select(func.max(TranscriptBlock.char_start + TranscriptBlock.char_length))
+        .where(TranscriptBlock.video_id == video_id)
+    )
+    return result.scalar() or 0
+
+
+async def load_text_range(db: AsyncSession, video_id: UUID, offset: int, limit: int) -> Tuple[int, str]:
+    """(total length, text[offset:offset + limit]) of the full transcription, reading only the blocks in range."""
+    total = await transcript_length(db, video_id)
+    if offset >= total:
+        return total, ""
+    result = await db.execute(
+        select(TranscriptBlock.char_start, TranscriptBlock.data)
+        .where(
+            TranscriptBlock.video_id == video_id,
+            # A block starting right at `offset + limit` is kept too, for the separator before it
+            TranscriptBlock.char_start <= offset + limit,
+            # A block ending right at `offset` is kept, so the separator after it is part of the range
+            TranscriptBlock.char_start + TranscriptBlock.char_length >= offset,
+        )
+        .order_by(TranscriptBlock.block_index)
+    )
+    return total, slice_blocks(result.all(), offset, limit)
@@ -0,0 +1,153 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000  # Every engine works on 16 kHz mono audio
+
+# Common output of every engine, in seconds from the start of the samples:
+#   {"start": float, "end": float, "text": str,
+#    "words": [{"start": float, "end": float, "word": str}, ...]}
+# "words" is only filled when the engine was created with word_timestamps=True.
+Segment = Dict[str, Any]
+
+
+class TranscriptionEngine(ABC):
+    """A speech-to-text model, loaded once and used from a single worker process."""
+
+    name: str
+
+    def __init__(self, model_name: str, threads: int = 0, word_timestamps: bool = False):
+        self.model_name = model_name
+        self.threads = threads
+        self.word_timestamps = word_timestamps
+
+    @abstractmethod
+    def load(self) -> None:
+        pass
+
+    @abstractmethod
+    def transcribe(self, samples: np.ndarray) -> List[Segment]:
+        """Transcribe 16 kHz mono float32 samples."""
+        pass
+
+
+class WhisperEngine(TranscriptionEngine):
+    """openai-whisper, float32 PyTorch on CPU."""
+
+    name = "whisper"
+
+    def load(self) -> None:
+        import torch
+        import whisper
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        self._model = whisper.load_model(self.model_name)
+
+    def transcribe(self, samples: np.ndarray) -> List[Segment]:
+        result = self._model.transcribe(samples, fp16=False, word_timestamps=self.word_timestamps)
+        return [
+            {
+                "start": segment["start"],
+                "end": segment["end"],
+                "text": segment["text"],
+                "words": [
+                    {"start": word["start"], "end": word["end"], "word": word["word"]}
+                    for word in segment.get("words") or []
+                ],
+            }
+            for segment in result.get("segments", [])
+        ]
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    """faster-whisper (CTranslate2), int8 quantized on CPU by default."""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name: str, threads: int = 0, word_timestamps: bool = False, compute_type: str = "int8"):
+        super().__init__(model_name, threads, word_timestamps)
+        self.compute_type = compute_type
+
+    def load(self) -> None:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError(
+                f"TRANSCRIPTION_BACKEND=faster-whisper requires the faster-whisper package "
+                f"({e.name or e} is missing): pip install faster-whisper, see requirements-optional.txt"
+            ) from e
+        self._model = WhisperModel(
+            self.model_name,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.threads,
+        )
+
+    def transcribe(self, samples: np.ndarray) -> List[Segment]:
+        segments, _info = self._model.transcribe(samples, word_timestamps=self.word_timestamps)
+        # segments is a lazy generator: decoding happens while iterating
+        return [
+            {
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "words": [
+                    {"start": word.start, "end": word.end, "word": word.word}
+                    for word in segment.words or []
+                ],
+            }
+            for segment in segments
+        ]
+
+
+class FakeEngine(TranscriptionEngine):
+    """
+    Deterministic engine for tests and benchmarks: one segment per
+    `segment_seconds` of audio, whose text only depends on the samples.
+    """
+
+    name = "fake"
+    segment_seconds = 5.0
+
+    def load(self) -> None:
+        pass
+
+    def transcribe(self, samples: np.ndarray) -> List[Segment]:
+        step = int(self.segment_seconds * SAMPLE_RATE)
+        segments: List[Segment] = []
+        for index, start in enumerate(range(0, len(samples), step)):
+            chunk = np.ascontiguousarray(samples[start:start + step], dtype=np.float32)
+            begin = start / SAMPLE_RATE
+            end = (start + len(chunk)) / SAMPLE_RATE
+            tokens = [f"segment{index}", f"{zlib.crc32(chunk.tobytes()):08x}"]
+            words = []
+            if self.word_timestamps:
+                width = (end - begin) / len(tokens)
+                words = [
+                    {"start": begin + i * width, "end": begin + (i + 1) * width, "word": f" {token}"}
+                    for i, token in enumerate(tokens)
+                ]
+            segments.append({"start": begin, "end": end, "text": " " + " ".join(tokens), "words": words})
+        return segments
+
+
+ENGINES = {engine.name: engine for engine in (WhisperEngine, FasterWhisperEngine, FakeEngine)}
+
+
+def create_engine(
+    backend: str,
+    model_name: str,
+    threads: int = 0,
+    word_timestamps: bool = False,
+    compute_type: Optional[str] = None,
+) -> TranscriptionEngine:
+    try:
+        engine_class = ENGINES[backend]
+    except KeyError:
+        raise ValueError(f"Unknown transcription backend: {backend} (available: {', '.join(ENGINES)})")
+    if engine_class is FasterWhisperEngine and compute_type:
+        return engine_class(model_name, threads, word_timestamps, compute_type=compute_type)
+    return engine_class(model_name, threads, word_timestamps)
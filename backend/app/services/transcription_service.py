@@ -1,15 +1,17 @@
-from functools import partial
 import re
 import logging
 import os
 import tempfile
 import yt_dlp
-import whisper
 import ssl
 import certifi
 import asyncio
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, Any
 from pathlib import Path
+from app.core.config import settings
+from app.services.audio_stream import decode_audio, pcm_chunks
+from app.services.long_audio import LongAudioTranscriber
+from app.services.whisper_pool import SAMPLE_RATE, TranscriptionBusyError, WhisperInferencePool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,13 +27,24 @@ else:
 
 class TranscriptionService:
     def __init__(self):
-        try:
-            logger.info("Initializing Whisper model...")
-            self.model = whisper.load_model("base")
-            logger.info("Whisper model loaded successfully")
-        except Exception as e:
-            logger.error(f"Error loading Whisper model: {str(e)}")
-            raise
+        # Les modèles sont chargés dans les processus du pool, pas ici
+        self.pool = WhisperInferencePool(
+            model_name=settings.WHISPER_MODEL,
+            workers=settings.TRANSCRIPTION_WORKERS,
+            threads=settings.TRANSCRIPTION_THREADS_PER_WORKER,
+            max_concurrent_jobs=settings.TRANSCRIPTION_MAX_CONCURRENT_JOBS,
+            queue_size=settings.TRANSCRIPTION_ADMISSION_QUEUE_SIZE,
+            admission_timeout=settings.TRANSCRIPTION_ADMISSION_TIMEOUT_SECONDS,
+            backend=settings.TRANSCRIPTION_BACKEND,
+            word_timestamps=settings.TRANSCRIPTION_WORD_TIMESTAMPS,
+            compute_type=settings.TRANSCRIPTION_COMPUTE_TYPE,
+        )
+        self.long_audio = LongAudioTranscriber(
+            self.pool,
+            window_seconds=settings.TRANSCRIPTION_WINDOW_SECONDS,
+            overlap_seconds=settings.TRANSCRIPTION_WINDOW_OVERLAP_SECONDS,
+            silence_search_seconds=settings.TRANSCRIPTION_SILENCE_SEARCH_SECONDS,
+        )
 
     def validate_youtube_url(self, url: str) -> bool:
         """Validate if the URL is a valid YouTube URL"""
@@ -98,23 +111,103 @@ class TranscriptionService:
             logger.error(f"Error in _download_with_ytdl: {str(e)}")
             raise
 
+    async def transcribe_audio(self, audio_path: str) -> Dict[str, Any]:
+        """
+        Transcribe an already downloaded audio file in the inference pool, with
+        the engine selected by TRANSCRIPTION_BACKEND.
+        Audio longer than TRANSCRIPTION_LONG_AUDIO_THRESHOLD_SECONDS is split into
+        windows transcribed in parallel by the pool workers.
+
+        Raises TranscriptionBusyError when the admission queue is full.
+        """
+        async with self.pool.admission():
+            logger.info("Starting transcription...")
+            audio = await decode_audio(audio_path)
+            duration = len(audio) / SAMPLE_RATE
+
+            threshold = settings.TRANSCRIPTION_LONG_AUDIO_THRESHOLD_SECONDS
+            if threshold and duration >= threshold:
+                result = await self.long_audio.transcribe(audio)
+            else:
+                segments = await self.pool.transcribe_samples(audio)
+                result = {
+                    "text": "".join(segment["text"] for segment in segments).strip(),
+                    "segments": segments,
+                }
+        logger.info(f"Transcription of {duration:.0f}s of audio completed successfully")
+        return result
+
+    async def resolve_audio_source(self, source: str) -> Tuple[str, Dict[str, str]]:
+        """
+        Return what ffmpeg should read for `source`, with the HTTP headers it
+        needs: a local file as is, or the direct audio stream URL of a YouTube
+        video (resolved by yt-dlp without downloading anything).
+        """
+        if Path(source).is_file():
+            return source, {}
+        if not self.validate_youtube_url(source):
+            raise ValueError("URL YouTube invalide")
+
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            'nocheckcertificate': os.environ.get('PYTHONHTTPSVERIFY', '') == '0',
+            'quiet': True,
+        }
+        loop = asyncio.get_event_loop()
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = await loop.run_in_executor(None, lambda: ydl.extract_info(source, download=False))
+        return info['url'], info.get('http_headers') or {}
+
+    async def transcribe_stream(self, source: str) -> Dict[str, Any]:
+        """
+        Decode `source` (local file or YouTube URL) once with ffmpeg, straight to
+        16 kHz mono PCM, and transcribe it window by window as it arrives.
+        Nothing is written to disk and memory stays bounded by a few windows,
+        whatever the duration.
+
+        Raises TranscriptionBusyError when the admission queue is full.
+        """
+        stream_url, headers = await self.resolve_audio_source(source)
+        async with self.pool.admission():
+            logger.info("Starting streamed transcription...")
+            result = await self.long_audio.transcribe_stream(pcm_chunks(stream_url, headers))
+        logger.info("Streamed transcription completed successfully")
+        return result
+
+    async def warmup(self) -> None:
+        await self.pool.warmup()
+
+    def shutdown(self) -> None:
+        self.pool.shutdown()
+
+    def cleanup_audio(self, audio_path: str) -> None:
+        """Remove the temporary directory created by download_audio."""
+        temp_dir = Path(audio_path).parent
+        if temp_dir.exists():
+            try:
+                for file in temp_dir.glob('*'):
+                    file.unlink()
+                temp_dir.rmdir()
+                logger.info(f"Cleaned up temporary directory: {temp_dir}")
+            except Exception as cleanup_error:
+                logger.warning(f"Error cleaning up temporary files: {cleanup_error}")
+
     async def transcribe_youtube_video(self, url: str) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
-        temp_dir = None
+        audio_path = None
         try:
             # Validate URL first
             if not self.validate_youtube_url(url):
                 logger.error(f"Invalid YouTube URL: {url}")
                 return None, "URL YouTube invalide"
 
-            # Télécharger l'audio
-            audio_path = await self.download_audio(url)
-            temp_dir = Path(audio_path).parent
-            
-            # Transcrire dans un thread séparé
-            logger.info("Starting transcription...")
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, lambda: self.model.transcribe(audio_path))
-            logger.info("Transcription completed successfully")
+            if settings.TRANSCRIPTION_AUDIO_MODE == "stream":
+                result = await self.transcribe_stream(url)
+            else:
+                # Télécharger l'audio
+                audio_path = await self.download_audio(url)
+
+                # Transcrire dans le pool
+                result = await self.transcribe_audio(audio_path)
             
             # Retourner la transcription
             if result and "text" in result:
@@ -123,6 +216,8 @@ class TranscriptionService:
                 error_msg = "La transcription a échoué. Aucun texte n'a été généré."
                 return None, error_msg
 
+        except TranscriptionBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error in transcribe_youtube_video: {str(e)}", exc_info=True)
             error_msg = f"La transcription a échoué: {str(e)}"
@@ -130,14 +225,8 @@ class TranscriptionService:
             
         finally:
             # Nettoyer les fichiers temporaires
-            if temp_dir and temp_dir.exists():
-                try:
-                    for file in temp_dir.glob('*'):
-                        file.unlink()
-                    temp_dir.rmdir()
-                    logger.info(f"Cleaned up temporary directory: {temp_dir}")
-                except Exception as cleanup_error:
-                    logger.warning(f"Error cleaning up temporary files: {cleanup_error}")
+            if audio_path:
+                self.cleanup_audio(audio_path)
 
 # Create a singleton instance
 transcription_service = TranscriptionService() 
\ No newline at end of file
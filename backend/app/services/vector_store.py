@@ -0,0 +1,261 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import chromadb
+from chromadb.api import AsyncClientAPI
+from chromadb.api.models.AsyncCollection import AsyncCollection
+from chromadb.config import Settings as ChromaSettings
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Collection metadata key naming the model its vectors were computed with
+EMBEDDING_MODEL_KEY = "embedding_model"
+
+# Chunk metadata key scoping a chunk to its video in the shared collection
+VIDEO_ID_KEY = "video_id"
+
+# HNSW parameters Chroma uses for a collection that sets none
+CHROMA_HNSW_DEFAULTS: Dict[str, Any] = {
+    "hnsw:space": "l2",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 100,
+    "hnsw:search_ef": 100,
+}
+
+# VECTOR_LAYOUT values
+PER_VIDEO_LAYOUT = "per_video"
+SHARED_LAYOUT = "shared"
+
+
+class EmbeddingModelMismatchError(Exception):
+    """The collection was built with another embedding model than the one configured."""
+
+    def __init__(self, collection_name: str, indexed_with: str, configured: str):
+        self.collection_name = collection_name
+        self.indexed_with = indexed_with
+        self.configured = configured
+        super().__init__(
+            f"Collection {collection_name} was indexed with {indexed_with}, "
+            f"but the configured embedding model is {configured}"
+        )
+
+
+def collection_embedding_model(collection: AsyncCollection) -> str:
+    """
+    Model a collection was built with. Collections created before the model
+    was recorded were all embedded with the OpenAI model.
+    """
+    return (collection.metadata or {}).get(EMBEDDING_MODEL_KEY, settings.OPENAI_EMBEDDING_MODEL)
+
+
+def check_embedding_model(collection: Union[AsyncCollection, "VideoChunks"], model_name: str) -> None:
+    indexed_with = collection_embedding_model(collection)
+    if indexed_with != model_name:
+        raise EmbeddingModelMismatchError(collection.name, indexed_with, model_name)
+
+
+def hnsw_metadata() -> Dict[str, Any]:
+    """Index parameters from Settings, set on every collection created through VectorStore."""
+    return {
+        "hnsw:space": settings.HNSW_SPACE,
+        "hnsw:M": settings.HNSW_M,
+        "hnsw:construction_ef": settings.HNSW_CONSTRUCTION_EF,
+        "hnsw:search_ef": settings.HNSW_SEARCH_EF,
+    }
+
+
+def collection_space(collection: Union[AsyncCollection, "VideoChunks"]) -> str:
+    """Distance metric a collection was created with."""
+    return (collection.metadata or {}).get("hnsw:space", CHROMA_HNSW_DEFAULTS["hnsw:space"])
+
+
+def cosine_distance(space: str, distance: float) -> float:
+    """
+    A distance returned by a collection indexed in `space`, on the cosine
+    scale (1 - cosine similarity), so that hits of collections created with
+    different metrics can be merged. Chroma's l2 is the squared euclidean
+    distance, 2 - 2 cos for unit vectors, and ip is 1 - the dot product: the
+    conversion is exact for normalised embeddings (OpenAI's are), only
+    approximate otherwise, which is why legacy collections should still be
+    rebuilt (scripts/rebuild_collections.py).
+    """
+    if space == "l2":
+        return distance / 2
+    return distance
+
+
+def index_params_diff(collection: Union[AsyncCollection, "VideoChunks"]) -> Dict[str, Tuple[Any, Any]]:
+    """
+    HNSW parameters of `collection` that differ from Settings, as
+    {key: (current, configured)}. They are fixed when a collection is
+    created: changing them means rebuilding it (scripts/rebuild_collections.py).
+    """
+    metadata = collection.metadata or {}
+    current = {key: metadata.get(key, default) for key, default in CHROMA_HNSW_DEFAULTS.items()}
+    return {key: (current[key], value) for key, value in hnsw_metadata().items() if current[key] != value}
+
+
+class VideoChunks:
+    """
+    One video's chunks inside the shared collection, with the subset of the
+    AsyncCollection interface the services use. Reads and deletes are
+    filtered on the video_id metadata, and chunk ids are prefixed with the
+    video id so that identical texts in two videos do not collide. Callers see
+    the same unprefixed ids as in a per-video collection.
+    """
+
+    def __init__(self, collection: AsyncCollection, video_id: str):
+        self.collection = collection
+        self.video_id = video_id
+        self._prefix = f"{video_id}:"
+
+    @property
+    def name(self) -> str:
+        return f"{self.collection.name}[{self.video_id}]"
+
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        return self.collection.metadata
+
+    async def modify(self, metadata: Dict[str, Any]) -> None:
+        await self.collection.modify(metadata=metadata)
+
+    def _ids(self, ids: List[str]) -> List[str]:
+        return [self._prefix + chunk_id for chunk_id in ids]
+
+    def _strip(self, ids: List[str]) -> List[str]:
+        return [chunk_id[len(self._prefix):] for chunk_id in ids]
+
+    def _where(self, where: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        scope = {VIDEO_ID_KEY: self.video_id}
+        return {"$and": [scope, where]} if where else scope
+
+    def _scoped(self, metadatas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [{**metadata, VIDEO_ID_KEY: self.video_id} for metadata in metadatas]
+
+    async def count(self) -> int:
+        total, offset, page_size = 0, 0, 10000
+        while True:
+            page = await self.collection.get(where=self._where(None), limit=page_size, offset=offset, include=[])
+            total += len(page["ids"])
+            if len(page["ids"]) < page_size:
+                return total
+            offset += page_size
+
+    async def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None, **kwargs):
+        if ids is not None:
+            kwargs["ids"] = self._ids(ids)
+        result = await self.collection.get(where=self._where(where), **kwargs)
+        result["ids"] = self._strip(result["ids"])
+        return result
+
+    async def query(self, where: Optional[Dict[str, Any]] = None, **kwargs):
+        result = await self.collection.query(where=self._where(where), **kwargs)
+        result["ids"] = [self._strip(ids) for ids in result["ids"]]
+        return result
+
+    async def upsert(self, ids: List[str], documents: List[str], embeddings, metadatas: List[Dict[str, Any]]) -> None:
+        await self.collection.upsert(
+            ids=self._ids(ids), documents=documents, embeddings=embeddings, metadatas=self._scoped(metadatas)
+        )
+
+    async def update(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        await self.collection.update(ids=self._ids(ids), metadatas=self._scoped(metadatas))
+
+    async def delete(self, ids: Optional[List[str]] = None) -> None:
+        """Delete the given chunks, or every chunk of the video when `ids` is None."""
+        if ids is None:
+            await self.collection.delete(where=self._where(None))
+        else:
+            await self.collection.delete(ids=self._ids(ids))
+
+
+class VectorStore:
+    """
+    Async access to ChromaDB through its native async HTTP client.
+    Collections returned here are AsyncCollection objects: every call on them
+    (query, add, count, delete...) must be awaited.
+    """
+
+    def __init__(
+        self,
+        client: AsyncClientAPI,
+        layout: str = PER_VIDEO_LAYOUT,
+        shared_collection_name: str = "videos",
+    ):
+        if layout not in (PER_VIDEO_LAYOUT, SHARED_LAYOUT):
+            raise ValueError(f"Unknown VECTOR_LAYOUT: {layout}")
+        self.client = client
+        self.layout = layout
+        self.shared_collection_name = shared_collection_name
+
+    @classmethod
+    async def connect(cls) -> "VectorStore":
+        client = await chromadb.AsyncHttpClient(
+            host=settings.CHROMA_HOST,
+            port=settings.CHROMA_PORT,
+            ssl=False,
+            settings=ChromaSettings(
+                anonymized_telemetry=False,
+                allow_reset=True
+            )
+        )
+        logger.info(
+            f"Connected to ChromaDB at {settings.CHROMA_HOST}:{settings.CHROMA_PORT} "
+            f"({settings.VECTOR_LAYOUT} layout)"
+        )
+        return cls(client, settings.VECTOR_LAYOUT, settings.SHARED_COLLECTION_NAME)
+
+    @property
+    def shared(self) -> bool:
+        return self.layout == SHARED_LAYOUT
+
+    async def create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> AsyncCollection:
+        return await self.client.create_collection(name=name, metadata={**hnsw_metadata(), **(metadata or {})})
+
+    async def get_collection(self, name: str) -> AsyncCollection:
+        return await self.client.get_collection(name=name)
+
+    async def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> AsyncCollection:
+        """`metadata` (and the HNSW parameters) only apply if the collection is created."""
+        return await self.client.get_or_create_collection(name=name, metadata={**hnsw_metadata(), **(metadata or {})})
+
+    async def delete_collection(self, name: str) -> None:
+        await self.client.delete_collection(name=name)
+
+    async def get_shared_collection(self, metadata: Optional[Dict[str, Any]] = None) -> AsyncCollection:
+        """
+        The collection holding every video's chunks in the shared layout.
+        Only created when `metadata` is given (i.e. when indexing), so that it
+        always records the embedding model it was created for.
+        """
+        if metadata is None:
+            return await self.client.get_collection(name=self.shared_collection_name)
+        return await self.get_or_create_collection(self.shared_collection_name, metadata)
+
+    async def get_video_collection(self, video) -> Union[AsyncCollection, VideoChunks]:
+        """The chunks of `video`: its own collection, or its slice of the shared one."""
+        if self.shared:
+            return VideoChunks(await self.get_shared_collection(), str(video.id))
+        return await self.get_collection(video.chroma_collection_id)
+
+    async def get_or_create_video_collection(
+        self, video, metadata: Dict[str, Any]
+    ) -> Union[AsyncCollection, VideoChunks]:
+        """
+        Like get_video_collection, creating the collection if needed. `metadata`
+        only applies to a newly created collection: the video's own collection,
+        or the shared one (without its video_id key).
+        """
+        if self.shared:
+            shared_metadata = {k: v for k, v in metadata.items() if k != VIDEO_ID_KEY}
+            return VideoChunks(await self.get_shared_collection(shared_metadata), str(video.id))
+        return await self.get_or_create_collection(video.chroma_collection_id, metadata)
+
+    async def delete_video_collection(self, video) -> None:
+        if self.shared:
+            await VideoChunks(await self.get_shared_collection(), str(video.id)).delete()
+        else:
+            await self.delete_collection(video.chroma_collection_id)
@@ -1,18 +1,37 @@
 from uuid import UUID
 import uuid
+import asyncio
+from sqlalchemy import exists, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.transcript import TranscriptBlock
 from app.models.video import Video
-from app.schemas.video import VideoCreate, VideoUpdate
-from app.db.base import chroma_client
-from typing import List
-from app.services.transcription_service import transcription_service
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from app.core.config import settings
+from app.schemas.video import (
+    TranscriptPage, TranscriptSegment, TranscriptSegments, VideoCreate, VideoPage, VideoSummary, VideoUpdate
+)
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from app.core.resources import AppResources
+from app.services.chunking import Chunk, text_segments
+from app.services.embedding_scheduler import ProgressCallback
+from app.services.keyword_index import BM25Index, store_keyword_index
+from app.services.reindexer import ReindexReport, chunk_ids, reindex_collection
+from app.services.transcript_store import (
+    load_segments, load_text_range, store_transcript, transcript_text, untimed_segments
+)
+from app.services.vector_store import (
+    EMBEDDING_MODEL_KEY,
+    EmbeddingModelMismatchError,
+    collection_embedding_model,
+    index_params_diff,
+)
 import logging
 from fastapi import HTTPException
 
+if TYPE_CHECKING:
+    from app.models.ingestion_job import IngestionJob
+    from app.services.ingestion_service import IngestionWorkerPool
+
 logger = logging.getLogger(__name__)
 
 class VideoProcessingError(Exception):
@@ -20,141 +39,164 @@ class VideoProcessingError(Exception):
     pass
 
 class VideoService:
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        ingestion_pool: Optional["IngestionWorkerPool"] = None,
+        resources: Optional[AppResources] = None
+    ):
         self.db = db
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
-        )
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.OPENAI_EMBEDDING_MODEL,
-            openai_api_key=settings.OPENAI_API_KEY,
-            chunk_size=1000
+        self.ingestion_pool = ingestion_pool
+        self.resources = resources
+
+    async def _split_transcription(self, video: Video, segments: Optional[List[Dict[str, Any]]]) -> List[Chunk]:
+        """
+        Chunks of the given segments, else of the stored transcript. Chunks have
+        timestamps when the segments come from Whisper; untimed transcriptions
+        are cut into sentences sized for the chunker.
+        """
+        chunker = self.resources.segment_chunker
+        if segments is None:
+            segments = await load_segments(self.db, video.id)
+        if segments and all("start" in segment for segment in segments):
+            return chunker.split_segments(segments)
+        # CPU bound on long transcripts
+        return await asyncio.to_thread(
+            lambda: chunker.split_segments(text_segments(transcript_text(segments), chunker.chunk_size))
         )
 
-    async def _update_chroma_collection(self, video: Video) -> None:
-        """Update ChromaDB collection with video transcription chunks"""
+    async def _get_collection_for_model(self, video: Video):
+        """
+        The video's collection, tagged with the configured embedding model.
+        A per-video collection built with another model cannot be diffed (its
+        vectors live in another space): it is dropped and rebuilt from scratch.
+        The shared collection holds the whole library, so a model change there
+        goes through scripts/migrate_to_shared_collection.py instead.
+        """
+        vector_store = self.resources.vector_store
+        model_name = self.resources.embeddings.model_name
+        metadata = {"video_id": str(video.id), EMBEDDING_MODEL_KEY: model_name}
+        collection = await vector_store.get_or_create_video_collection(video, metadata)
+
+        indexed_with = collection_embedding_model(collection)
+        if indexed_with != model_name:
+            if vector_store.shared:
+                raise EmbeddingModelMismatchError(collection.name, indexed_with, model_name)
+            logger.warning(
+                f"Collection {collection.name} was indexed with {indexed_with}, "
+                f"re-embedding every chunk with {model_name}"
+            )
+            await vector_store.delete_collection(video.chroma_collection_id)
+            collection = await vector_store.create_collection(name=video.chroma_collection_id, metadata=metadata)
+        elif EMBEDDING_MODEL_KEY not in (collection.metadata or {}):
+            # Collection from before the model was recorded: tag it in place
+            existing = {k: v for k, v in (collection.metadata or {}).items() if k != "hnsw:space"}
+            await collection.modify(metadata={**existing, EMBEDDING_MODEL_KEY: model_name})
+
+        stale = index_params_diff(collection)
+        if stale:
+            logger.warning(
+                f"Collection {collection.name} index parameters differ from the settings "
+                f"({', '.join(f'{k}: {cur} != {new}' for k, (cur, new) in stale.items())}), "
+                f"run scripts/rebuild_collections.py to apply them"
+            )
+        return collection
+
+    async def _update_chroma_collection(
+        self,
+        video: Video,
+        segments: Optional[List[Dict[str, Any]]] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> ReindexReport:
+        """
+        Bring the video's ChromaDB collection in line with its transcription.
+        Chunk ids are content-addressed, so only new or changed chunks are embedded.
+        `progress(done, total)` is called as embedding batches complete.
+        """
         try:
             logger.info(f"Updating ChromaDB collection for video {video.id}")
             
-            # Get or create collection
-            collection = chroma_client.get_or_create_collection(
-                name=video.chroma_collection_id,
-                metadata={"video_id": str(video.id)}
-            )
-            
-            # Clear existing documents if any
-            try:
-                collection.delete(where={})
-                logger.info("Cleared existing documents from collection")
-            except Exception as e:
-                logger.warning(f"Error clearing collection (might be empty): {str(e)}")
+            collection = await self._get_collection_for_model(video)
             
-            if not video.transcription:
-                logger.warning("No transcription available for indexing")
-                return
-                
             # Split transcription into chunks
-            chunks = self.text_splitter.split_text(video.transcription)
+            chunks = await self._split_transcription(video, segments)
             logger.info(f"Split transcription into {len(chunks)} chunks")
-            
             if not chunks:
-                logger.warning("No chunks generated from transcription")
-                return
-                
+                logger.warning("No chunks generated from transcription, clearing the collection")
+
             try:
-                # Generate embeddings for all chunks
-                embeddings = self.embeddings.embed_documents(chunks)
-                logger.info(f"Generated {len(embeddings)} embeddings")
-                
-                # Prepare metadata for each chunk
-                metadatas = [
-                    {
+                report = await reindex_collection(
+                    collection,
+                    chunks,
+                    self.resources.embeddings,
+                    base_metadata={
                         "source": "transcription",
                         "video_id": str(video.id),
-                        "chunk_index": i,
-                        "total_chunks": len(chunks)
-                    } 
-                    for i in range(len(chunks))
-                ]
-                
-                # Add chunks to collection with metadata and embeddings
-                collection.add(
-                    documents=chunks,
-                    embeddings=embeddings,
-                    metadatas=metadatas,
-                    ids=[f"chunk_{i}" for i in range(len(chunks))]
+                        "total_chunks": len(chunks),
+                    },
+                    progress=progress
                 )
-                logger.info(f"Successfully added {len(chunks)} chunks to ChromaDB")
-                
-                # Verify the update
-                collection_info = collection.get()
-                logger.info(f"Collection now contains {len(collection_info['ids'])} documents")
-                
             except Exception as e:
                 logger.error(f"Error adding chunks to ChromaDB: {str(e)}")
                 raise VideoProcessingError(f"Error adding chunks to ChromaDB: {str(e)}")
+
+            # Keyword index over the same chunk ids, for hybrid retrieval
+            keyword_index = await asyncio.to_thread(BM25Index.build, chunk_ids(chunks), [c.text for c in chunks])
+            await store_keyword_index(self.db, video.id, keyword_index)
+            self.resources.keyword_indexes.invalidate(video.id)
+
+            # Answers computed on the previous index are no longer valid
+            if report.changed and self.resources.answer_cache is not None:
+                self.resources.answer_cache.invalidate(video.id)
+            return report
                 
         except Exception as e:
             logger.error(f"Error updating ChromaDB collection: {str(e)}", exc_info=True)
             raise VideoProcessingError(f"Error updating ChromaDB collection: {str(e)}")
 
-    async def process_transcription(self, video: Video) -> None:
-        """Process video transcription"""
+    async def create_video(self, video_in: VideoCreate) -> Tuple[Video, "IngestionJob"]:
+        """
+        Register the video and queue its ingestion.
+        Download, transcription and indexing run in the ingestion workers.
+        """
+        collection_id = f"video_{uuid.uuid4()}"
+        db_video = None
+        shared = self.resources.vector_store.shared
         try:
-            result, error = await transcription_service.transcribe_youtube_video(video.url)
-            if error:
-                video.status = "failed"
-                raise VideoProcessingError(error)
-                
-            if result and "transcription" in result:
-                video.transcription = result["transcription"]
-                video.status = "completed"
-                # Update ChromaDB collection with transcription chunks
-                await self._update_chroma_collection(video)
-            else:
-                video.status = "failed"
-                raise VideoProcessingError("La transcription a échoué. Vérifiez que l'URL est valide et que la vidéo est accessible.")
-                
-        except Exception as e:
-            video.status = "failed"
-            error_msg = str(e)
-            logger.error(f"Error during transcription: {error_msg}")
-            raise VideoProcessingError(f"Erreur lors de la transcription: {error_msg}")
-
-    async def create_video(self, video_in: VideoCreate) -> Video:
-        try:
-            # Create ChromaDB collection
-            collection_id = f"video_{uuid.uuid4()}"
-            chroma_client.create_collection(name=collection_id)
+            # Create ChromaDB collection (the shared layout has nothing to create per video)
+            if not shared:
+                await self.resources.vector_store.create_collection(
+                    collection_id, metadata={EMBEDDING_MODEL_KEY: self.resources.embeddings.model_name}
+                )
             
             # Create video in PostgreSQL
             db_video = Video(
                 url=video_in.url,
                 title=video_in.title,
                 description=video_in.description,
-                status="processing",  # Changed to processing while we transcribe
+                status="pending",  # Processed asynchronously by the ingestion workers
                 chroma_collection_id=collection_id
             )
             self.db.add(db_video)
             await self.db.commit()
             await self.db.refresh(db_video)
 
-            # Process transcription
-            await self.process_transcription(db_video)
-            await self.db.commit()
-            await self.db.refresh(db_video)
-            
-            return db_video
+            job = await self.ingestion_pool.submit(self.db, db_video.id)
+            return db_video, job
             
         except Exception as e:
             # If anything fails, ensure we clean up the ChromaDB collection
             try:
-                chroma_client.delete_collection(name=collection_id)
+                if not shared:
+                    await self.resources.vector_store.delete_collection(collection_id)
             except:
                 pass
+            if db_video is not None and db_video.id is not None:
+                try:
+                    await self.db.delete(db_video)
+                    await self.db.commit()
+                except Exception:
+                    logger.warning(f"Failed to remove video {db_video.id} after ingestion submit error")
             raise
 
     async def get_video(self, video_id: UUID) -> Video:
@@ -170,36 +212,108 @@ class VideoService:
         video = await self.get_video(video_id)
             
         # Update fields
-        for field, value in video_in.dict(exclude_unset=True).items():
+        changes = video_in.dict(exclude_unset=True)
+        transcription_changed = "transcription" in changes
+        transcription = changes.pop("transcription", None)
+        if changes.get("url") is None:
+            # url is required on the row: an explicit null leaves it as is
+            changes.pop("url", None)
+        # Clients resend the whole form: only a different URL means a new source
+        url_changed = "url" in changes and changes["url"] != video.url
+        for field, value in changes.items():
             setattr(video, field, value)
         
-        # If URL changed, reprocess transcription
-        if "url" in video_in.dict(exclude_unset=True):
-            video.status = "processing"
-            await self.db.commit()
-            await self.db.refresh(video)
-            await self.process_transcription(video)
-            
+        # If URL changed, queue a new ingestion of the video
+        if transcription_changed and not url_changed and self.resources is None:
+            # Re-indexing the edited transcription needs the vector store and the chunker
+            raise VideoProcessingError("Cannot re-index the transcription: application resources are missing")
+        if url_changed:
+            video.status = "pending"
+        elif transcription_changed:
+            segments = untimed_segments(transcription or "")
+            await store_transcript(self.db, video.id, segments)
+            # New version for the caches keyed on updated_at, even when no other column changed
+            video.updated_at = func.now()
+            # Edited transcription: only the chunks around the edits are re-embedded. Done before
+            # the commit, so a failed re-index leaves the previous transcript in place
+            try:
+                await self._update_chroma_collection(video, segments)
+            except Exception:
+                await self.db.rollback()
+                raise
+
         await self.db.commit()
         await self.db.refresh(video)
+
+        if url_changed:
+            await self.ingestion_pool.submit(self.db, video.id)
         return video
 
     async def delete_video(self, video_id: UUID) -> bool:
         video = await self.get_video(video_id)
             
-        # Delete ChromaDB collection
+        # Delete ChromaDB collection (or the video's chunks in the shared one)
         try:
-            chroma_client.delete_collection(name=video.chroma_collection_id)
+            await self.resources.vector_store.delete_video_collection(video)
         except Exception:
             logger.warning(f"Failed to delete ChromaDB collection for video {video_id}")
             
+        if self.resources.answer_cache is not None:
+            self.resources.answer_cache.invalidate(video.id)
+
         # Delete from PostgreSQL
         await self.db.delete(video)
         await self.db.commit()
         return True
 
-    async def get_videos(self, skip: int = 0, limit: int = 100) -> List[Video]:
-        result = await self.db.execute(
-            select(Video).offset(skip).limit(limit)
+    async def get_videos(self, limit: int = 50, cursor: Optional[str] = None) -> VideoPage:
+        """
+        Newest videos first, keyset-paginated on (created_at, id). Transcripts
+        are not read, only whether the video has one.
+        """
+        query = (
+            select(Video, exists().where(TranscriptBlock.video_id == Video.id).label("has_transcription"))
+            .order_by(Video.created_at.desc(), Video.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            created_at, video_id = decode_cursor(cursor)
+            query = query.where(tuple_(Video.created_at, Video.id) < tuple_(created_at, video_id))
+
+        rows = (await self.db.execute(query)).all()
+        items = [
+            VideoSummary.model_validate(video).model_copy(update={"has_transcription": has_transcription})
+            for video, has_transcription in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1][0]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return VideoPage(items=items, next_cursor=next_cursor)
+
+    async def get_transcript(self, video_id: UUID, offset: int = 0, limit: int = 100_000) -> TranscriptPage:
+        """A character range of the transcription; only the blocks covering it are read."""
+        await self.get_video(video_id)
+        total_length, text = await load_text_range(self.db, video_id, offset, limit)
+        end = offset + len(text)
+        return TranscriptPage(
+            video_id=video_id,
+            offset=offset,
+            length=len(text),
+            total_length=total_length,
+            text=text,
+            next_offset=end if end < total_length else None,
+        )
+
+    async def get_transcript_segments(
+        self, video_id: UUID, start: Optional[float] = None, end: Optional[float] = None
+    ) -> TranscriptSegments:
+        """Timestamped segments overlapping [start, end] seconds; only the blocks covering the range are read."""
+        await self.get_video(video_id)
+        segments = await load_segments(self.db, video_id, start, end)
+        return TranscriptSegments(
+            video_id=video_id,
+            start=start,
+            end=end,
+            segments=[TranscriptSegment(**segment) for segment in segments if "start" in segment],
         )
-        return result.scalars().all() 
\ No newline at end of file
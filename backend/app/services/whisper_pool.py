@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import numpy as np
+
+from app.services.transcription_engines import SAMPLE_RATE, TranscriptionEngine, create_engine
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionBusyError(Exception):
+    """Raised when the transcription admission queue is full"""
+    pass
+
+
+# Engine loaded once per worker process by _init_worker
+_worker_engine: Optional[TranscriptionEngine] = None
+
+
+def _init_worker(
+    backend: str, model_name: str, threads: int, word_timestamps: bool, compute_type: Optional[str]
+) -> None:
+    global _worker_engine
+    _worker_engine = create_engine(backend, model_name, threads, word_timestamps, compute_type)
+    _worker_engine.load()
+
+
+def _transcribe_samples(samples: np.ndarray, offset: float) -> List[Dict[str, Any]]:
+    """Runs in a worker process. Returns segments shifted by `offset` seconds."""
+    segments = _worker_engine.transcribe(samples)
+    for segment in segments:
+        segment["start"] += offset
+        segment["end"] += offset
+        for word in segment["words"]:
+            word["start"] += offset
+            word["end"] += offset
+    return segments
+
+
+def _warmup() -> int:
+    return os.getpid()
+
+
+class WhisperInferencePool:
+    """
+    Worker processes each holding one loaded transcription engine (see
+    transcription_engines for the available backends).
+
+    The API process never loads a model itself, so it starts fast. Each engine
+    gets `threads` CPU threads, so the pool as a whole does not
+    oversubscribe the CPU. Admission is bounded: at most `max_concurrent_jobs`
+    transcriptions run at once. Up to `queue_size` more wait for a slot (each for
+    at most `admission_timeout` seconds), and any further request is rejected
+    with TranscriptionBusyError.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int,
+        threads: int,
+        max_concurrent_jobs: int,
+        queue_size: int,
+        admission_timeout: Optional[float],
+        backend: str = "whisper",
+        word_timestamps: bool = False,
+        compute_type: Optional[str] = None,
+    ):
+        # Fail fast on an unknown backend, before any worker is started
+        create_engine(backend, model_name)
+        self.backend = backend
+        self.model_name = model_name
+        self.word_timestamps = word_timestamps
+        self.compute_type = compute_type
+        self.workers = workers or os.cpu_count() or 1
+        self.threads = threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self.queue_size = queue_size
+        self.admission_timeout = admission_timeout
+        self._slots = asyncio.Semaphore(max_concurrent_jobs)
+        self._waiting = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logger.info(
+                f"Starting transcription pool: {self.workers} processes x {self.threads} threads "
+                f"(backend={self.backend}, model={self.model_name})"
+            )
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.backend, self.model_name, self.threads, self.word_timestamps, self.compute_type),
+            )
+        return self._executor
+
+    async def warmup(self) -> None:
+        """Start every worker process and load its model now instead of on first use."""
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        pids = await asyncio.gather(*(loop.run_in_executor(pool, _warmup) for _ in range(self.workers)))
+        logger.info(f"Transcription pool warmed up ({len(set(pids))} processes ready)")
+
+    @asynccontextmanager
+    async def admission(self) -> AsyncIterator[None]:
+        """Hold one transcription slot for the duration of the block."""
+        if self._slots.locked() and self._waiting >= self.queue_size:
+            raise TranscriptionBusyError("Trop de transcriptions en cours, réessayez plus tard")
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.admission_timeout)
+        except asyncio.TimeoutError:
+            raise TranscriptionBusyError("Trop de transcriptions en cours, réessayez plus tard")
+        finally:
+            self._waiting -= 1
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    async def transcribe_samples(self, samples: np.ndarray, offset: float = 0.0) -> List[Dict[str, Any]]:
+        """Transcribe 16 kHz mono samples in a worker. Call inside admission()."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), _transcribe_samples, samples, offset)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "threads": self.threads,
+            "waiting": self._waiting,
+            "started": int(self._executor is not None),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,111 @@
+"""
+Peak memory, temporary disk usage and wall time of the two audio modes on a
+local file, fully offline:
+
+- file: what yt-dlp's FFmpegExtractAudio does, a full WAV written to a temp
+  dir, then decoded again into memory before transcription
+- stream: a single ffmpeg decode straight to 16 kHz PCM, transcribed window by
+  window (TranscriptionService.transcribe_stream)
+
+Each mode runs in a fresh child process so its peak RSS is its own. The fake
+transcription backend is used by default so only the audio pipeline is
+measured; pass --backend whisper to include a real model.
+
+Usage (from backend/):
+    python scripts/bench_audio_pipeline.py path/to/lecture.mp3
+    # No audio at hand: generate one hour of test tone with ffmpeg
+    python scripts/bench_audio_pipeline.py --generate 3600
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def child(args) -> None:
+    os.environ["TRANSCRIPTION_BACKEND"] = args.backend
+    os.environ["TRANSCRIPTION_AUDIO_MODE"] = args.mode
+    os.environ["TRANSCRIPTION_WORKERS"] = str(args.workers)
+    import bench_support  # noqa: F401  (env defaults and sys.path)
+    from app.services.transcription_service import transcription_service
+
+    await transcription_service.warmup()
+    disk_bytes = 0
+    start = time.perf_counter()
+    if args.mode == "stream":
+        result = await transcription_service.transcribe_stream(args.audio)
+    else:
+        temp_dir = Path(tempfile.mkdtemp())
+        wav_path = temp_dir / "audio.wav"
+        subprocess.run(
+            ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", args.audio, str(wav_path)], check=True
+        )
+        disk_bytes = wav_path.stat().st_size
+        result = await transcription_service.transcribe_audio(str(wav_path))
+        transcription_service.cleanup_audio(str(wav_path))
+    elapsed = time.perf_counter() - start
+    transcription_service.shutdown()
+
+    print(json.dumps({
+        "seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "temp_disk_mb": disk_bytes / 1024 / 1024,
+        "segments": len(result["segments"]),
+    }))
+
+
+def main(args) -> None:
+    audio = args.audio
+    if args.generate:
+        audio = str(Path(tempfile.mkdtemp()) / f"tone_{int(args.generate)}s.mp3")
+        subprocess.run(
+            ["ffmpeg", "-nostdin", "-loglevel", "error", "-f", "lavfi",
+             "-i", f"sine=frequency=220:duration={args.generate}", "-ac", "2", "-ar", "44100", audio],
+            check=True,
+        )
+    if not audio:
+        sys.exit("Give an audio file or --generate SECONDS")
+
+    print(f"{audio} ({Path(audio).stat().st_size / 1024 / 1024:.1f} MB), backend={args.backend}, workers={args.workers}")
+    print(f"{'mode':<8} {'wall':>8} {'peak RSS':>10} {'temp disk':>10} {'segments':>9}")
+    for mode in args.modes:
+        completed = subprocess.run(
+            [sys.executable, __file__, audio, "--child", mode,
+             "--backend", args.backend, "--workers", str(args.workers)],
+            capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            error = (completed.stderr.strip().splitlines() or ["failed"])[-1]
+            print(f"{mode:<8} error: {error}")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(
+            f"{mode:<8} {result['seconds']:7.1f}s {result['peak_rss_mb']:8.0f}MB "
+            f"{result['temp_disk_mb']:8.0f}MB {result['segments']:9d}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", nargs="?")
+    parser.add_argument("--generate", type=float, default=0.0, help="generate N seconds of test tone instead")
+    parser.add_argument("--modes", nargs="+", default=["file", "stream"], choices=["file", "stream"])
+    parser.add_argument("--backend", default="fake")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--child", metavar="MODE", dest="mode", help=argparse.SUPPRESS)
+    parsed = parser.parse_args()
+    if parsed.mode:
+        asyncio.run(child(parsed))
+    else:
+        main(parsed)
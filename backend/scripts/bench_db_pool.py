@@ -0,0 +1,162 @@
+"""
+Connection pool under concurrent QAService.ask_question traffic: a fixed
+number of clients ask questions in a loop for a while, against a real
+PostgreSQL and stubbed embeddings, LLM and vector store.
+
+"hold" reproduces the previous behaviour, where a question kept its pooled
+connection from the video lookup to the history insert, LLM call included.
+"release" is the current one: the connection goes back to the pool before
+each slow call. For each mode the script prints the throughput, latency
+overhead over the stubbed backends, peak connections checked out and the
+pool timeouts; the pool is sized correctly when the peak stays below
+DB_POOL_SIZE and there are no timeouts.
+
+Needs a migrated database (DATABASE_URL or --database-url). A bench video is
+inserted and deleted at the end with its history and keyword index.
+
+Usage (from backend/):
+    python scripts/bench_db_pool.py --clients 200 --pool-size 10 --max-overflow 0
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import List
+
+from bench_support import (
+    FakeBlockingEmbeddings,
+    FakeChatModel,
+    FakeVectorStore,
+    default_text_splitter,
+    percentile,
+)
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.resources import AppResources
+from app.db.base import build_engine
+from app.models.video import Video
+from app.schemas.qa import QuestionCreate
+from app.services.embeddings import AsyncEmbeddings
+from app.services.qa_service import QAService
+
+
+class HoldingQAService(QAService):
+    """Keeps the connection across the slow calls, as QAService used to."""
+
+    async def _release_connection(self) -> None:
+        return None
+
+
+class PoolGauge:
+    """Connections checked out of the engine's pool, from the pool events."""
+
+    def __init__(self, engine):
+        self.checked_out = 0
+        self.peak = 0
+        event.listen(engine.sync_engine, "checkout", self._checkout)
+        event.listen(engine.sync_engine, "checkin", self._checkin)
+
+    def _checkout(self, *args) -> None:
+        self.checked_out += 1
+        self.peak = max(self.peak, self.checked_out)
+
+    def _checkin(self, *args) -> None:
+        self.checked_out -= 1
+
+
+async def run(mode: str, args, video_id: uuid.UUID) -> None:
+    engine = build_engine(
+        args.database_url,
+        echo=False,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        pool_timeout=args.pool_timeout,
+    )
+    gauge = PoolGauge(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    resources = AppResources(
+        embeddings=AsyncEmbeddings(FakeBlockingEmbeddings(args.embedding_latency)),
+        llm=FakeChatModel(latency=args.llm_latency),
+        text_splitter=default_text_splitter(),
+        vector_store=FakeVectorStore(),
+        session_factory=session_factory,
+    )
+    service_cls = HoldingQAService if mode == "hold" else QAService
+    latencies: List[float] = []
+    timeouts = 0
+    deadline = time.perf_counter() + args.duration
+
+    async def client(n: int) -> None:
+        nonlocal timeouts
+        i = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                async with session_factory() as db:
+                    await service_cls(db, resources).ask_question(
+                        QuestionCreate(video_id=video_id, question=f"Question {n}-{i} ?")
+                    )
+                latencies.append(time.perf_counter() - start)
+            except PoolTimeoutError:
+                timeouts += 1
+            i += 1
+
+    try:
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(client(n) for n in range(args.clients)))
+        wall = time.perf_counter() - wall_start
+    finally:
+        await engine.dispose()
+
+    floor = (args.embedding_latency + args.llm_latency) * 1000
+    ms = [t * 1000 for t in latencies] or [0.0]
+    print(
+        f"{mode:<8} {len(latencies) / wall:8.1f} req/s  "
+        f"overhead p50={percentile(ms, 50) - floor:7.1f}ms p95={percentile(ms, 95) - floor:7.1f}ms  "
+        f"peak={gauge.peak:>3}/{args.pool_size}+{args.max_overflow}  timeouts={timeouts}"
+    )
+
+
+async def main(args) -> None:
+    engine = build_engine(args.database_url, echo=False, pool_size=1, max_overflow=0)
+    video_id = uuid.uuid4()
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            db.add(Video(
+                id=video_id,
+                url="https://bench.invalid/db-pool",
+                title="bench_db_pool",
+                status="completed",
+                chroma_collection_id="video_bench",
+            ))
+            await db.commit()
+
+        print(
+            f"{args.clients} clients for {args.duration:.0f}s, embedding {args.embedding_latency * 1000:.0f}ms "
+            f"+ LLM {args.llm_latency * 1000:.0f}ms per question"
+        )
+        for mode in args.modes:
+            await run(mode, args, video_id)
+    finally:
+        async with engine.begin() as conn:
+            # Cascades to the bench history and keyword index
+            await conn.execute(text("DELETE FROM videos WHERE id = :id"), {"id": video_id})
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to the application's DATABASE_URL")
+    parser.add_argument("--clients", type=int, default=200, help="concurrent questions in flight")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per mode")
+    parser.add_argument("--pool-size", type=int, default=settings.DB_POOL_SIZE)
+    parser.add_argument("--max-overflow", type=int, default=settings.DB_MAX_OVERFLOW)
+    parser.add_argument("--pool-timeout", type=float, default=settings.DB_POOL_TIMEOUT_SECONDS)
+    parser.add_argument("--embedding-latency", type=float, default=0.05, help="seconds per embedding call")
+    parser.add_argument("--llm-latency", type=float, default=1.5, help="seconds per answer")
+    parser.add_argument("--modes", nargs="+", default=["hold", "release"], choices=["hold", "release"])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,133 @@
+"""
+Embedding throughput of one OpenAIEmbeddings call versus the token-packed
+concurrent scheduler, against the local fake embedding server (started by
+this script, no OpenAI key needed).
+
+Scenarios:
+- clean server: latency only
+- flaky server: random 500s (per request); the single call fails as a whole, the scheduler
+  retries only the failed batches
+- rate-limited server: more tokens than one minute of budget; the single
+  call is rejected with 429, the scheduler spreads the batches over time
+  to stay under the limit (this scenario takes a bit over a minute)
+
+Usage (from backend/):
+    python scripts/bench_embedding_scheduler.py --chunks 400 --concurrency 1 4 8
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+
+import bench_support  # noqa: F401  (env defaults and sys.path)
+from langchain_openai import OpenAIEmbeddings
+
+from app.services.embedding_scheduler import EmbeddingScheduler
+from app.services.embeddings import AsyncEmbeddings
+
+SERVER = Path(__file__).resolve().parent / "fake_embedding_server.py"
+
+
+def make_texts(count: int) -> List[str]:
+    sentence = "Dans cette partie de la vidéo, l'intervenant explique le fonctionnement du modèle {}. "
+    return [(sentence.format(i) * 8).strip() for i in range(count)]
+
+
+async def start_server(port: int, *flags: str) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, str(SERVER), "--port", str(port), *flags])
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(f"http://127.0.0.1:{port}/stats")
+                return process
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Fake embedding server did not start")
+
+
+async def server_stats(port: int) -> dict:
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"http://127.0.0.1:{port}/stats")).json()
+
+
+def openai_embeddings(port: int, chunk_size: int) -> AsyncEmbeddings:
+    return AsyncEmbeddings(OpenAIEmbeddings(
+        model="text-embedding-3-small",
+        openai_api_key="sk-bench",
+        base_url=f"http://127.0.0.1:{port}/v1",
+        chunk_size=chunk_size,
+        max_retries=0,
+        # Send raw strings: no tiktoken vocabulary download needed
+        check_embedding_ctx_length=False,
+    ))
+
+
+async def scenario(name: str, port: int, texts: List[str], args, budget: int, server_flags=()) -> None:
+    print(f"\n== {name} ==")
+    runs = [("single call", None)] + [(f"scheduler x{c}", c) for c in args.concurrency]
+    for label, concurrency in runs:
+        server = await start_server(port, *server_flags)
+        try:
+            start = time.perf_counter()
+            retries = ""
+            try:
+                if concurrency is None:
+                    await openai_embeddings(port, 1000).embed_documents(texts)
+                else:
+                    scheduler = EmbeddingScheduler(
+                        openai_embeddings(port, args.batch_size),
+                        tokens_per_minute=budget,
+                        max_batch_tokens=args.batch_tokens,
+                        max_batch_size=args.batch_size,
+                        concurrency=concurrency,
+                        max_retries=5,
+                        retry_backoff=0.2,
+                    )
+                    await scheduler.embed_documents(texts)
+                    retries = f"batches={scheduler.batches} retries={scheduler.retries}"
+                outcome = "ok"
+            except Exception as e:
+                outcome = f"failed ({type(e).__name__})"
+            elapsed = time.perf_counter() - start
+            stats = await server_stats(port)
+            print(
+                f"{label:<14} {elapsed:7.2f}s  {outcome:<22} {retries:<22} "
+                f"requests={stats['requests']} 429s={stats['rate_limited']} 500s={stats['failed']}"
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def run(args) -> None:
+    texts = make_texts(args.chunks)
+    print(f"{len(texts)} chunks of ~{len(texts[0])} characters")
+    unlimited = 10_000_000
+    await scenario("clean server", args.port, texts, args, unlimited)
+    await scenario(
+        f"flaky server ({args.failure_rate:.0%} errors)", args.port, texts, args, unlimited,
+        ("--failure-rate", str(args.failure_rate)),
+    )
+    await scenario(
+        f"rate-limited server ({args.server_tpm} TPM, scheduler budget {args.tpm})",
+        args.port, texts, args, args.tpm, ("--tpm", str(args.server_tpm)),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--batch-tokens", type=int, default=8000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--tpm", type=int, default=40_000, help="scheduler budget")
+    parser.add_argument("--server-tpm", type=int, default=45_000, help="fake server limit")
+    parser.add_argument("--failure-rate", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=8099)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""
+Recall and latency of HNSW indexes for a grid of M and search ef values, to
+choose HNSW_M / HNSW_SEARCH_EF for a given number of chunks per collection.
+
+Runs on hnswlib directly, the library Chroma builds its indexes with, so the
+numbers exclude Chroma's HTTP and filtering overhead. Recall@k is measured
+against exact cosine search. Vectors are synthetic: random topic centroids
+with noise, normalized like OpenAI embeddings. Pass --vectors file.npy to use
+real embeddings exported from a collection.
+
+Sizes to try: a long video is a few hundred chunks (per_video layout), a whole
+library is tens of thousands (shared layout).
+
+Usage (from backend/):
+    python scripts/bench_hnsw.py --chunks 50000 --m 8 16 32 --ef 10 50 100 200
+"""
+import argparse
+import time
+
+import hnswlib
+import numpy as np
+
+
+def synthetic_vectors(count: int, dim: int, topics: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = rng.standard_normal((topics, dim)).astype(np.float32)
+    vectors = centroids[rng.integers(0, topics, count)] + 0.8 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(data: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ data.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def main(args) -> None:
+    rng = np.random.default_rng(0)
+    if args.vectors:
+        data = np.load(args.vectors).astype(np.float32)
+        data /= np.linalg.norm(data, axis=1, keepdims=True)
+    else:
+        data = synthetic_vectors(args.chunks, args.dim, args.topics, rng)
+    # Queries close to, but not equal to, indexed chunks (questions about a passage)
+    picks = rng.integers(0, len(data), args.queries)
+    queries = data[picks] + 0.5 * rng.standard_normal((args.queries, data.shape[1])).astype(np.float32) / np.sqrt(data.shape[1])
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    truth = exact_top_k(data, queries, args.k)
+    print(f"{len(data)} vectors x {data.shape[1]} dims, {args.queries} queries, recall@{args.k}, "
+          f"construction_ef={args.construction_ef}")
+    print(f"{'M':>3} {'build':>8} {'memory':>9} {'ef':>5} {'recall':>7} {'p50':>8} {'p95':>8}")
+
+    for m in args.m:
+        index = hnswlib.Index(space="cosine", dim=data.shape[1])
+        start = time.perf_counter()
+        index.init_index(max_elements=len(data), ef_construction=args.construction_ef, M=m)
+        index.set_num_threads(args.threads)
+        index.add_items(data, np.arange(len(data)))
+        build = time.perf_counter() - start
+        # Graph links only, vectors excluded (they cost the same for every M)
+        links_mb = len(data) * m * 2 * 4 / 1e6
+        index.set_num_threads(1)
+        for ef in args.ef:
+            index.set_ef(max(ef, args.k))
+            latencies = []
+            found = []
+            for query in queries:
+                start = time.perf_counter()
+                labels, _ = index.knn_query(query, k=args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                found.append(labels[0])
+            recall = np.mean([len(set(f) & set(t)) / args.k for f, t in zip(found, truth)])
+            print(
+                f"{m:>3} {build:7.1f}s {links_mb:7.1f}MB {ef:>5} {recall:7.3f} "
+                f"{np.percentile(latencies, 50):6.3f}ms {np.percentile(latencies, 95):6.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--topics", type=int, default=200, help="synthetic clusters (videos / subjects)")
+    parser.add_argument("--vectors", help=".npy file of real embeddings instead of synthetic ones")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--ef", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--construction-ef", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=-1, help="build threads, -1 = all cores")
+    main(parser.parse_args())
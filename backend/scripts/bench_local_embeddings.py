@@ -0,0 +1,81 @@
+"""
+Query latency and document throughput of the local sentence-transformers
+backend versus the OpenAI embeddings API.
+
+The API side defaults to the local fake embedding server (started by this
+script, with a simulated round trip); pass --openai to measure the real API
+with OPENAI_API_KEY. The local side needs the optional sentence-transformers
+package.
+
+Usage (from backend/):
+    python scripts/bench_local_embeddings.py --queries 50 --chunks 400 --workers 1 2
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import List
+
+import bench_support  # noqa: F401  (env defaults and sys.path)
+from bench_support import percentile
+from bench_embedding_scheduler import make_texts, openai_embeddings, start_server
+from langchain_openai import OpenAIEmbeddings
+
+from app.core.config import settings
+from app.services.embeddings import AsyncEmbeddings
+from app.services.local_embeddings import LocalEmbeddings
+
+
+async def measure(label: str, embeddings, queries: List[str], texts: List[str]) -> None:
+    await embeddings.embed_query("warmup")
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        await embeddings.embed_query(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    await embeddings.embed_documents(texts)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<22} query p50={percentile(latencies, 50):7.1f}ms p95={percentile(latencies, 95):7.1f}ms  "
+        f"documents={len(texts) / elapsed:7.1f}/s"
+    )
+
+
+async def run(args) -> None:
+    queries = [f"Que dit l'intervenant sur le modèle {i} ?" for i in range(args.queries)]
+    texts = make_texts(args.chunks)
+    print(f"{len(queries)} queries, {len(texts)} chunks, {os.cpu_count()} CPU cores")
+
+    if args.openai:
+        await measure(settings.OPENAI_EMBEDDING_MODEL, AsyncEmbeddings(OpenAIEmbeddings(
+            model=settings.OPENAI_EMBEDDING_MODEL, openai_api_key=settings.OPENAI_API_KEY,
+        )), queries, texts)
+    else:
+        server = await start_server(args.port, "--latency", str(args.api_latency))
+        try:
+            await measure("fake API", openai_embeddings(args.port, 256), queries, texts)
+        finally:
+            server.terminate()
+            server.wait()
+
+    for workers in args.workers:
+        local = LocalEmbeddings(args.model, workers=workers, batch_size=args.batch_size)
+        try:
+            await local.warmup()
+            await measure(f"local x{workers}", local, queries, texts)
+        finally:
+            local.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--chunks", type=int, default=400)
+    parser.add_argument("--model", default=settings.LOCAL_EMBEDDING_MODEL)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--openai", action="store_true", help="measure the real OpenAI API")
+    parser.add_argument("--api-latency", type=float, default=0.15, help="fake server round trip, seconds")
+    parser.add_argument("--port", type=int, default=8099)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,74 @@
+"""
+Speed-up of the long audio mode versus the number of worker processes, on a
+local audio file (any format ffmpeg can decode).
+
+Each run warms its inference pool up (loads one Whisper model per process)
+before timing, so the figures only cover transcription.
+
+Usage (from backend/):
+    python scripts/bench_long_audio.py path/to/lecture.mp3 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import whisper  # noqa: E402
+
+from app.services.long_audio import LongAudioTranscriber  # noqa: E402
+from app.services.whisper_pool import SAMPLE_RATE, WhisperInferencePool  # noqa: E402
+
+
+async def run(args) -> None:
+    audio = whisper.load_audio(args.audio)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"{args.audio}: {duration:.0f}s of audio, {os.cpu_count()} CPU cores, model={args.model}")
+
+    baseline = None
+    if not args.skip_single:
+        model = whisper.load_model(args.model)
+        start = time.perf_counter()
+        model.transcribe(audio, fp16=False)
+        baseline = time.perf_counter() - start
+        print(f"single model.transcribe  {baseline:8.1f}s  RTF={baseline / duration:.3f}")
+
+    reference = None
+    for workers in args.workers:
+        pool = WhisperInferencePool(
+            args.model, workers, args.threads,
+            max_concurrent_jobs=1, queue_size=0, admission_timeout=None, backend=args.backend
+        )
+        transcriber = LongAudioTranscriber(pool, args.window, args.overlap, args.silence_search)
+        await pool.warmup()
+
+        start = time.perf_counter()
+        result = await transcriber.transcribe(audio)
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+
+        reference = reference or elapsed
+        line = (
+            f"long audio workers={workers:<3} threads={pool.threads:<3} "
+            f"{elapsed:8.1f}s  RTF={elapsed / duration:.3f}  speed-up vs 1st run={reference / elapsed:5.2f}x"
+        )
+        if baseline:
+            line += f"  vs single={baseline / elapsed:5.2f}x"
+        print(f"{line}  segments={len(result['segments'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio")
+    parser.add_argument("--backend", default="whisper")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--threads", type=int, default=0, help="per worker, 0 = cores / workers")
+    parser.add_argument("--window", type=float, default=300.0, help="window length in seconds")
+    parser.add_argument("--overlap", type=float, default=5.0)
+    parser.add_argument("--silence-search", type=float, default=10.0)
+    parser.add_argument("--skip-single", action="store_true", help="skip the single model.transcribe baseline")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,86 @@
+"""
+p50/p99 latency of concurrent QAService.ask_question calls against stubbed
+backends (sync-only embeddings client, async vector store, async LLM, fake DB).
+
+"blocking" reproduces the previous behaviour, where the embedding call ran
+directly on the event loop. "async" uses the AsyncEmbeddings adapter, which
+moves it to the bounded thread pool.
+
+Usage (from backend/):
+    python scripts/bench_qa_concurrency.py --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_support import (
+    FakeBlockingEmbeddings,
+    FakeChatModel,
+    FakeSession,
+    FakeVectorStore,
+    default_text_splitter,
+    fake_video,
+    percentile,
+)
+
+from app.core.resources import AppResources
+from app.schemas.qa import QuestionCreate
+from app.services.embeddings import AsyncEmbeddings
+from app.services.qa_service import QAService
+
+
+class BlockingEmbeddings(AsyncEmbeddings):
+    """Calls the sync client on the event loop, as QAService used to."""
+
+    async def embed_query(self, text):
+        return self.model.embed_query(text)
+
+    async def embed_documents(self, texts):
+        return self.model.embed_documents(texts)
+
+
+async def run(mode: str, concurrency: int, embedding_latency: float, threads: int) -> None:
+    executor = ThreadPoolExecutor(max_workers=threads)
+    adapter_cls = BlockingEmbeddings if mode == "blocking" else AsyncEmbeddings
+    video = fake_video()
+    resources = AppResources(
+        embeddings=adapter_cls(FakeBlockingEmbeddings(embedding_latency), executor),
+        llm=FakeChatModel(),
+        text_splitter=default_text_splitter(),
+        vector_store=FakeVectorStore(),
+        executor=executor,
+        session_factory=lambda: FakeSession(video),
+    )
+
+    async def one_request(i: int) -> float:
+        start = time.perf_counter()
+        service = QAService(FakeSession(video), resources)
+        await service.ask_question(QuestionCreate(video_id=video.id, question=f"Question {i} ?"))
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    latencies = await asyncio.gather(*(one_request(i) for i in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    executor.shutdown()
+
+    ms = [t * 1000 for t in latencies]
+    print(
+        f"{mode:<9} n={concurrency} wall={wall * 1000:8.1f}ms "
+        f"p50={statistics.median(ms):8.1f}ms p99={percentile(ms, 99):8.1f}ms"
+    )
+
+
+async def main(args) -> None:
+    for mode in args.modes:
+        await run(mode, args.concurrency, args.embedding_latency, args.threads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--embedding-latency", type=float, default=0.05, help="seconds per embedding call")
+    parser.add_argument("--threads", type=int, default=8, help="size of the blocking-call thread pool")
+    parser.add_argument("--modes", nargs="+", default=["blocking", "async"], choices=["blocking", "async"])
+    asyncio.run(main(parser.parse_args()))
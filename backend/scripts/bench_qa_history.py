@@ -0,0 +1,195 @@
+"""
+QA history queries on a synthetic qa_history table of a million rows:
+page latency without and with the (video_id, created_at) index, OFFSET
+versus keyset (cursor) pagination, and the storage of the full context text
+versus the compact context_refs.
+
+Needs a PostgreSQL server (DATABASE_URL or --database-url). Everything
+happens in a separate schema, bench_qa_history, dropped at the end unless
+--keep is given; the application tables are not touched.
+
+Usage (from backend/):
+    python scripts/bench_qa_history.py --rows 1000000 --videos 1000
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List
+from uuid import UUID
+
+import bench_support  # noqa: F401  (env defaults and sys.path)
+from bench_support import percentile
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.config import settings
+
+SCHEMA = "bench_qa_history"
+TABLE = f"{SCHEMA}.qa_history"
+INSERT_BATCH = 100_000
+
+# Columns read by a history page: the legacy rows carried the context text, new ones its refs
+FULL_COLUMNS = "id, video_id, question, answer, context, context_tokens, created_at"
+COMPACT_COLUMNS = "id, video_id, question, answer, context_refs, context_tokens, created_at"
+
+
+async def create_table(conn: AsyncConnection, rows: int, videos: int, context_chars: int) -> None:
+    await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}"))
+    await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    await conn.execute(text(f"""
+        CREATE TABLE {TABLE} (
+            id uuid PRIMARY KEY,
+            video_id uuid NOT NULL,
+            question varchar NOT NULL,
+            answer varchar NOT NULL,
+            context varchar,
+            context_refs jsonb,
+            context_tokens integer,
+            created_at timestamptz NOT NULL
+        )
+    """))
+    # md5 hex words: compresses about as poorly as real transcript text
+    words = max(context_chars // 33, 1)
+    for first in range(1, rows + 1, INSERT_BATCH):
+        last = min(first + INSERT_BATCH - 1, rows)
+        start = time.perf_counter()
+        await conn.execute(text(f"""
+            INSERT INTO {TABLE}
+            SELECT
+                md5('row' || i)::uuid,
+                md5('video' || (i % :videos))::uuid,
+                'Question numéro ' || i || ' sur la vidéo ?',
+                repeat('Réponse détaillée. ', 20),
+                (SELECT string_agg(md5((i::bigint * :words + g)::text), ' ') FROM generate_series(1, :words) g),
+                jsonb_build_object('mode', 'hybrid', 'chunks', (
+                    SELECT jsonb_agg(jsonb_build_array(md5('chunk' || (i::bigint * 8 + g)), round(1.0 / (60 + g), 5)))
+                    FROM generate_series(1, 8) g
+                )),
+                :context_chars / 4,
+                now() - make_interval(secs => :rows - i)
+            FROM generate_series(:first, :last) i
+        """), {"videos": videos, "words": words, "context_chars": context_chars, "rows": rows,
+               "first": first, "last": last})
+        await conn.commit()
+        print(f"  inserted {last:>9} rows ({time.perf_counter() - start:.1f}s)")
+    await conn.execute(text(f"ANALYZE {TABLE}"))
+    await conn.commit()
+
+
+async def storage(conn: AsyncConnection) -> None:
+    row = (await conn.execute(text(f"""
+        SELECT count(*), avg(pg_column_size(context)), avg(pg_column_size(context_refs)),
+               pg_total_relation_size('{TABLE}')
+        FROM {TABLE}
+    """))).one()
+    count, context_bytes, refs_bytes, total = row
+    print(f"storage: {count} rows, {total / 1e6:.0f} MB with both columns")
+    print(f"  context text  {context_bytes:8.0f} B/row  ({context_bytes * count / 1e6:7.0f} MB)")
+    print(f"  context_refs  {refs_bytes:8.0f} B/row  ({refs_bytes * count / 1e6:7.0f} MB)")
+
+
+async def plan(conn: AsyncConnection, sql: str, params: Dict) -> str:
+    result = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params)).scalar()
+    node = result[0]["Plan"]
+    kinds = []
+    while node:
+        kinds.append(node["Node Type"] + (f" on {node['Index Name']}" if "Index Name" in node else ""))
+        node = (node.get("Plans") or [None])[0]
+    return " > ".join(kinds)
+
+
+async def timed(conn: AsyncConnection, sql: str, params_list: List[Dict]) -> List[float]:
+    latencies = []
+    for params in params_list:
+        start = time.perf_counter()
+        (await conn.execute(text(sql), params)).all()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def measure(conn: AsyncConnection, label: str, video_ids: List[UUID], page: int, depth: int) -> None:
+    order = "ORDER BY created_at DESC, id DESC"
+    # Cursor of each video's row at `depth`, for the keyset deep page
+    cursors = []
+    for video_id in video_ids:
+        row = (await conn.execute(
+            text(f"SELECT created_at, id FROM {TABLE} WHERE video_id = :video_id {order} OFFSET :depth LIMIT 1"),
+            {"video_id": video_id, "depth": depth - 1}
+        )).one_or_none()
+        if row is not None:
+            cursors.append({"video_id": video_id, "created_at": row[0], "id": row[1], "limit": page})
+
+    first = {"sql": f"SELECT {{columns}} FROM {TABLE} WHERE video_id = :video_id {order} LIMIT :limit",
+             "params": [{"video_id": v, "limit": page} for v in video_ids]}
+    queries = {
+        "first page, full rows": (first["sql"].format(columns=FULL_COLUMNS), first["params"]),
+        "first page, compact": (first["sql"].format(columns=COMPACT_COLUMNS), first["params"]),
+        f"page at {depth}, OFFSET": (
+            f"SELECT {COMPACT_COLUMNS} FROM {TABLE} WHERE video_id = :video_id {order} OFFSET :offset LIMIT :limit",
+            [{"video_id": v, "offset": depth, "limit": page} for v in video_ids],
+        ),
+        f"page at {depth}, cursor": (
+            f"SELECT {COMPACT_COLUMNS} FROM {TABLE} WHERE video_id = :video_id "
+            f"AND (created_at, id) < (:created_at, :id) {order} LIMIT :limit",
+            cursors,
+        ),
+    }
+    print(f"\n{label}")
+    print(f"{'query':<26}{'p50':>10}{'p95':>10}  plan")
+    for name, (sql, params_list) in queries.items():
+        if not params_list:
+            continue
+        await timed(conn, sql, params_list[:3])  # warm the cache
+        latencies = await timed(conn, sql, params_list)
+        print(
+            f"{name:<26}{percentile(latencies, 50):8.2f}ms{percentile(latencies, 95):8.2f}ms  "
+            f"{await plan(conn, sql, params_list[0])}"
+        )
+
+
+async def run(args) -> None:
+    engine = create_async_engine(args.database_url or settings.DATABASE_URL)
+    try:
+        async with engine.connect() as conn:
+            print(f"Creating {args.rows} rows over {args.videos} videos ({args.context_chars} chars of context each)")
+            await create_table(conn, args.rows, args.videos, args.context_chars)
+            await storage(conn)
+
+            video_ids = [
+                (await conn.execute(text("SELECT md5('video' || :n)::uuid"), {"n": str(n)})).scalar()
+                for n in random.Random(0).sample(range(args.videos), min(args.samples, args.videos))
+            ]
+            depth = min(args.depth, args.rows // args.videos - args.page)
+
+            await measure(conn, "Without index (primary key only)", video_ids, args.page, depth)
+
+            start = time.perf_counter()
+            await conn.execute(text(
+                f"CREATE INDEX ix_bench_qa_history_video_id_created_at ON {TABLE} (video_id, created_at)"
+            ))
+            await conn.execute(text(f"ANALYZE {TABLE}"))
+            await conn.commit()
+            print(f"\nIndex (video_id, created_at) built in {time.perf_counter() - start:.1f}s")
+
+            await measure(conn, "With index (video_id, created_at)", video_ids, args.page, depth)
+
+            if not args.keep:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+                await conn.commit()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to the application's DATABASE_URL")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--videos", type=int, default=1000)
+    parser.add_argument("--context-chars", type=int, default=6000, help="context text per row (~1500 tokens)")
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=500, help="rows skipped before the deep page")
+    parser.add_argument("--samples", type=int, default=50, help="videos queried per measurement")
+    parser.add_argument("--keep", action="store_true", help="keep the bench_qa_history schema")
+    asyncio.run(run(parser.parse_args()))
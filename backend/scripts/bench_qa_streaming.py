@@ -0,0 +1,65 @@
+"""
+Time-to-first-token of QAService.stream_answer compared with the total time
+of ask_question, using the fake streaming chat model and stubbed backends.
+
+Usage (from backend/):
+    python scripts/bench_qa_streaming.py --llm-latency 2.0
+"""
+import argparse
+import asyncio
+import time
+
+from bench_support import (
+    FakeBlockingEmbeddings,
+    FakeChatModel,
+    FakeSession,
+    FakeVectorStore,
+    default_text_splitter,
+    fake_video,
+)
+
+from app.core.resources import AppResources
+from app.schemas.qa import QuestionCreate
+from app.services.embeddings import AsyncEmbeddings
+from app.services.qa_service import QAService
+
+
+async def main(llm_latency: float) -> None:
+    answer = " ".join(f"mot{i}" for i in range(200))
+    video = fake_video()
+    resources = AppResources(
+        embeddings=AsyncEmbeddings(FakeBlockingEmbeddings(0.01)),
+        llm=FakeChatModel(latency=llm_latency, answer=answer),
+        text_splitter=default_text_splitter(),
+        vector_store=FakeVectorStore(),
+        session_factory=lambda: FakeSession(video),
+    )
+    question = QuestionCreate(video_id=video.id, question="De quoi parle la vidéo ?")
+
+    start = time.perf_counter()
+    await QAService(FakeSession(video), resources).ask_question(question)
+    blocking_total = time.perf_counter() - start
+
+    service = QAService(FakeSession(video), resources)
+    start = time.perf_counter()
+    prepared = await service.prepare_question(question)
+    first_token = None
+    tokens = []
+    async for event, payload in service.stream_answer(prepared):
+        if event == "token":
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            tokens.append(payload)
+        else:
+            history = payload
+    streaming_total = time.perf_counter() - start
+
+    assert "".join(tokens) == answer == history.answer, "streamed answer differs from the persisted one"
+    print(f"ask_question        total={blocking_total * 1000:8.1f}ms (first byte = total)")
+    print(f"stream_answer  first-token={first_token * 1000:8.1f}ms total={streaming_total * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=2.0, help="seconds to generate the full answer")
+    asyncio.run(main(parser.parse_args().llm_latency))
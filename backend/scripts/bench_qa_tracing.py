@@ -0,0 +1,133 @@
+"""
+Cost of QA debug output on the request path: concurrent ask_question calls
+against stubbed backends, with no tracing, with the previous per-question
+text file written with a blocking open() ("files"), and with the sampled
+QATracer writing batches to a rotating JSONL file off the event loop
+("traced").
+
+Reports latency, the longest event loop stall seen by a ticker task, and
+what ended up on disk.
+
+Usage (from backend/):
+    python scripts/bench_qa_tracing.py --questions 2000 --concurrency 50 --sample-rate 0.1
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from bench_support import (
+    FakeBlockingEmbeddings,
+    FakeChatModel,
+    FakeSession,
+    FakeVectorStore,
+    default_text_splitter,
+    fake_video,
+    percentile,
+)
+
+from app.core.resources import AppResources
+from app.schemas.qa import QuestionCreate
+from app.services.embeddings import AsyncEmbeddings
+from app.services.qa_service import QAService
+from app.services.qa_tracing import JsonlTraceSink, QATracer
+from app.services.tokens import TokenCounter
+
+
+class FileDumpQAService(QAService):
+    """Writes one text file per answer from the event loop, as QAService used to."""
+
+    directory = "."
+
+    async def _finish(self, prepared, answer):
+        filename = os.path.join(
+            self.directory, f"qa_debug_{prepared.video.id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.txt"
+        )
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(f"QUESTION:\n{prepared.question}\n\nCONTEXT:\n{prepared.context}\n\nANSWER:\n{answer}\n")
+        return await super()._finish(prepared, answer)
+
+
+async def max_loop_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+def disk_usage(directory: str):
+    files = [os.path.join(directory, name) for name in os.listdir(directory)]
+    return len(files), sum(os.path.getsize(path) for path in files)
+
+
+async def run(mode: str, args, directory: str) -> None:
+    counter = TokenCounter("gpt-4-turbo-preview")
+    tracer = None
+    if mode == "traced":
+        tracer = QATracer(
+            JsonlTraceSink(directory, args.max_bytes, args.backups), args.sample_rate, counter, flush_interval=0.5
+        )
+        tracer.start()
+    video = fake_video()
+    resources = AppResources(
+        embeddings=AsyncEmbeddings(FakeBlockingEmbeddings(0.0)),
+        llm=FakeChatModel(latency=args.llm_latency),
+        text_splitter=default_text_splitter(),
+        vector_store=FakeVectorStore(
+            [f"Segment de transcription numéro {i}. " * 40 for i in range(50)], latency=0.001
+        ),
+        tracer=tracer,
+        session_factory=lambda: FakeSession(video, latency=0.0),
+    )
+    service_cls = FileDumpQAService if mode == "files" else QAService
+    FileDumpQAService.directory = directory
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one_request(i: int) -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            await service_cls(FakeSession(video, latency=0.0), resources).ask_question(
+                QuestionCreate(video_id=video.id, question=f"Question {i} ?")
+            )
+            return time.perf_counter() - start
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(max_loop_lag(stop))
+    wall_start = time.perf_counter()
+    latencies = await asyncio.gather(*(one_request(i) for i in range(args.questions)))
+    wall = time.perf_counter() - wall_start
+    stop.set()
+    worst_lag = await lag
+    if tracer is not None:
+        await tracer.stop()
+
+    ms = [t * 1000 for t in latencies]
+    files, size = disk_usage(directory)
+    print(
+        f"{mode:<7} {args.questions / wall:8.1f} req/s  p50={percentile(ms, 50):7.2f}ms p99={percentile(ms, 99):7.2f}ms  "
+        f"max loop stall={worst_lag * 1000:6.2f}ms  disk: {files} files, {size / 1e3:.0f} kB"
+    )
+
+
+async def main(args) -> None:
+    print(f"{args.questions} questions, {args.concurrency} concurrent, LLM {args.llm_latency * 1000:.0f}ms")
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory(prefix=f"qa_{mode}_", dir=args.dir) as directory:
+            await run(mode, args, directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.01, help="seconds per answer")
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument("--max-bytes", type=int, default=1_000_000, help="trace file size before rotation")
+    parser.add_argument("--backups", type=int, default=2)
+    parser.add_argument("--dir", help="where the output is written (a temporary directory inside it)")
+    parser.add_argument("--modes", nargs="+", default=["none", "files", "traced"], choices=["none", "files", "traced"])
+    asyncio.run(main(parser.parse_args()))
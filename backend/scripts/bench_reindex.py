@@ -0,0 +1,100 @@
+"""
+Embeddings spent re-indexing a video after typical transcription edits:
+delete-all + re-add (every chunk re-embedded) versus the content-addressed
+diff of reindex_collection.
+
+Runs on synthetic segments against an in-memory collection, no ChromaDB or
+OpenAI needed.
+
+Usage (from backend/):
+    python scripts/bench_reindex.py --segments 2000
+"""
+import argparse
+import asyncio
+import random
+from typing import Any, Dict, List
+
+import bench_support  # noqa: F401  (env defaults and sys.path)
+from bench_support import fake_vector
+
+from app.services.chunking import SegmentChunker
+from app.services.reindexer import reindex_collection
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = 0
+
+    async def embed_documents(self, texts: List[str], progress=None) -> List[List[float]]:
+        self.calls += len(texts)
+        return [fake_vector(text) for text in texts]
+
+
+class MemoryCollection:
+    name = "bench"
+
+    def __init__(self):
+        self.rows: Dict[str, Dict[str, Any]] = {}
+
+    async def get(self, limit=None, offset=0, include=None, **kwargs):
+        ids = list(self.rows)[offset:offset + limit if limit else None]
+        return {"ids": ids, "metadatas": [self.rows[i]["metadata"] for i in ids]}
+
+    async def delete(self, ids):
+        for chunk_id in ids:
+            self.rows.pop(chunk_id, None)
+
+    async def upsert(self, ids, documents, embeddings, metadatas):
+        for chunk_id, document, metadata in zip(ids, documents, metadatas):
+            self.rows[chunk_id] = {"document": document, "metadata": metadata}
+
+    async def update(self, ids, metadatas):
+        for chunk_id, metadata in zip(ids, metadatas):
+            self.rows[chunk_id]["metadata"] = metadata
+
+
+def synthetic_segments(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    words = (
+        "le la les un une de du et à en pour que qui dans sur avec modèle données réseau "
+        "apprentissage vecteur requête réponse question contexte vidéo transcription"
+    ).split()
+    return [
+        {"start": i * 4.0, "end": i * 4.0 + 4.0, "text": " ".join(rng.choice(words) for _ in range(rng.randint(6, 16)))}
+        for i in range(count)
+    ]
+
+
+def edits(segments: List[Dict[str, Any]], rng: random.Random) -> Dict[str, List[Dict[str, Any]]]:
+    middle = len(segments) // 2
+    fixed = [dict(segment) for segment in segments]
+    for index in rng.sample(range(len(segments)), 3):
+        fixed[index]["text"] += " (corrigé)"
+    return {
+        "unchanged": segments,
+        "insert 1 segment": segments[:middle] + [{"start": 0, "end": 0, "text": "Segment ajouté."}] + segments[middle:],
+        "delete 1 segment": segments[:middle] + segments[middle + 1:],
+        "fix 3 typos": fixed,
+        "append 10%": segments + synthetic_segments(len(segments) // 10, rng),
+    }
+
+
+async def run(args) -> None:
+    rng = random.Random(0)
+    chunker = SegmentChunker()
+    segments = synthetic_segments(args.segments, rng)
+    print(f"{'edit':<18} {'chunks':>7} {'delete-all':>11} {'diff':>6} {'saved':>6}")
+    for name, edited in edits(segments, rng).items():
+        collection, embeddings = MemoryCollection(), CountingEmbeddings()
+        await reindex_collection(collection, chunker.split_segments(segments), embeddings, {})
+        embeddings.calls = 0
+
+        chunks = chunker.split_segments(edited)
+        report = await reindex_collection(collection, chunks, embeddings, {})
+        assert embeddings.calls == report.added and len(collection.rows) == len(chunks)
+        print(f"{name:<18} {len(chunks):7d} {len(chunks):11d} {report.added:6d} {report.embeddings_saved:6d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=2000)
+    asyncio.run(run(parser.parse_args()))
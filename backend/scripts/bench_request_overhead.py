@@ -0,0 +1,90 @@
+"""
+Per-request overhead of QAService construction, before and after the shared
+AppResources container.
+
+"before" times only what the old QAService.__init__ built for every
+request: the OpenAI embeddings and chat clients, the output parser and the
+text splitter. "after" builds an AppResources once, outside the timing, and
+only constructs the lightweight QAService per request. No network call is
+made (the vector store is stubbed).
+
+Usage (from backend/):
+    python scripts/bench_request_overhead.py --requests 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from bench_support import FakeVectorStore, default_text_splitter
+from langchain_core.output_parsers import StrOutputParser
+from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+
+from app.core.config import settings
+from app.core.resources import AppResources
+from app.services.embeddings import AsyncEmbeddings
+from app.services.qa_service import QAService
+
+
+def _summary(label: str, timings: list) -> None:
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+    print(
+        f"{label:<8} mean={statistics.mean(timings_ms):8.3f}ms "
+        f"median={statistics.median(timings_ms):8.3f}ms p95={p95:8.3f}ms"
+    )
+
+
+def _old_per_request_clients() -> None:
+    """What QAService.__init__ used to build on every request, and nothing else."""
+    os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
+    OpenAIEmbeddings(
+        model=settings.OPENAI_EMBEDDING_MODEL,
+        openai_api_key=settings.OPENAI_API_KEY,
+        chunk_size=1000
+    )
+    ChatOpenAI(
+        temperature=0,
+        model=settings.OPENAI_MODEL,
+        openai_api_key=settings.OPENAI_API_KEY
+    )
+    StrOutputParser()
+    default_text_splitter()
+
+
+def _shared_resources() -> AppResources:
+    embeddings = OpenAIEmbeddings(
+        model=settings.OPENAI_EMBEDDING_MODEL,
+        openai_api_key=settings.OPENAI_API_KEY,
+        chunk_size=1000
+    )
+    llm = ChatOpenAI(temperature=0, model=settings.OPENAI_MODEL, openai_api_key=settings.OPENAI_API_KEY)
+    return AppResources(AsyncEmbeddings(embeddings), llm, default_text_splitter(), FakeVectorStore())
+
+
+async def bench(requests: int) -> None:
+    before = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        _old_per_request_clients()
+        before.append(time.perf_counter() - start)
+
+    shared = _shared_resources()
+    after = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        QAService(None, shared)
+        after.append(time.perf_counter() - start)
+
+    print(f"{requests} simulated requests")
+    _summary("before", before)
+    _summary("after", after)
+    print(f"speed-up: {statistics.mean(before) / max(statistics.mean(after), 1e-9):.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(bench(args.requests))
@@ -0,0 +1,226 @@
+"""
+Stub backends shared by the benchmark scripts: no OpenAI, ChromaDB or
+PostgreSQL needed. Latencies are configurable so each script can model the
+backend it is measuring.
+"""
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, List, Optional
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: E402
+from langchain_core.embeddings import Embeddings  # noqa: E402
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, AIMessageChunk  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult  # noqa: E402
+
+EMBEDDING_DIM = 1536
+FAKE_EMBEDDING_MODEL = "fake-embedding"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def fake_vector(text: str) -> List[float]:
+    """Deterministic unit-ish vector derived from the text."""
+    seed = sum(ord(c) for c in text) or 1
+    return [((seed * (i + 1)) % 997) / 997 for i in range(EMBEDDING_DIM)]
+
+
+class FakeBlockingEmbeddings(Embeddings):
+    """Sync-only embeddings client, like a client without async support."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.model = FAKE_EMBEDDING_MODEL
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return fake_vector(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return [fake_vector(t) for t in texts]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model answering a fixed text after `latency` seconds.
+    When streamed, the same latency is spread evenly over the answer's words.
+    """
+
+    latency: float = 0.2
+    answer: str = "Réponse de test générée à partir du contexte."
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        words = self.answer.split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.latency / len(words))
+            token = word if i == 0 else f" {word}"
+            if run_manager:
+                await run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+class FakeCollection:
+    def __init__(self, name: str, documents: List[str], latency: float = 0.02):
+        self.name = name
+        self.documents = documents
+        self.latency = latency
+        self.metadata = {"embedding_model": FAKE_EMBEDDING_MODEL}
+
+    async def count(self) -> int:
+        await asyncio.sleep(self.latency / 4)
+        return len(self.documents)
+
+    async def query(self, query_embeddings=None, n_results: int = 3, include=None, where=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        hits = self.documents[:n_results]
+        return {
+            "ids": [[f"chunk_{i}" for i in range(len(hits))]],
+            "documents": [hits],
+            "metadatas": [[{"chunk_index": i} for i in range(len(hits))]],
+            "distances": [[0.1 * (i + 1) for i in range(len(hits))]],
+        }
+
+    async def get(self, ids=None, where=None, limit=None, offset=None, include=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        docs = self.documents[offset or 0:(offset or 0) + (limit or len(self.documents))]
+        return {
+            "ids": [f"chunk_{i}" for i in range(len(docs))],
+            "documents": docs,
+            "metadatas": [{"chunk_index": i} for i in range(len(docs))],
+        }
+
+    async def add(self, **kwargs) -> None:
+        await asyncio.sleep(self.latency)
+
+    async def upsert(self, **kwargs) -> None:
+        await asyncio.sleep(self.latency)
+
+    async def delete(self, **kwargs) -> None:
+        await asyncio.sleep(self.latency)
+
+
+class FakeVectorStore:
+    shared = False
+
+    def __init__(self, documents: Optional[List[str]] = None, latency: float = 0.02):
+        self.documents = documents or [f"Segment de transcription numéro {i}." for i in range(50)]
+        self.latency = latency
+
+    async def get_video_collection(self, video) -> FakeCollection:
+        return FakeCollection(video.chroma_collection_id, self.documents, self.latency)
+
+    async def get_or_create_video_collection(self, video, metadata=None) -> FakeCollection:
+        return FakeCollection(video.chroma_collection_id, self.documents, self.latency)
+
+    async def delete_video_collection(self, video) -> None:
+        return None
+
+    async def get_collection(self, name: str) -> FakeCollection:
+        return FakeCollection(name, self.documents, self.latency)
+
+    async def get_or_create_collection(self, name: str, metadata=None) -> FakeCollection:
+        return FakeCollection(name, self.documents, self.latency)
+
+    async def create_collection(self, name: str, metadata=None) -> FakeCollection:
+        return FakeCollection(name, self.documents, self.latency)
+
+    async def delete_collection(self, name: str) -> None:
+        return None
+
+
+class _FakeResult:
+    def __init__(self, value: Any):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+    def scalars(self):
+        return SimpleNamespace(all=lambda: [] if self.value is None else [self.value])
+
+
+class FakeSession:
+    """Minimal AsyncSession: every lookup returns the same video."""
+
+    def __init__(self, video: Any, latency: float = 0.002):
+        self.video = video
+        self.latency = latency
+
+    async def execute(self, statement):
+        await asyncio.sleep(self.latency)
+        return _FakeResult(self.video)
+
+    async def get(self, model, ident):
+        await asyncio.sleep(self.latency)
+        # Other rows (keyword indexes...) do not exist yet
+        return self.video if model.__tablename__ == "videos" else None
+
+    async def merge(self, obj):
+        await asyncio.sleep(self.latency)
+        return obj
+
+    def add(self, obj) -> None:
+        if getattr(obj, "id", None) is None:
+            obj.id = uuid.uuid4()
+        if getattr(obj, "created_at", None) is None:
+            obj.created_at = datetime.now(timezone.utc)
+
+    async def commit(self) -> None:
+        await asyncio.sleep(self.latency)
+
+    async def refresh(self, obj) -> None:
+        return None
+
+    async def rollback(self) -> None:
+        return None
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+
+def fake_video() -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        chroma_collection_id="video_bench",
+        status="completed",
+        updated_at=datetime.now(timezone.utc),
+    )
+
+
+def default_text_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]
+    )
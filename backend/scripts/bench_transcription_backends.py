@@ -0,0 +1,114 @@
+"""
+Real-time factor and peak memory of each transcription backend on local audio.
+
+Every (backend, file) pair runs in a fresh child process, so the peak RSS
+reported is that backend's own footprint (model + inference) and not the
+accumulation of the previous runs. Model loading is timed separately from
+transcription.
+
+Usage (from backend/):
+    python scripts/bench_transcription_backends.py path/to/lecture.mp3 \\
+        --backends whisper faster-whisper fake --model base
+    # No audio at hand: 120 s of synthetic audio (only meaningful for timing)
+    python scripts/bench_transcription_backends.py --synthetic 120
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from app.services.transcription_engines import ENGINES, SAMPLE_RATE, create_engine  # noqa: E402
+
+
+def load_samples(source: str) -> np.ndarray:
+    if source.startswith("synthetic:"):
+        seconds = float(source.split(":", 1)[1])
+        rng = np.random.default_rng(0)
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        tone = 0.1 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.5 * t) > 0)
+        return (tone + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+    import whisper
+    return whisper.load_audio(source)
+
+
+def child(args) -> None:
+    samples = load_samples(args.source)
+    engine = create_engine(args.backend, args.model, args.threads, args.word_timestamps, args.compute_type)
+
+    start = time.perf_counter()
+    engine.load()
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    segments = engine.transcribe(samples)
+    elapsed = time.perf_counter() - start
+
+    duration = len(samples) / SAMPLE_RATE
+    print(json.dumps({
+        "load_seconds": load_seconds,
+        "transcribe_seconds": elapsed,
+        "rtf": elapsed / duration if duration else 0.0,
+        "audio_seconds": duration,
+        "segments": len(segments),
+        "words": sum(len(segment["words"]) for segment in segments),
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    }))
+
+
+def main(args) -> None:
+    sources = list(args.audio)
+    if args.synthetic:
+        sources.append(f"synthetic:{args.synthetic}")
+    if not sources:
+        sys.exit("Give at least one audio file or --synthetic SECONDS")
+
+    print(f"{os.cpu_count()} CPU cores, model={args.model}, threads={args.threads or 'default'}")
+    print(f"{'backend':<15} {'audio':<28} {'load':>7} {'transcribe':>11} {'RTF':>7} {'peak RSS':>10} {'segments':>9}")
+    for source in sources:
+        for backend in args.backends:
+            command = [
+                sys.executable, __file__, "--child", source,
+                "--backends", backend, "--model", args.model, "--threads", str(args.threads),
+                "--compute-type", args.compute_type,
+            ]
+            if args.word_timestamps:
+                command.append("--word-timestamps")
+            completed = subprocess.run(command, capture_output=True, text=True)
+            if completed.returncode != 0:
+                error = (completed.stderr.strip().splitlines() or ["failed"])[-1]
+                print(f"{backend:<15} {Path(source).name:<28} error: {error}")
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            print(
+                f"{backend:<15} {Path(source).name:<28} {result['load_seconds']:6.1f}s "
+                f"{result['transcribe_seconds']:10.1f}s {result['rtf']:7.3f} "
+                f"{result['peak_rss_mb']:8.0f}MB {result['segments']:9d}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", nargs="*", help="local audio files (any format ffmpeg can decode)")
+    parser.add_argument("--synthetic", type=float, default=0.0, help="also run on N seconds of synthetic audio")
+    parser.add_argument("--backends", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads per engine, 0 = library default")
+    parser.add_argument("--compute-type", default="int8", help="faster-whisper quantization")
+    parser.add_argument("--word-timestamps", action="store_true")
+    parser.add_argument("--child", metavar="SOURCE", dest="source", help=argparse.SUPPRESS)
+    parsed = parser.parse_args()
+    if parsed.source:
+        parsed.backend = parsed.backends[0]
+        child(parsed)
+    else:
+        main(parsed)
@@ -0,0 +1,170 @@
+"""
+Offline retrieval evaluation: recall@k and MRR of vector, BM25 and hybrid
+(RRF) retrieval on a labelled set.
+
+The set (scripts/data/retrieval_eval.json by default) lists videos with their
+transcript segments and questions. Each question is labelled with the excerpts
+(answer_contains) a passage must contain to answer it. A question counts as
+recalled at k when one of its top-k chunks contains an excerpt.
+
+Embeddings:
+- openai: the configured OpenAI model (needs OPENAI_API_KEY)
+- local: the sentence-transformers model of LOCAL_EMBEDDING_MODEL
+- hashing (default): character-trigram feature hashing, fully offline; only a
+  rough stand-in for a real model, so its vector numbers are not representative
+
+Usage (from backend/):
+    python scripts/eval_retrieval.py --embeddings local --k 1 3 5
+"""
+import argparse
+import asyncio
+import json
+import zlib
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+import bench_support  # noqa: F401  (env defaults and sys.path)
+
+from app.core.config import settings
+from app.services.chunking import SegmentChunker
+from app.services.keyword_index import BM25Index
+from app.services.reindexer import chunk_ids
+from app.services.retriever import HYBRID_MODE, VECTOR_MODE, Retriever
+
+DEFAULT_DATA = Path(__file__).resolve().parent / "data" / "retrieval_eval.json"
+
+
+class HashingEmbeddings:
+    """Character trigrams hashed into a fixed-size, normalized vector."""
+
+    model_name = "hashing-trigrams"
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f"  {text.lower()}  "
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode("utf-8")) % self.dim] += 1
+        return (vector / (np.linalg.norm(vector) or 1)).tolist()
+
+    async def embed_query(self, text: str) -> List[float]:
+        return self._vector(text)
+
+    async def embed_documents(self, texts: List[str], progress=None) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+
+class MemoryCollection:
+    """Exact cosine search over a handful of chunks, with the AsyncCollection calls the retriever makes."""
+
+    def __init__(self, ids: List[str], documents: List[str], metadatas: List[Dict], vectors: List[List[float]]):
+        self.ids = ids
+        self.rows = {chunk_id: (doc, meta) for chunk_id, doc, meta in zip(ids, documents, metadatas)}
+        matrix = np.array(vectors, dtype=np.float32)
+        self.matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    async def query(self, query_embeddings, n_results: int, include=None, **kwargs):
+        query = np.array(query_embeddings[0], dtype=np.float32)
+        scores = self.matrix @ (query / np.linalg.norm(query))
+        order = np.argsort(-scores)[:n_results]
+        top = [self.ids[i] for i in order]
+        return {
+            "ids": [top],
+            "documents": [[self.rows[i][0] for i in top]],
+            "metadatas": [[self.rows[i][1] for i in top]],
+            "distances": [[float(1 - scores[i]) for i in order]],
+        }
+
+    async def get(self, ids, include=None, **kwargs):
+        return {
+            "ids": ids,
+            "documents": [self.rows[i][0] for i in ids],
+            "metadatas": [self.rows[i][1] for i in ids],
+        }
+
+
+def make_embeddings(kind: str):
+    if kind == "hashing":
+        return HashingEmbeddings()
+    if kind == "local":
+        from app.services.local_embeddings import LocalEmbeddings
+        return LocalEmbeddings(settings.LOCAL_EMBEDDING_MODEL)
+    from langchain_openai import OpenAIEmbeddings
+    from app.services.embeddings import AsyncEmbeddings
+    return AsyncEmbeddings(OpenAIEmbeddings(
+        model=settings.OPENAI_EMBEDDING_MODEL,
+        openai_api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+    ))
+
+
+def relevant(document: str, excerpts: List[str]) -> bool:
+    return any(excerpt.lower() in document.lower() for excerpt in excerpts)
+
+
+async def run(args) -> None:
+    data = json.loads(Path(args.data).read_text(encoding="utf-8"))
+    embeddings = make_embeddings(args.embeddings)
+    chunker = SegmentChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    max_k = max(args.k)
+    methods = {
+        "vector": Retriever(VECTOR_MODE, top_k=max_k),
+        "bm25": None,
+        "hybrid": Retriever(HYBRID_MODE, top_k=max_k, candidates=args.candidates, rrf_k=args.rrf_k),
+    }
+    ranks: Dict[str, List[int]] = {name: [] for name in methods}  # rank of the first relevant chunk, 0 = none
+
+    total_chunks = 0
+    for video in data["videos"]:
+        chunks = chunker.split_segments(video["segments"])
+        total_chunks += len(chunks)
+        ids = chunk_ids(chunks)
+        texts = [chunk.text for chunk in chunks]
+        collection = MemoryCollection(
+            ids, texts, [chunk.metadata() for chunk in chunks], await embeddings.embed_documents(texts)
+        )
+        keyword_index = BM25Index.build(ids, texts)
+
+        for item in video["questions"]:
+            if not any(relevant(text, item["answer_contains"]) for text in texts):
+                print(f"warning: no chunk contains the answer to '{item['question']}'")
+            embedding = await embeddings.embed_query(item["question"])
+            for name, retriever in methods.items():
+                if retriever is None:
+                    found = [collection.rows[i][0] for i, _ in keyword_index.search(item["question"], max_k)]
+                else:
+                    found = (await retriever.retrieve(collection, item["question"], embedding, keyword_index)).documents
+                rank = next((r for r, doc in enumerate(found, 1) if relevant(doc, item["answer_contains"])), 0)
+                ranks[name].append(rank)
+
+    questions = len(ranks["vector"])
+    print(
+        f"{questions} questions, {total_chunks} chunks ({args.chunk_size} chars), "
+        f"embeddings={embeddings.model_name}"
+    )
+    header = "".join(f"  recall@{k:<3}" for k in args.k)
+    print(f"{'method':<8}{header}  MRR@{max_k}")
+    for name, method_ranks in ranks.items():
+        recalls = "".join(
+            f"  {sum(1 for r in method_ranks if 0 < r <= k) / questions:9.2f}" for k in args.k
+        )
+        mrr = sum(1 / r for r in method_ranks if r) / questions
+        print(f"{name:<8}{recalls}  {mrr:6.3f}")
+    if hasattr(embeddings, "shutdown"):
+        embeddings.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=str(DEFAULT_DATA))
+    parser.add_argument("--embeddings", choices=["hashing", "local", "openai"], default="hashing")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--chunk-size", type=int, default=300)
+    parser.add_argument("--chunk-overlap", type=int, default=60)
+    parser.add_argument("--candidates", type=int, default=settings.RETRIEVAL_CANDIDATES)
+    parser.add_argument("--rrf-k", type=int, default=settings.RETRIEVAL_RRF_K)
+    asyncio.run(run(parser.parse_args()))
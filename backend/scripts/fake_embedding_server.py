@@ -0,0 +1,113 @@
+"""
+Local OpenAI-compatible embedding server for testing the embedding scheduler
+offline. Point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:8099/v1.
+
+It simulates latency (fixed + per token), a tokens-per-minute limit answered
+with 429 + Retry-After, and random 500 errors. GET /stats returns the counters.
+
+Usage (from backend/):
+    python scripts/fake_embedding_server.py --port 8099 --tpm 200000 --failure-rate 0.05
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_app(
+    dim: int = 1536,
+    tpm: int = 0,
+    latency: float = 0.05,
+    latency_per_1k_tokens: float = 0.02,
+    failure_rate: float = 0.0,
+    seed: Optional[int] = None,
+    window_seconds: float = 60.0,
+) -> FastAPI:
+    app = FastAPI(title="Fake embedding server")
+    rng = random.Random(seed)
+    window: Deque[Tuple[float, int]] = deque()  # (timestamp, tokens) accepted in the last window_seconds
+    stats: Dict[str, int] = {"requests": 0, "inputs": 0, "tokens": 0, "rate_limited": 0, "failed": 0}
+
+    def tokens_of(item: Union[str, List[int]]) -> int:
+        return len(item) if isinstance(item, list) else max(1, len(item) // 4)
+
+    def vector_of(item: Union[str, List[int]]) -> np.ndarray:
+        key = item if isinstance(item, str) else ",".join(map(str, item))
+        seed_bytes = hashlib.sha256(key.encode("utf-8")).digest()[:8]
+        vector = np.random.default_rng(int.from_bytes(seed_bytes, "little")).standard_normal(dim)
+        return (vector / np.linalg.norm(vector)).astype(np.float32)
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body: Dict[str, Any] = await request.json()
+        inputs = body["input"]
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        tokens = sum(tokens_of(item) for item in inputs)
+        stats["requests"] += 1
+
+        if tpm:
+            now = time.monotonic()
+            while window and now - window[0][0] > window_seconds:
+                window.popleft()
+            used = sum(count for _, count in window)
+            if used + tokens > tpm:
+                stats["rate_limited"] += 1
+                retry_after = window_seconds - (now - window[0][0]) if window else 1
+                return JSONResponse(
+                    {"error": {"message": "Rate limit reached for tokens per min", "type": "tokens"}},
+                    status_code=429,
+                    headers={"retry-after": f"{max(retry_after, 0.1):.2f}"},
+                )
+            window.append((now, tokens))
+
+        await asyncio.sleep(latency + latency_per_1k_tokens * tokens / 1000)
+        if rng.random() < failure_rate:
+            stats["failed"] += 1
+            return JSONResponse({"error": {"message": "Simulated server error"}}, status_code=500)
+
+        stats["inputs"] += len(inputs)
+        stats["tokens"] += tokens
+        as_base64 = body.get("encoding_format") == "base64"
+        data = []
+        for index, item in enumerate(inputs):
+            vector = vector_of(item)
+            embedding = base64.b64encode(vector.tobytes()).decode() if as_base64 else vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "fake"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--tpm", type=int, default=0, help="tokens per minute before 429, 0 = unlimited")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--latency-per-1k-tokens", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability of a 500 per request")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.dim, args.tpm, args.latency, args.latency_per_1k_tokens, args.failure_rate),
+        host=args.host, port=args.port, log_level="warning",
+    )
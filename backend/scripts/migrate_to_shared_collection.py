@@ -0,0 +1,106 @@
+"""
+Move every video's per-video ChromaDB collection (video_<uuid>) into the
+shared collection used by VECTOR_LAYOUT=shared.
+
+Vectors are copied as they are when the collection was built with the
+configured embedding model, and re-embedded otherwise. Each video's chunks
+in the shared collection are replaced, so the script can be re-run after an
+interruption. Source collections are kept unless --delete-source is given
+(and the copy holds as many chunks as the source).
+
+Once done, set VECTOR_LAYOUT=shared and restart the API and workers.
+
+Usage (from backend/):
+    python scripts/migrate_to_shared_collection.py --dry-run
+    python scripts/migrate_to_shared_collection.py --delete-source
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.future import select  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.resources import AppResources  # noqa: E402
+from app.db.base import AsyncSessionLocal  # noqa: E402
+from app.models.video import Video  # noqa: E402
+from app.services.vector_store import (  # noqa: E402
+    EMBEDDING_MODEL_KEY,
+    SHARED_LAYOUT,
+    VectorStore,
+    VideoChunks,
+    check_embedding_model,
+    collection_embedding_model,
+)
+
+PAGE_SIZE = 500
+
+
+async def migrate_video(video: Video, store: VectorStore, shared, embeddings, args) -> str:
+    try:
+        source = await store.get_collection(video.chroma_collection_id)
+    except Exception:
+        return "no per-video collection, skipped"
+    total = await source.count()
+    source_model = collection_embedding_model(source)
+    reembed = source_model != embeddings.model_name
+    if args.dry_run:
+        return f"{total} chunks to copy" + (f" (re-embedded from {source_model})" if reembed else "")
+
+    target = VideoChunks(shared, str(video.id))
+    await target.delete()
+    offset = 0
+    while offset < total:
+        include = ["documents", "metadatas"] + ([] if reembed else ["embeddings"])
+        page = await source.get(limit=PAGE_SIZE, offset=offset, include=include)
+        if not page["ids"]:
+            break
+        vectors = (
+            await embeddings.embed_documents(page["documents"]) if reembed else page["embeddings"]
+        )
+        await target.upsert(
+            ids=page["ids"], documents=page["documents"], embeddings=vectors, metadatas=page["metadatas"]
+        )
+        offset += len(page["ids"])
+
+    copied = await target.count()
+    status = f"{copied}/{total} chunks copied" + (f", re-embedded from {source_model}" if reembed else "")
+    if args.delete_source:
+        if copied == total:
+            await store.delete_collection(video.chroma_collection_id)
+            status += ", source deleted"
+        else:
+            status += ", source kept (count mismatch)"
+    return status
+
+
+async def run(args) -> None:
+    resources = await AppResources.create()
+    try:
+        store = VectorStore(resources.vector_store.client, SHARED_LAYOUT, settings.SHARED_COLLECTION_NAME)
+        embeddings = resources.embeddings
+        shared = await store.get_shared_collection({EMBEDDING_MODEL_KEY: embeddings.model_name})
+        # A shared collection built for another model cannot take the new vectors
+        check_embedding_model(shared, embeddings.model_name)
+
+        async with AsyncSessionLocal() as db:
+            videos = (await db.execute(select(Video).order_by(Video.created_at))).scalars().all()
+        print(
+            f"{len(videos)} videos -> collection '{shared.name}' "
+            f"(model {embeddings.model_name}){' [dry run]' if args.dry_run else ''}"
+        )
+        for video in videos:
+            print(f"{video.id} {video.chroma_collection_id}: {await migrate_video(video, store, shared, embeddings, args)}")
+        print("Done. Set VECTOR_LAYOUT=shared to serve from the shared collection.")
+    finally:
+        await resources.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be copied")
+    parser.add_argument("--delete-source", action="store_true", help="delete each per-video collection once copied")
+    asyncio.run(run(parser.parse_args()))
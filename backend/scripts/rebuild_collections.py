@@ -0,0 +1,101 @@
+"""
+Rebuild ChromaDB collections whose HNSW parameters (hnsw:space, hnsw:M,
+hnsw:construction_ef, hnsw:search_ef) differ from the settings. Chroma fixes
+them when a collection is created, so applying new values means copying the
+collection into a new one.
+
+Stored vectors are copied as they are, so nothing is re-embedded. Each
+collection is copied to "<name>__rebuild", the original is renamed to
+"<name>__old", the copy takes the original name, and the old collection is
+deleted (kept with --keep-old). Queries only fail during the two renames.
+
+Covers the per-video collections (video_*) and the shared collection.
+
+Usage (from backend/):
+    python scripts/rebuild_collections.py --dry-run
+    python scripts/rebuild_collections.py [--force] [--only video_<uuid> ...]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.services.vector_store import VectorStore, hnsw_metadata, index_params_diff  # noqa: E402
+
+PAGE_SIZE = 500
+REBUILD_SUFFIX = "__rebuild"
+OLD_SUFFIX = "__old"
+
+
+async def rebuild(store: VectorStore, name: str, keep_old: bool) -> str:
+    source = await store.get_collection(name)
+    total = await source.count()
+    # Keep the collection's own metadata (video_id, embedding_model...), with the new index parameters
+    metadata = {k: v for k, v in (source.metadata or {}).items() if not k.startswith("hnsw:")}
+
+    try:
+        await store.delete_collection(name + REBUILD_SUFFIX)  # leftover of an interrupted run
+    except Exception:
+        pass
+    target = await store.client.create_collection(name=name + REBUILD_SUFFIX, metadata={**metadata, **hnsw_metadata()})
+
+    start = time.perf_counter()
+    offset = 0
+    while offset < total:
+        page = await source.get(limit=PAGE_SIZE, offset=offset, include=["documents", "metadatas", "embeddings"])
+        if not page["ids"]:
+            break
+        await target.add(
+            ids=page["ids"], documents=page["documents"], metadatas=page["metadatas"], embeddings=page["embeddings"]
+        )
+        offset += len(page["ids"])
+
+    copied = await target.count()
+    if copied != total:
+        await store.delete_collection(target.name)
+        return f"copy incomplete ({copied}/{total}), left unchanged"
+
+    await source.modify(name=name + OLD_SUFFIX)
+    await target.modify(name=name)
+    if not keep_old:
+        await store.delete_collection(name + OLD_SUFFIX)
+    return f"rebuilt, {total} chunks in {time.perf_counter() - start:.1f}s" + (
+        f", previous index kept as {name + OLD_SUFFIX}" if keep_old else ""
+    )
+
+
+async def run(args) -> None:
+    store = await VectorStore.connect()
+    names = args.only or sorted(
+        name for name in await store.client.list_collections()
+        if (name.startswith("video_") or name == settings.SHARED_COLLECTION_NAME)
+        and not name.endswith((REBUILD_SUFFIX, OLD_SUFFIX))
+    )
+    print(f"{len(names)} collections, target parameters {hnsw_metadata()}{' [dry run]' if args.dry_run else ''}")
+
+    rebuilt = 0
+    for name in names:
+        stale = index_params_diff(await store.get_collection(name))
+        if not stale and not args.force:
+            print(f"{name}: up to date")
+            continue
+        changes = ", ".join(f"{key} {current} -> {configured}" for key, (current, configured) in stale.items())
+        if args.dry_run:
+            print(f"{name}: would rebuild ({changes or 'forced'})")
+            continue
+        print(f"{name}: {changes or 'forced'}: {await rebuild(store, name, args.keep_old)}")
+        rebuilt += 1
+    print(f"Done, {rebuilt} collections rebuilt.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only list the collections to rebuild")
+    parser.add_argument("--force", action="store_true", help="rebuild even when the parameters already match")
+    parser.add_argument("--only", nargs="+", help="collection names to rebuild")
+    parser.add_argument("--keep-old", action="store_true", help="keep the previous collection as <name>__old")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# app.core.config requires these; the tests below never reach OpenAI or the database
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,216 @@
+"""In-memory stand-ins for the database session, Chroma, the embedding clients and the chat model."""
+import asyncio
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import numpy as np
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class FakeResult:
+    def __init__(self, value: Any = None):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self.value
+
+    def all(self):
+        if isinstance(self.value, list):
+            return self.value
+        return [] if self.value is None else [self.value]
+
+
+class FakeSession:
+    """
+    The slice of AsyncSession the services use. `execute` answers selects with
+    the row registered for the queried entity and records every statement.
+    """
+
+    def __init__(self, rows: Optional[Dict[type, Any]] = None):
+        self.rows = rows or {}
+        self.statements: List[Any] = []
+        self.added: List[Any] = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def get(self, entity, primary_key):
+        row = self.rows.get(entity)
+        return row if row is not None and row.id == primary_key else None
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        entity = getattr(statement, "column_descriptions", [{}])
+        entity = entity[0].get("entity") if entity else None
+        return FakeResult(self.rows.get(entity))
+
+    def add(self, instance) -> None:
+        # Column defaults are applied at flush in a real session
+        if getattr(instance, "id", False) is None:
+            instance.id = uuid.uuid4()
+        self.added.append(instance)
+
+    def add_all(self, instances) -> None:
+        for instance in instances:
+            self.add(instance)
+
+    async def merge(self, instance):
+        self.added.append(instance)
+        return instance
+
+    async def delete(self, instance) -> None:
+        pass
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        self.rollbacks += 1
+
+    async def refresh(self, instance) -> None:
+        # Server defaults
+        if getattr(instance, "created_at", False) is None:
+            instance.created_at = datetime.now(timezone.utc)
+
+
+class FakeCollection:
+    """A Chroma collection in a dict: ids to (document, embedding, metadata)."""
+
+    def __init__(self, name: str = "test", metadata: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.metadata = metadata
+        self.items: Dict[str, Dict[str, Any]] = {}
+
+    async def count(self) -> int:
+        return len(self.items)
+
+    async def modify(self, metadata: Dict[str, Any]) -> None:
+        self.metadata = metadata
+
+    async def get(self, ids=None, where=None, limit=None, offset=0, include=None):
+        keys = list(self.items) if ids is None else [i for i in ids if i in self.items]
+        keys = keys[offset:offset + limit] if limit is not None else keys[offset:]
+        return {
+            "ids": keys,
+            "documents": [self.items[k]["document"] for k in keys],
+            "metadatas": [self.items[k]["metadata"] for k in keys],
+        }
+
+    def _distance(self, a: np.ndarray, b: np.ndarray) -> float:
+        """Distance in the collection's hnsw:space, defined as Chroma does (l2 is squared)."""
+        space = (self.metadata or {}).get("hnsw:space", "l2")
+        if space == "cosine":
+            return float(1 - a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+        if space == "ip":
+            return float(1 - a @ b)
+        return float(np.sum((a - b) ** 2))
+
+    async def query(self, query_embeddings, n_results, include=None, where=None):
+        """Nearest items in the collection's space (l2 by default, as in Chroma)."""
+        query = np.asarray(query_embeddings[0])
+        ranked = sorted(
+            (self._distance(np.asarray(item["embedding"]), query), chunk_id)
+            for chunk_id, item in self.items.items()
+        )[:n_results]
+        return {
+            "ids": [[chunk_id for _, chunk_id in ranked]],
+            "documents": [[self.items[chunk_id]["document"] for _, chunk_id in ranked]],
+            "metadatas": [[self.items[chunk_id]["metadata"] for _, chunk_id in ranked]],
+            "distances": [[distance for distance, _ in ranked]],
+        }
+
+    async def upsert(self, ids, documents, embeddings, metadatas) -> None:
+        for chunk_id, document, embedding, metadata in zip(ids, documents, embeddings, metadatas):
+            self.items[chunk_id] = {"document": document, "embedding": embedding, "metadata": metadata}
+
+    async def update(self, ids, metadatas) -> None:
+        for chunk_id, metadata in zip(ids, metadatas):
+            self.items[chunk_id]["metadata"] = metadata
+
+    async def delete(self, ids=None) -> None:
+        for chunk_id in ids if ids is not None else list(self.items):
+            self.items.pop(chunk_id, None)
+
+
+class FakeVectorStore:
+    shared = False
+
+    def __init__(self):
+        self.collections: Dict[str, FakeCollection] = {}
+
+    async def create_collection(self, name: str, metadata=None) -> FakeCollection:
+        self.collections[name] = FakeCollection(name, metadata)
+        return self.collections[name]
+
+    async def get_video_collection(self, video) -> FakeCollection:
+        return self.collections[video.chroma_collection_id]
+
+    async def get_or_create_video_collection(self, video, metadata=None) -> FakeCollection:
+        if video.chroma_collection_id not in self.collections:
+            await self.create_collection(video.chroma_collection_id, metadata)
+        return self.collections[video.chroma_collection_id]
+
+    async def delete_collection(self, name: str) -> None:
+        self.collections.pop(name, None)
+
+
+class FakeEmbeddings:
+    """Deterministic vectors from the text, recording every text embedded."""
+
+    model_name = "fake-embedding"
+
+    def __init__(self):
+        self.embedded: List[str] = []
+
+    @staticmethod
+    def vector(text: str) -> List[float]:
+        return [float(len(text)), float(sum(map(ord, text)) % 997), 1.0]
+
+    async def embed_documents(self, texts: List[str], progress=None) -> List[List[float]]:
+        self.embedded.extend(texts)
+        return [self.vector(text) for text in texts]
+
+    async def embed_query(self, text: str) -> List[float]:
+        return self.vector(text)
+
+
+class FakeIngestionPool:
+    def __init__(self):
+        self.submitted: List[Any] = []
+
+    async def submit(self, db, video_id):
+        self.submitted.append(video_id)
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """Streams `answer` word by word, `delay` seconds apart."""
+
+    answer: str
+    delay: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        for token in re.findall(r"\S+\s*", self.answer):
+            await asyncio.sleep(self.delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
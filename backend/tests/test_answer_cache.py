@@ -0,0 +1,99 @@
+import uuid
+
+import pytest
+
+from app.services.answer_cache import AnswerCache, normalize_question
+
+VIDEO = uuid.uuid4()
+VERSION = "2024-01-01T00:00:00"
+
+
+@pytest.fixture
+def cache():
+    return AnswerCache(similarity_threshold=0.95, max_entries_per_video=3, max_videos=2)
+
+
+def store(cache, question, embedding, answer, video=VIDEO, version=VERSION):
+    cache.store(video, version, question, embedding, answer, {"chunks": [["c1", 0.1]]})
+
+
+def test_questions_are_normalized():
+    assert normalize_question("  Quel est le SUJET   de la vidéo ?? ") == "quel est le sujet de la vidéo"
+
+
+def test_exact_tier_matches_the_normalized_question(cache):
+    store(cache, "Quel est le sujet ?", [1.0, 0.0], "Le découpage.")
+
+    hit = cache.lookup_exact(VIDEO, VERSION, "quel est le   sujet")
+
+    assert hit.answer == "Le découpage."
+    assert hit.context_refs == {"chunks": [["c1", 0.1]]}
+    assert cache.lookup_exact(VIDEO, VERSION, "Qui parle ?") is None
+    assert cache.exact_hits == 1
+
+
+def test_similar_tier_uses_the_cosine_threshold(cache):
+    store(cache, "Quel est le sujet ?", [1.0, 0.0], "Le découpage.")
+    store(cache, "Qui parle ?", [0.0, 1.0], "Un ingénieur.")
+
+    # Scaled vectors have the same cosine similarity
+    hit, score = cache.lookup_similar(VIDEO, VERSION, [10.0, 0.2])
+    below = cache.lookup_similar(VIDEO, VERSION, [1.0, 0.5])
+
+    assert hit.answer == "Le découpage." and score == pytest.approx(0.9998, abs=1e-4)
+    assert below is None
+    assert (cache.similar_hits, cache.misses) == (1, 1)
+
+
+def test_similar_tier_sees_answers_stored_after_a_lookup(cache):
+    store(cache, "Quel est le sujet ?", [1.0, 0.0], "Le découpage.")
+    assert cache.lookup_similar(VIDEO, VERSION, [0.0, 1.0]) is None
+
+    store(cache, "Qui parle ?", [0.0, 1.0], "Un ingénieur.")
+
+    assert cache.lookup_similar(VIDEO, VERSION, [0.0, 1.0])[0].answer == "Un ingénieur."
+
+
+def test_oldest_entries_of_a_video_are_evicted(cache):
+    for i in range(4):
+        store(cache, f"Question {i}", [1.0, float(i)], f"Réponse {i}")
+    # Storing an existing question again makes it the most recent
+    store(cache, "Question 1", [1.0, 1.0], "Réponse 1 bis")
+    store(cache, "Question 4", [1.0, 4.0], "Réponse 4")
+
+    kept = [i for i in range(5) if cache.lookup_exact(VIDEO, VERSION, f"Question {i}")]
+
+    assert kept == [1, 3, 4]
+    assert cache.lookup_exact(VIDEO, VERSION, "Question 1").answer == "Réponse 1 bis"
+    assert cache.stats()["entries"] == 3
+
+
+def test_least_recently_asked_video_is_evicted(cache):
+    first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    for video in (first, second):
+        store(cache, "Quel est le sujet ?", [1.0, 0.0], "Le découpage.", video=video)
+    # A lookup on the first video makes the second one the least recent
+    cache.lookup_exact(first, VERSION, "Quel est le sujet ?")
+    store(cache, "Quel est le sujet ?", [1.0, 0.0], "Le découpage.", video=third)
+
+    assert cache.is_warm(first, VERSION) and cache.is_warm(third, VERSION)
+    assert not cache.is_warm(second, VERSION)
+    assert cache.stats()["videos"] == 2
+
+
+def test_a_new_video_version_drops_its_entries(cache):
+    store(cache, "Quel est le sujet ?", [1.0, 0.0], "Le découpage.")
+
+    assert cache.lookup_exact(VIDEO, "2024-02-01T00:00:00", "Quel est le sujet ?") is None
+    assert cache.lookup_exact(VIDEO, VERSION, "Quel est le sujet ?") is None
+    assert cache.invalidations == 2
+
+
+def test_invalidate_drops_the_video(cache):
+    store(cache, "Quel est le sujet ?", [1.0, 0.0], "Le découpage.")
+
+    cache.invalidate(VIDEO)
+    cache.invalidate(VIDEO)
+
+    assert not cache.is_warm(VIDEO, VERSION)
+    assert cache.invalidations == 1
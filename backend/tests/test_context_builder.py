@@ -0,0 +1,101 @@
+from app.services.context_builder import ContextBuilder, ContextChunk
+
+
+class WordCounter:
+    """One token per word, recording every text counted."""
+
+    def __init__(self):
+        self.counted = []
+
+    def count(self, text: str) -> int:
+        self.counted.append(text)
+        return len(text.split())
+
+
+def chunk(index: int, text: str) -> ContextChunk:
+    return ContextChunk(f"c{index}", text, {"chunk_index": index, "start": 60.0 * index, "end": 60.0 * index + 30})
+
+
+def words(prefix: str, n: int) -> str:
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+# Far apart in the transcript: never merged
+SPARSE = [chunk(3 * i, words(f"p{i}_", 10)) for i in range(6)]
+# A block is "[Segment n] [mm:ss - mm:ss]" (5 words) plus its 10 words
+BLOCK = 15
+
+
+def test_candidates_are_packed_in_priority_order_within_the_budget():
+    builder = ContextBuilder(3 * BLOCK, WordCounter())
+    hits = [SPARSE[4], SPARSE[1], SPARSE[5]]
+
+    built = builder.build(hits, neighbours=[SPARSE[0], SPARSE[2]])
+
+    assert built.tokens == 3 * BLOCK
+    # Put back in transcript order
+    assert built.chunk_ids == ["c3", "c12", "c15"]
+    assert built.passages == 3
+    assert built.dropped == 2
+    assert built.text.startswith("[Segment 1] [03:00 - 03:30]\np1_0 ")
+
+
+def test_a_smaller_later_candidate_still_fits_after_a_drop():
+    builder = ContextBuilder(2 * BLOCK + 8, WordCounter())
+    short = chunk(30, words("court", 3))
+
+    built = builder.build([SPARSE[0], SPARSE[1], SPARSE[2], short])
+
+    assert built.chunk_ids == ["c0", "c3", "c30"]
+    assert built.dropped == 1
+    assert built.tokens <= builder.max_tokens
+
+
+def test_the_best_hit_is_kept_even_above_the_budget():
+    built = ContextBuilder(5, WordCounter()).build([SPARSE[0], SPARSE[1]])
+
+    assert built.chunk_ids == ["c0"]
+    assert built.tokens == BLOCK
+    assert built.dropped == 1
+
+
+# Chunks 0 and 1 of a transcript split with a 6 word chunk_overlap
+FIRST = ContextChunk("a", " ".join(f"mot{i}" for i in range(12)), {"chunk_index": 0})
+SECOND = ContextChunk("b", " ".join(f"mot{i}" for i in range(6, 18)), {"chunk_index": 1})
+
+
+def test_contiguous_chunks_are_merged_and_their_overlap_sent_once():
+    built = ContextBuilder(100, WordCounter()).build([SECOND, FIRST])
+
+    assert built.passages == 1
+    assert built.chunk_ids == ["a", "b"]
+    assert built.text == "[Segment 1]\n" + " ".join(f"mot{i}" for i in range(18))
+    assert built.overlap_chars == len(" ".join(f"mot{i}" for i in range(6, 12)))
+    assert built.tokens == 2 + 18
+
+
+def test_merged_chunks_only_cost_their_text_past_the_overlap():
+    # 2 header words + 18 words: fits only because the 6 shared words are not counted twice
+    built = ContextBuilder(20, WordCounter()).build([FIRST, SECOND])
+
+    assert built.chunk_ids == ["a", "b"] and built.dropped == 0
+
+
+def test_duplicate_ids_and_texts_are_skipped():
+    copy = ContextChunk("other", SPARSE[0].text, {"chunk_index": 40})
+
+    built = ContextBuilder(100, WordCounter()).build([SPARSE[0], SPARSE[1]], neighbours=[SPARSE[1], copy])
+
+    assert built.chunk_ids == ["c0", "c3"]
+    assert built.dropped == 0
+
+
+def test_each_candidate_is_counted_once_then_the_context_once():
+    counter = WordCounter()
+    candidates = [chunk(3 * i, words(f"p{i}_", 10)) for i in range(40)]
+
+    built = ContextBuilder(10 * BLOCK, counter).build(candidates)
+
+    assert len(built.chunk_ids) == 10
+    assert len(counter.counted) == len(candidates) + 1
+    assert max(len(text.split()) for text in counter.counted[:-1]) == BLOCK
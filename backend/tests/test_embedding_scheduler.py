@@ -0,0 +1,179 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+from langchain_openai import OpenAIEmbeddings
+
+from app.services.embedding_scheduler import EmbeddingScheduler, TokenBudget, pack_batches
+from app.services.embeddings import AsyncEmbeddings
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts"))
+from fake_embedding_server import create_app  # noqa: E402
+
+TEXTS = [f"Dans cette partie de la vidéo, l'intervenant explique le point numéro {i}." * 3 for i in range(40)]
+
+
+def server(**options):
+    """The fake embedding server, served in process; returns (embeddings client, stats)."""
+    app = create_app(dim=8, latency=0.0, latency_per_1k_tokens=0.0, **options)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://fake")
+    embeddings = AsyncEmbeddings(OpenAIEmbeddings(
+        model="text-embedding-3-small",
+        openai_api_key="sk-test",
+        base_url="http://fake/v1",
+        chunk_size=1000,
+        max_retries=0,
+        check_embedding_ctx_length=False,
+        http_async_client=client,
+    ))
+
+    async def stats():
+        return (await client.get("/stats")).json()
+
+    return embeddings, stats
+
+
+def scheduler(embeddings, **options) -> EmbeddingScheduler:
+    defaults = dict(
+        tokens_per_minute=1_000_000, max_batch_tokens=400, max_batch_size=8,
+        concurrency=4, max_retries=5, retry_backoff=0.01,
+    )
+    defaults.update(options)
+    return EmbeddingScheduler(embeddings, **defaults)
+
+
+def test_pack_batches_respects_token_and_size_limits():
+    assert pack_batches([100, 100, 100, 250, 50, 500, 10], max_tokens=300, max_size=2) == [
+        [0, 1], [2], [3, 4], [5], [6]
+    ]
+
+
+def test_documents_are_sent_in_packed_batches_and_returned_in_order():
+    embeddings, stats = server()
+    embedder = scheduler(embeddings)
+
+    async def run():
+        vectors = await embedder.embed_documents(TEXTS)
+        singles = [await embeddings.embed_query(text) for text in TEXTS[:3]]
+        return vectors, singles, await stats()
+
+    vectors, singles, counters = asyncio.run(run())
+
+    expected_batches = pack_batches(embedder._tokens.count_many(TEXTS), 400, 8)
+    assert len(expected_batches) > 1
+    assert embedder.batches == len(expected_batches)
+    assert counters["requests"] - 3 == len(expected_batches)
+    assert counters["inputs"] - 3 == len(TEXTS)
+    np.testing.assert_allclose(vectors[:3], singles, rtol=1e-6)
+
+
+def test_progress_and_batch_callbacks_cover_every_text():
+    embeddings, _ = server()
+    embedder = scheduler(embeddings)
+    progress, positions = [], []
+
+    async def on_progress(done, total):
+        progress.append((done, total))
+
+    async def on_batch(batch_positions, vectors):
+        positions.extend(batch_positions)
+
+    asyncio.run(embedder.embed_documents(TEXTS, progress=on_progress, on_batch=on_batch))
+
+    assert sorted(positions) == list(range(len(TEXTS)))
+    assert progress[-1] == (len(TEXTS), len(TEXTS))
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+
+
+def test_token_budget_waits_for_spent_tokens_to_leave_the_window(monkeypatch):
+    monkeypatch.setattr(TokenBudget, "WINDOW_SECONDS", 0.2)
+    budget = TokenBudget(1000)
+
+    async def run():
+        start = time.monotonic()
+        await budget.acquire(600)
+        await budget.acquire(300)
+        within_budget = time.monotonic() - start
+        await budget.acquire(600)
+        return within_budget, time.monotonic() - start
+
+    within_budget, total = asyncio.run(run())
+
+    assert within_budget < 0.1
+    assert total >= 0.19
+
+
+def test_scheduler_stays_under_the_budget_instead_of_hitting_429(monkeypatch):
+    monkeypatch.setattr(TokenBudget, "WINDOW_SECONDS", 0.3)
+    total_tokens = sum(scheduler(server()[0])._tokens.count_many(TEXTS))
+    budget = total_tokens // 3
+    # The server allows more than the budget, whatever tokenizer the scheduler counts with
+    embeddings, stats = server(tpm=2 * budget, window_seconds=0.3)
+    embedder = scheduler(embeddings, tokens_per_minute=budget, max_batch_tokens=budget // 2)
+
+    async def run():
+        start = time.monotonic()
+        vectors = await embedder.embed_documents(TEXTS)
+        return vectors, time.monotonic() - start, await stats()
+
+    vectors, elapsed, counters = asyncio.run(run())
+
+    assert all(vector is not None for vector in vectors)
+    # At most `budget` tokens per window: spread over at least 3 windows
+    assert elapsed >= 0.3 * 2 * 0.95
+    assert counters["rate_limited"] == 0
+    assert embedder.retries == 0
+
+
+def test_rate_limited_batches_are_retried_after_backoff():
+    # The server allows far less than the scheduler believes it may send
+    embeddings, stats = server(tpm=1200, window_seconds=0.3)
+    embedder = scheduler(embeddings, max_retries=20)
+
+    async def run():
+        return await embedder.embed_documents(TEXTS), await stats()
+
+    vectors, counters = asyncio.run(run())
+
+    assert all(vector is not None for vector in vectors)
+    assert counters["rate_limited"] > 0
+    assert embedder.retries == counters["rate_limited"]
+    assert counters["inputs"] == len(TEXTS)
+
+
+def test_a_batch_failing_past_max_retries_fails_the_request():
+    embeddings, stats = server(failure_rate=1.0)
+    embedder = scheduler(embeddings, max_retries=2)
+
+    async def run():
+        with pytest.raises(Exception):
+            await embedder.embed_documents(TEXTS[:4])
+        return await stats()
+
+    counters = asyncio.run(run())
+
+    assert counters["failed"] == 3
+
+
+def test_query_embeddings_are_retried_after_the_servers_retry_after():
+    embeddings, stats = server(tpm=60, window_seconds=0.2)
+    embedder = scheduler(embeddings)
+
+    async def run():
+        # The first query fills the server's window: the second one gets a 429
+        first = await embedder.embed_query(TEXTS[0])
+        start = time.monotonic()
+        second = await embedder.embed_query(TEXTS[1])
+        return [first, second], time.monotonic() - start, await stats()
+
+    vectors, elapsed, counters = asyncio.run(run())
+
+    assert all(len(vector) == 8 for vector in vectors)
+    # Retry-After is honoured over the much shorter backoff: one 429, then success
+    assert counters["rate_limited"] == 1
+    assert embedder.retries == 1
+    assert elapsed >= 0.1
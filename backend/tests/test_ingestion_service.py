@@ -0,0 +1,370 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import Select, Update, literal
+from sqlalchemy.orm.evaluator import _EvaluatorCompiler
+from sqlalchemy.sql import functions, operators, visitors
+
+from app.models.ingestion_job import IngestionJob
+from app.models.video import Video
+from app.services.ingestion_service import (
+    InMemoryJobQueue, IngestionStage, IngestionStageError, IngestionWorkerPool, JobStatus
+)
+from app.services.whisper_pool import TranscriptionBusyError
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeJobDatabase:
+    """
+    Rows in a dict, for the statements the worker pool issues: where clauses
+    and UPDATE values are evaluated in Python, with func.now() read from `now`.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.now = datetime.now(timezone.utc)
+
+    def session(self) -> "FakeJobSession":
+        return FakeJobSession(self)
+
+    def add(self, instance) -> None:
+        if instance.id is None:
+            instance.id = uuid.uuid4()
+        self.rows[(type(instance), instance.id)] = instance
+
+    def _value(self, entity, clause):
+        if (
+            getattr(clause, "operator", None) is operators.add
+            and isinstance(clause.left, functions.now)
+        ):
+            return self.now + clause.right.effective_value
+        clause = visitors.replacement_traverse(
+            clause, {}, lambda element: literal(self.now) if isinstance(element, functions.now) else None
+        )
+        return _EvaluatorCompiler(entity).process(clause)
+
+    def matching(self, entity, whereclause):
+        rows = [row for (cls, _), row in self.rows.items() if cls is entity]
+        if whereclause is None:
+            return rows
+        match = self._value(entity, whereclause)
+        return [row for row in rows if match(row)]
+
+
+class FakeJobSession:
+    def __init__(self, database: FakeJobDatabase):
+        self.database = database
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def add(self, instance) -> None:
+        self.database.add(instance)
+
+    async def get(self, entity, primary_key):
+        return self.database.rows.get((entity, primary_key))
+
+    async def execute(self, statement):
+        if isinstance(statement, Update):
+            entity = statement.entity_description["entity"]
+            rows = self.database.matching(entity, statement.whereclause)
+            for row in rows:
+                values = {
+                    column.key: self.database._value(entity, value)
+                    for column, value in statement._values.items()
+                }
+                for key, value in values.items():
+                    setattr(row, key, value(row) if callable(value) else value)
+            return _Rows([row.id for row in rows])
+        assert isinstance(statement, Select)
+        entity = statement.column_descriptions[0]["entity"]
+        return _Rows(self.database.matching(entity, statement.whereclause))
+
+    async def commit(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+    async def refresh(self, instance) -> None:
+        pass
+
+
+class StageRecorder:
+    """Stub stages: record (stage, video) calls, raising the queued errors first."""
+
+    def __init__(self):
+        self.calls = []
+        self.errors = {stage: [] for stage in IngestionStage}
+
+    def handlers(self):
+        def handler(stage):
+            async def run(job, video, db):
+                self.calls.append((stage, video.id, job.attempts))
+                if self.errors[stage]:
+                    raise self.errors[stage].pop(0)
+                job.artifacts = {**(job.artifacts or {}), stage.value: True}
+            return run
+        return {stage: handler(stage) for stage in IngestionStage}
+
+
+@pytest.fixture
+def database():
+    return FakeJobDatabase()
+
+
+def make_pool(database, recorder, **kwargs):
+    options = {"max_attempts": 3, "retry_backoff": 0.01, "lease_seconds": 30}
+    options.update(kwargs)
+    return IngestionWorkerPool(
+        InMemoryJobQueue(),
+        stages=recorder.handlers(),
+        concurrency={stage: 2 for stage in IngestionStage},
+        session_factory=database.session,
+        **options,
+    )
+
+
+def add_video(database) -> Video:
+    video = Video(id=uuid.uuid4(), url="https://youtu.be/x", status="pending", chroma_collection_id="video_x")
+    database.add(video)
+    return video
+
+
+async def wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+def run_pool(pool, scenario):
+    async def main():
+        await pool.start(recover=False)
+        try:
+            return await scenario()
+        finally:
+            await pool.stop()
+    return asyncio.run(main())
+
+
+def test_job_runs_every_stage_in_order(database):
+    recorder = StageRecorder()
+    pool = make_pool(database, recorder)
+    video = add_video(database)
+
+    async def scenario():
+        job = await pool.submit(database.session(), video.id)
+        await wait_until(lambda: job.status == JobStatus.COMPLETED.value)
+        return job
+
+    job = run_pool(pool, scenario)
+
+    assert [stage for stage, _, _ in recorder.calls] == list(IngestionStage)
+    assert job.stage == IngestionStage.INDEX.value
+    assert job.artifacts == {"download": True, "transcribe": True, "index": True}
+    assert video.status == "completed"
+
+
+def test_a_stage_runs_once_when_its_job_is_queued_twice(database):
+    recorder = StageRecorder()
+    pool = make_pool(database, recorder)
+    video = add_video(database)
+
+    async def scenario():
+        job = await pool.submit(database.session(), video.id)
+        # Duplicate delivery, or a second process picking up the same id
+        await pool.queue.put(IngestionStage.DOWNLOAD, job.id)
+        await wait_until(lambda: job.status == JobStatus.COMPLETED.value)
+        await asyncio.sleep(0.05)
+
+    run_pool(pool, scenario)
+
+    assert [stage for stage, _, _ in recorder.calls] == list(IngestionStage)
+
+
+def test_claim_is_exclusive(database):
+    recorder = StageRecorder()
+    pool, other = make_pool(database, recorder), make_pool(database, recorder)
+    video = add_video(database)
+    job = IngestionJob(video_id=video.id, stage="download", status="pending", attempts=0, artifacts={})
+    database.add(job)
+
+    async def scenario():
+        db = database.session()
+        return [
+            await pool._claim(db, IngestionStage.DOWNLOAD, job.id),
+            await other._claim(db, IngestionStage.DOWNLOAD, job.id),
+            # Not the job's current stage
+            await other._claim(db, IngestionStage.INDEX, job.id),
+        ]
+
+    assert asyncio.run(scenario()) == [True, False, False]
+    assert job.status == JobStatus.RUNNING.value
+    assert job.claimed_by == pool.worker_id
+    assert job.attempts == 1
+    assert job.lease_expires_at == database.now + timedelta(seconds=30)
+
+
+def test_failed_stage_is_retried_with_exponential_backoff(database, monkeypatch):
+    recorder = StageRecorder()
+    recorder.errors[IngestionStage.TRANSCRIBE] = [RuntimeError("réseau"), RuntimeError("réseau")]
+    pool = make_pool(database, recorder)
+    delays = []
+    schedule_retry = pool._schedule_retry
+    monkeypatch.setattr(
+        pool, "_schedule_retry", lambda stage, job_id, delay: (delays.append(delay), schedule_retry(stage, job_id, delay))
+    )
+    video = add_video(database)
+
+    async def scenario():
+        job = await pool.submit(database.session(), video.id)
+        await wait_until(lambda: job.status == JobStatus.COMPLETED.value)
+
+    run_pool(pool, scenario)
+
+    transcribe_attempts = [attempts for stage, _, attempts in recorder.calls if stage is IngestionStage.TRANSCRIBE]
+    assert transcribe_attempts == [1, 2, 3]
+    assert delays == [0.01, 0.02]
+    assert video.status == "completed"
+
+
+def test_job_fails_after_max_attempts(database):
+    recorder = StageRecorder()
+    recorder.errors[IngestionStage.DOWNLOAD] = [RuntimeError("réseau")] * 3
+    pool = make_pool(database, recorder)
+    video = add_video(database)
+
+    async def scenario():
+        job = await pool.submit(database.session(), video.id)
+        await wait_until(lambda: job.status == JobStatus.FAILED.value)
+        return job
+
+    job = run_pool(pool, scenario)
+
+    assert len(recorder.calls) == 3
+    assert job.error == "réseau"
+    assert video.status == "failed"
+
+
+def test_stage_error_is_not_retried(database):
+    recorder = StageRecorder()
+    recorder.errors[IngestionStage.DOWNLOAD] = [IngestionStageError("URL YouTube invalide")]
+    pool = make_pool(database, recorder)
+    video = add_video(database)
+
+    async def scenario():
+        job = await pool.submit(database.session(), video.id)
+        await wait_until(lambda: job.status == JobStatus.FAILED.value)
+
+    run_pool(pool, scenario)
+
+    assert len(recorder.calls) == 1
+    assert video.status == "failed"
+
+
+def test_busy_transcription_pool_does_not_use_up_attempts(database):
+    recorder = StageRecorder()
+    recorder.errors[IngestionStage.TRANSCRIBE] = [TranscriptionBusyError()] * 4
+    pool = make_pool(database, recorder, max_attempts=2)
+    video = add_video(database)
+
+    async def scenario():
+        job = await pool.submit(database.session(), video.id)
+        await wait_until(lambda: job.status in (JobStatus.COMPLETED.value, JobStatus.FAILED.value))
+
+    run_pool(pool, scenario)
+
+    transcribe_attempts = [attempts for stage, _, attempts in recorder.calls if stage is IngestionStage.TRANSCRIBE]
+    assert transcribe_attempts == [1] * 5
+    assert video.status == "completed"
+
+
+def test_job_of_a_deleted_video_is_failed_not_left_running(database):
+    recorder = StageRecorder()
+    pool = make_pool(database, recorder)
+    job = IngestionJob(video_id=uuid.uuid4(), stage="download", status="pending", attempts=0, artifacts={})
+    database.add(job)
+
+    asyncio.run(pool._run_stage(IngestionStage.DOWNLOAD, job.id))
+
+    assert recorder.calls == []
+    assert job.status == JobStatus.FAILED.value
+    assert job.claimed_by is None and job.lease_expires_at is None
+    assert job.id not in pool._running
+
+
+def test_recovery_takes_over_expired_leases_only(database):
+    recorder = StageRecorder()
+    pool = make_pool(database, recorder)
+    video = add_video(database)
+
+    def job(status, stage="index", lease=None):
+        row = IngestionJob(
+            video_id=video.id, stage=stage, status=status, attempts=2, artifacts={},
+            claimed_by="other:1:dead" if status == "running" else None, lease_expires_at=lease,
+        )
+        database.add(row)
+        return row
+
+    expired = job("running", lease=database.now - timedelta(seconds=1))
+    alive = job("running", lease=database.now + timedelta(seconds=20))
+    retrying = job("retrying")
+    done = job("completed")
+
+    async def scenario():
+        await pool._recover_jobs()
+        return [await pool.queue.get(IngestionStage.INDEX) for _ in range(pool.queue.qsize(IngestionStage.INDEX))]
+
+    queued = asyncio.run(scenario())
+
+    assert sorted(queued) == sorted([expired.id, retrying.id])
+    assert expired.status == JobStatus.PENDING.value and expired.attempts == 0 and expired.claimed_by is None
+    assert alive.status == JobStatus.RUNNING.value and alive.claimed_by == "other:1:dead"
+    assert done.status == JobStatus.COMPLETED.value
+
+
+def test_running_jobs_have_their_lease_renewed(database):
+    recorder = StageRecorder()
+    pool = make_pool(database, recorder, lease_seconds=0.03)
+    video = add_video(database)
+    job = IngestionJob(video_id=video.id, stage="index", status="pending", attempts=0, artifacts={})
+    database.add(job)
+    release = asyncio.Event()
+
+    async def slow_index(job, video, db):
+        await release.wait()
+
+    pool.stages[IngestionStage.INDEX] = slow_index
+
+    async def scenario():
+        await pool.queue.put(IngestionStage.INDEX, job.id)
+        await wait_until(lambda: job.status == JobStatus.RUNNING.value)
+        claimed_lease = job.lease_expires_at
+        database.now += timedelta(seconds=1)
+        await wait_until(lambda: job.lease_expires_at > claimed_lease)
+        release.set()
+        await wait_until(lambda: job.status == JobStatus.COMPLETED.value)
+        return job.lease_expires_at - database.now
+
+    remaining = run_pool(pool, scenario)
+
+    assert remaining == timedelta(seconds=0.03)
@@ -0,0 +1,117 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services.keyword_index import BM25Index, KeywordIndexCache, reciprocal_rank_fusion
+
+
+def test_rrf_scores_are_summed_reciprocal_ranks():
+    fused = dict(reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60))
+
+    assert fused["a"] == pytest.approx(1 / 61 + 1 / 62)
+    assert fused["b"] == pytest.approx(1 / 62)
+    assert fused["c"] == pytest.approx(1 / 63 + 1 / 61)
+
+
+def test_rrf_orders_by_fused_score():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    assert [item for item, _ in fused] == ["a", "c", "b"]
+
+
+def test_rrf_weights_scale_each_ranking():
+    vector, keyword = ["v1", "shared"], ["k1", "shared"]
+
+    unweighted = [item for item, _ in reciprocal_rank_fusion([vector, keyword], k=1)]
+    keyword_heavy = [item for item, _ in reciprocal_rank_fusion([vector, keyword], k=1, weights=[1.0, 3.0])]
+
+    assert unweighted[0] == "shared"
+    assert keyword_heavy[0] == "k1"
+
+
+def test_rrf_of_nothing_is_empty():
+    assert reciprocal_rank_fusion([[], []]) == []
+
+
+def index_of(*texts: str) -> BM25Index:
+    return BM25Index.build([f"c{i}" for i in range(len(texts))], list(texts))
+
+
+def test_background_build_is_cached_under_its_version():
+    cache = KeywordIndexCache(8)
+    video_id, index = uuid.uuid4(), index_of("découpage en segments")
+
+    async def run():
+        cache.build_in_background(video_id, "v1", lambda: asyncio.sleep(0.01, result=index))
+        # A second question while it runs does not start another build
+        cache.build_in_background(video_id, "v1", lambda: pytest.fail("built twice"))
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+
+    assert cache.get(video_id, "v1") is index
+    assert cache.get(video_id, "v2") is None
+
+
+def test_failed_build_is_not_retried_before_the_cooldown():
+    cache = KeywordIndexCache(8, failure_cooldown=0.2)
+    video_id, attempts = uuid.uuid4(), []
+
+    async def failing_build():
+        attempts.append(1)
+        raise RuntimeError("base indisponible")
+
+    async def run():
+        cache.build_in_background(video_id, "v1", failing_build)
+        await asyncio.sleep(0.01)
+        cache.build_in_background(video_id, "v1", failing_build)
+        await asyncio.sleep(0.01)
+        within_cooldown = len(attempts)
+        await asyncio.sleep(0.2)
+        cache.build_in_background(video_id, "v1", failing_build)
+        await asyncio.sleep(0.01)
+        return within_cooldown
+
+    assert asyncio.run(run()) == 1
+    assert len(attempts) == 2
+
+
+def test_build_finishing_after_an_invalidation_is_not_cached():
+    cache = KeywordIndexCache(8)
+    video_id = uuid.uuid4()
+    release = None
+
+    async def slow_build():
+        await release.wait()
+        return index_of("ancien texte")
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        cache.build_in_background(video_id, "v1", slow_build)
+        await asyncio.sleep(0)
+        # The video is re-indexed while the old chunks are still being read
+        cache.invalidate(video_id)
+        release.set()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+    assert cache.get(video_id, "v1") is None
+
+
+def test_build_returning_none_is_not_cached():
+    cache = KeywordIndexCache(8)
+    video_id = uuid.uuid4()
+
+    async def run():
+        cache.build_in_background(video_id, "v1", lambda: asyncio.sleep(0, result=None))
+        await asyncio.sleep(0.01)
+        # Not a failure: the next question may build again
+        cache.build_in_background(video_id, "v1", lambda: asyncio.sleep(0, result=index_of("texte")))
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+    assert cache.get(video_id, "v1") is not None
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from app.services.long_audio import split_windows, stitch_segments
+from app.services.whisper_pool import SAMPLE_RATE
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def test_windows_cover_the_audio_with_the_requested_overlap():
+    audio = tone(95)
+
+    windows = split_windows(audio, window_seconds=30, overlap_seconds=2)
+
+    assert [w.index for w in windows] == list(range(len(windows)))
+    assert windows[0].offset == 0
+    assert windows[-1].end == pytest.approx(95)
+    for previous, following in zip(windows, windows[1:]):
+        assert previous.end - following.offset == pytest.approx(2)
+    # Every sample comes from the source at the window's offset
+    for window in windows:
+        start = int(round(window.offset * SAMPLE_RATE))
+        assert np.array_equal(window.samples, audio[start:start + len(window.samples)])
+
+
+def test_short_audio_is_a_single_window():
+    windows = split_windows(tone(10), window_seconds=30, overlap_seconds=2)
+
+    assert len(windows) == 1
+    assert windows[0].end == pytest.approx(10)
+
+
+def test_silence_search_moves_the_cut_into_the_silence():
+    audio = tone(60)
+    silence_at = 27.0
+    audio[int(silence_at * SAMPLE_RATE):int((silence_at + 0.3) * SAMPLE_RATE)] = 0
+
+    windows = split_windows(audio, window_seconds=30, overlap_seconds=1, silence_search_seconds=5)
+
+    assert silence_at <= windows[0].end <= silence_at + 0.3
+    assert windows[1].offset == pytest.approx(windows[0].end - 1)
+
+
+def segment(start: float, text: str):
+    return {"start": start, "end": start + 1.0, "text": text}
+
+
+def test_stitch_keeps_each_overlap_segment_once_split_at_the_midpoint():
+    # Windows [0, 32) and [30, 60): overlap 30-32, midpoint 31
+    spans = [(0.0, 32.0), (30.0, 60.0)]
+    first = [segment(0, "début"), segment(29.0, "avant"), segment(30.5, "chevauchement"), segment(31.5, "tardif")]
+    second = [segment(30.5, "chevauchement bis"), segment(31.5, "tardif"), segment(40, "suite")]
+
+    merged = stitch_segments(spans, [first, second])
+
+    assert [s["text"] for s in merged] == ["début", "avant", "chevauchement", "tardif", "suite"]
+
+
+def test_stitch_drops_a_repeated_segment_across_the_cut():
+    spans = [(0.0, 32.0), (30.0, 60.0)]
+    first = [segment(30.8, "Bonjour à tous.")]
+    second = [segment(31.1, "bonjour à tous"), segment(35, "Suite.")]
+
+    merged = stitch_segments(spans, [first, second])
+
+    assert [s["text"] for s in merged] == ["Bonjour à tous.", "Suite."]
@@ -0,0 +1,29 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip_keeps_microseconds_and_timezone():
+    created_at = datetime(2025, 6, 1, 12, 30, 15, 123456, tzinfo=timezone(timedelta(hours=2)))
+    row_id = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, row_id)
+
+    assert decode_cursor(cursor) == (created_at, row_id)
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor!",
+    encode_cursor(datetime.now(timezone.utc), uuid.uuid4())[:-6],
+    # Valid base64, wrong content
+    "bm8tc2VwYXJhdG9y",  # "no-separator"
+    "MjAyNS0wNi0wMXxub3QtYS11dWlk",  # "2025-06-01|not-a-uuid"
+])
+def test_invalid_cursor_raises(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
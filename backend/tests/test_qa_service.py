@@ -0,0 +1,67 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.video import Video
+from app.services import qa_service
+from app.services.keyword_index import KeywordIndexCache
+from app.services.qa_service import QAService
+from fakes import FakeCollection, FakeSession
+
+UPDATED_AT = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    video = Video(
+        id=uuid.uuid4(), url="https://youtu.be/x", status="completed", chroma_collection_id="video_x",
+        updated_at=UPDATED_AT,
+    )
+    background_db = FakeSession({Video: video})
+    resources = SimpleNamespace(
+        embeddings=None, llm=None, vector_store=None, answer_cache=None, retriever=None, context_builder=None,
+        keyword_indexes=KeywordIndexCache(8), session_memory=None, conversation=None, tracer=None,
+        session_factory=lambda: background_db,
+    )
+    collection = FakeCollection()
+    asyncio.run(collection.upsert(
+        ids=["a", "b"], documents=["découpage en segments", "horodatages"], embeddings=[[0.0], [1.0]],
+        metadatas=[{}, {}],
+    ))
+    stored = []
+
+    async def store_missing(db, video_id, index):
+        stored.append((db, video_id))
+        return store_missing.result
+
+    store_missing.result = True
+    monkeypatch.setattr(qa_service, "store_missing_keyword_index", store_missing)
+    return QAService(FakeSession(), resources), video, collection, background_db, stored, store_missing
+
+
+def test_missing_keyword_index_is_built_with_the_injected_session(setup):
+    service, video, collection, background_db, stored, _ = setup
+
+    index = asyncio.run(service._build_keyword_index(video.id, UPDATED_AT, collection))
+
+    assert len(index) == 2
+    assert stored == [(background_db, video.id)]
+
+
+def test_keyword_index_of_a_video_changed_during_the_build_is_discarded(setup):
+    service, video, collection, _, stored, _ = setup
+    video.updated_at = UPDATED_AT + timedelta(minutes=1)
+
+    assert asyncio.run(service._build_keyword_index(video.id, UPDATED_AT, collection)) is None
+    assert stored == []
+
+
+def test_keyword_index_stored_by_a_reindex_meanwhile_is_kept(setup):
+    service, video, collection, _, stored, store_missing = setup
+    store_missing.result = False
+
+    assert asyncio.run(service._build_keyword_index(video.id, UPDATED_AT, collection)) is None
+    assert len(stored) == 1
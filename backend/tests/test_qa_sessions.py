@@ -0,0 +1,189 @@
+import asyncio
+import re
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from app.models.qa_history import QAHistory
+from app.models.qa_session import QASession
+from app.models.video import Video
+from app.services.qa_service import QAService
+from app.services.qa_sessions import ConversationMemory, SessionMemory, SessionMemoryCache, Turn
+from fakes import FakeSession
+
+
+class WordCounter:
+    """One token per word."""
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        return "".join(re.findall(r"\S+\s*", text)[:max_tokens]).rstrip()
+
+
+class SummaryModel:
+    """Stands in for the chat model: records the prompts, answers with the next summary."""
+
+    def __init__(self, *summaries: str):
+        self.summaries = list(summaries)
+        self.prompts = []
+
+    def runnable(self):
+        def answer(prompt):
+            self.prompts.append(prompt.to_string())
+            summary = self.summaries.pop(0)
+            if isinstance(summary, Exception):
+                raise summary
+            return summary
+        return RunnableLambda(answer)
+
+
+def turns(first: int, last: int):
+    return [Turn(f"Question {i} ?", f"Réponse {i}.") for i in range(first, last)]
+
+
+def memory_with(n_turns: int, summary=None) -> SessionMemory:
+    return SessionMemory(
+        session_id=uuid.uuid4(), video_id=uuid.uuid4(), summary=summary, turn_count=n_turns, turns=turns(0, n_turns)
+    )
+
+
+def conversation(model: SummaryModel, **options) -> ConversationMemory:
+    return ConversationMemory(model.runnable(), WordCounter(), **{"window_turns": 2, **options})
+
+
+def test_nothing_is_folded_while_the_turns_fit_in_the_window():
+    model = SummaryModel()
+    memory = memory_with(2)
+
+    assert asyncio.run(conversation(model).compact(memory)) is False
+    assert model.prompts == [] and len(memory.turns) == 2 and memory.summarized_turns == 0
+
+
+def test_turns_leaving_the_window_are_folded_into_the_summary():
+    model = SummaryModel("La vidéo présente les questions 0 à 2.")
+    memory = memory_with(5)
+
+    assert asyncio.run(conversation(model).compact(memory)) is True
+
+    assert memory.summary == "La vidéo présente les questions 0 à 2."
+    assert memory.summarized_turns == 3
+    assert [turn.question for turn in memory.turns] == ["Question 3 ?", "Question 4 ?"]
+    assert memory.version == (5, 3)
+    prompt = model.prompts[0]
+    assert "Résumé existant:\n(aucun)" in prompt
+    assert all(f"Utilisateur: Question {i} ?\nAssistant: Réponse {i}." in prompt for i in range(3))
+    assert "Question 3 ?" not in prompt
+
+
+def test_the_summary_rolls_over_the_previous_one_and_stays_bounded():
+    model = SummaryModel("Résumé un.", " ".join(["long"] * 50))
+    memory_store = conversation(model, summary_max_tokens=10)
+    memory = memory_with(3)
+    asyncio.run(memory_store.compact(memory))
+
+    memory.turns += turns(3, 5)
+    memory.turn_count = 5
+    asyncio.run(memory_store.compact(memory))
+
+    assert "Résumé existant:\nRésumé un." in model.prompts[1]
+    folded = [i for i in range(5) if f"Question {i} ?" in model.prompts[1]]
+    assert folded == [1, 2]
+    assert memory.summary == " ".join(["long"] * 10)
+    assert memory.summarized_turns == 3
+
+
+def test_render_sends_the_summary_and_the_last_turns_truncated():
+    memory_store = conversation(SummaryModel(), turn_max_tokens=6)
+    memory = memory_with(3, summary="Résumé.")
+    memory.turns[-1] = Turn("Une question très longue sur la vidéo ?", "Réponse.")
+
+    rendered = memory_store.render(memory)
+
+    assert rendered == (
+        "Résumé des échanges précédents: Résumé.\n\n"
+        "Utilisateur: Question 1 ?\nAssistant: Réponse\n\n"
+        "Utilisateur: Une question très longue sur"
+    )
+
+
+def test_memory_cache_serves_only_the_current_version_of_a_session():
+    cache = SessionMemoryCache(max_sessions=2)
+    first, second, third = memory_with(1), memory_with(1), memory_with(1)
+    for memory in (first, second):
+        cache.put(memory)
+
+    assert cache.get(first.session_id, (2, 0)) is None
+    assert cache.get(first.session_id, (1, 0)) is first
+    # The lookup made `second` the least recently used
+    cache.put(third)
+    assert cache.get(second.session_id, (1, 0)) is None
+    assert cache.get(third.session_id, (1, 0)) is third
+
+
+@pytest.fixture
+def session_service():
+    video = Video(id=uuid.uuid4(), url="https://youtu.be/x", status="completed", chroma_collection_id="video_x")
+    row = QASession(id=uuid.uuid4(), video_id=video.id, summary="Résumé.", turn_count=5, summarized_turns=3)
+    history = [
+        QAHistory(video_id=video.id, session_id=row.id, question=turn.question, answer=turn.answer)
+        for turn in reversed(turns(3, 5))
+    ]
+    db = FakeSession({QASession: row, QAHistory: history})
+
+    def make(*summaries):
+        model = SummaryModel(*summaries)
+        resources = SimpleNamespace(
+            embeddings=None, llm=None, vector_store=None, answer_cache=None, retriever=None, context_builder=None,
+            keyword_indexes=None, session_memory=SessionMemoryCache(8), conversation=conversation(model),
+            tracer=None, session_factory=None,
+        )
+        return QAService(db, resources), model
+
+    return make, video, row, db
+
+
+def test_session_memory_is_loaded_with_the_pending_turns_then_cached(session_service):
+    make, video, row, db = session_service
+    service, _ = make()
+
+    memory = asyncio.run(service._session_memory(row.id, video))
+    statements = len(db.statements)
+
+    assert memory.summary == "Résumé." and memory.version == (5, 3)
+    assert [turn.question for turn in memory.turns] == ["Question 3 ?", "Question 4 ?"]
+    assert asyncio.run(service._session_memory(row.id, video)) is memory
+    assert len(db.statements) == statements
+
+
+def test_compacted_summary_is_saved(session_service):
+    make, video, row, db = session_service
+    service, _ = make("Nouveau résumé.")
+    memory = asyncio.run(service._session_memory(row.id, video))
+    memory.turns.append(Turn("Question 5 ?", "Réponse 5."))
+    memory.turn_count = 6
+
+    asyncio.run(service._compact_session(memory))
+
+    assert db.commits == 1
+    saved = db.statements[-1].compile().params
+    assert saved["summary"] == "Nouveau résumé." and saved["summarized_turns"] == 4
+    assert service.sessions.get(row.id, (6, 4)) is memory
+
+
+def test_a_failed_summary_keeps_the_turns_pending(session_service):
+    make, video, row, db = session_service
+    service, _ = make(RuntimeError("quota"))
+    memory = asyncio.run(service._session_memory(row.id, video))
+    memory.turns.append(Turn("Question 5 ?", "Réponse 5."))
+    memory.turn_count = 6
+
+    asyncio.run(service._compact_session(memory))
+
+    assert (db.commits, db.rollbacks) == (0, 1)
+    assert memory.summary == "Résumé." and len(memory.turns) == 3
+    # Reloaded from the database by the next turn
+    assert service.sessions.get(row.id, (6, 3)) is None
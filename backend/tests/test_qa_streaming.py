@@ -0,0 +1,199 @@
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+
+from app.api.deps import get_resources
+from app.api.v1.endpoints import qa
+from app.db.base import get_db
+from app.models.qa_history import QAHistory
+from app.models.video import Video
+from app.schemas.qa import QuestionCreate
+from app.services.answer_cache import AnswerCache
+from app.services.context_builder import ContextBuilder
+from app.services.keyword_index import KeywordIndexCache
+from app.services.qa_service import QAService
+from app.services.retriever import Retriever
+from app.services.tokens import TokenCounter
+from app.services.vector_store import EMBEDDING_MODEL_KEY
+from fakes import FakeEmbeddings, FakeSession, FakeStreamingChatModel, FakeVectorStore
+
+ANSWER = "La vidéo explique le découpage en segments [Segment 1]."
+CHUNKS = {
+    "c1": "Le découpage en segments suit les phrases de la transcription.",
+    "c2": "Chaque segment garde ses horodatages.",
+    "c3": "Une conclusion sans rapport.",
+}
+
+
+@pytest.fixture
+def setup():
+    video = Video(id=uuid.uuid4(), url="https://youtu.be/x", status="completed", chroma_collection_id="video_qa")
+    embeddings = FakeEmbeddings()
+    vector_store = FakeVectorStore()
+    resources = SimpleNamespace(
+        embeddings=embeddings,
+        llm=FakeStreamingChatModel(answer=ANSWER, delay=0.01),
+        vector_store=vector_store,
+        answer_cache=AnswerCache(0.95, 100),
+        retriever=Retriever("vector", top_k=2),
+        context_builder=ContextBuilder(2000, TokenCounter("gpt-4o-mini")),
+        keyword_indexes=KeywordIndexCache(8),
+        session_memory=None,
+        conversation=None,
+        tracer=None,
+        session_factory=None,
+    )
+
+    async def index():
+        collection = await vector_store.create_collection(
+            video.chroma_collection_id, {EMBEDDING_MODEL_KEY: embeddings.model_name}
+        )
+        await collection.upsert(
+            ids=list(CHUNKS),
+            documents=list(CHUNKS.values()),
+            embeddings=[embeddings.vector(text) for text in CHUNKS.values()],
+            metadatas=[{"chunk_index": i} for i in range(len(CHUNKS))],
+        )
+
+    asyncio.run(index())
+    return video, resources, FakeSession({Video: video})
+
+
+def saved_history(db):
+    return [row for row in db.added if isinstance(row, QAHistory)]
+
+
+def test_stream_answer_yields_tokens_then_done(setup):
+    video, resources, db = setup
+    service = QAService(db, resources)
+
+    async def consume():
+        prepared = await service.prepare_question(QuestionCreate(video_id=video.id, question="Comment ?"))
+        return prepared, [event async for event in service.stream_answer(prepared)]
+
+    prepared, events = asyncio.run(consume())
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == "done" and set(kinds[:-1]) == {"token"} and len(kinds) > 2
+    assert "".join(token for kind, token in events if kind == "token") == ANSWER
+    history = events[-1][1]
+    assert history.answer == ANSWER
+    assert history.context_refs == prepared.context_refs
+    assert [chunk_id for chunk_id, _ in history.context_refs["chunks"]]
+    assert saved_history(db) == [history]
+    assert resources.answer_cache.lookup_exact(video.id, video.updated_at, "Comment ?").answer == ANSWER
+
+
+def test_stream_answer_saves_nothing_when_the_consumer_stops_early(setup):
+    video, resources, db = setup
+    service = QAService(db, resources)
+
+    async def consume_one():
+        prepared = await service.prepare_question(QuestionCreate(video_id=video.id, question="Comment ?"))
+        stream = service.stream_answer(prepared)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(consume_one())[0] == "token"
+    assert saved_history(db) == []
+    assert resources.answer_cache.lookup_exact(video.id, video.updated_at, "Comment ?") is None
+
+
+def make_app(resources, db) -> FastAPI:
+    app = FastAPI()
+    app.include_router(qa.router, prefix="/qa")
+
+    async def override_db():
+        return db
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_resources] = lambda: resources
+    return app
+
+
+async def post_stream(app, body: dict, disconnect_after_tokens=None):
+    """
+    POST /qa/ask/stream through the ASGI interface: (status, SSE events sent).
+    The client disconnects after `disconnect_after_tokens` token events.
+    """
+    response = {"status": None, "events": []}
+    tokens_seen = asyncio.Event()
+    request = [{"type": "http.request", "body": json.dumps(body, default=str).encode(), "more_body": False}]
+
+    async def receive():
+        if request:
+            return request.pop(0)
+        if disconnect_after_tokens is None:
+            await asyncio.Event().wait()
+        await tokens_seen.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message.get("body") and response["status"] == 200:
+            event, data = message["body"].decode().strip().split("\n")
+            response["events"].append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+            tokens = sum(1 for kind, _ in response["events"] if kind == "token")
+            if disconnect_after_tokens is not None and tokens >= disconnect_after_tokens:
+                tokens_seen.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/qa/ask/stream", "raw_path": b"/qa/ask/stream", "root_path": "",
+        "query_string": b"", "headers": [(b"content-type", b"application/json")],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return response["status"], response["events"]
+
+
+def test_stream_endpoint_sends_token_events_then_done_with_sources(setup):
+    video, resources, db = setup
+
+    status, events = asyncio.run(post_stream(make_app(resources, db), {"video_id": video.id, "question": "Comment ?"}))
+
+    assert status == 200
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == "done" and set(kinds[:-1]) == {"token"}
+    assert "".join(data["content"] for kind, data in events if kind == "token") == ANSWER
+    done = events[-1][1]
+    assert done["answer"] == ANSWER
+    assert done["video_id"] == str(video.id)
+    assert done["context_refs"]["mode"] == "vector"
+    assert {chunk_id for chunk_id, _ in done["context_refs"]["chunks"]} <= set(CHUNKS)
+    assert len(saved_history(db)) == 1
+
+
+def test_stream_endpoint_saves_nothing_when_the_client_disconnects(setup):
+    video, resources, db = setup
+
+    async def run():
+        _, events = await post_stream(
+            make_app(resources, db), {"video_id": video.id, "question": "Comment ?"}, disconnect_after_tokens=2
+        )
+        # Give a detached generation the time to finish, if it were still running
+        await asyncio.sleep(0.2)
+        return events
+
+    events = asyncio.run(run())
+
+    kinds = [kind for kind, _ in events]
+    assert kinds.count("token") >= 2 and "done" not in kinds
+    assert saved_history(db) == []
+    assert resources.answer_cache.lookup_exact(video.id, video.updated_at, "Comment ?") is None
+
+
+def test_stream_endpoint_unknown_video_is_404(setup):
+    _, resources, db = setup
+    db.rows.clear()
+
+    status, events = asyncio.run(post_stream(make_app(resources, db), {"video_id": uuid.uuid4(), "question": "?"}))
+
+    assert status == 404
+    assert events == []
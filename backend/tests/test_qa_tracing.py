@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import uuid
+
+import pytest
+
+from app.services import qa_tracing
+from app.services.qa_tracing import JsonlTraceSink, QATracer
+
+VIDEO = uuid.uuid4()
+
+
+class MemorySink:
+    path = "memory"
+
+    def __init__(self):
+        self.batches = []
+
+    def write(self, records):
+        self.batches.append(records)
+
+
+def traces(tracer, n):
+    return [tracer.new_trace(VIDEO, f"Question {i} ?") for i in range(n)]
+
+
+@pytest.mark.parametrize("rate, sampled", [(0.0, 0), (1.0, 10)])
+def test_sampling_off_and_full(rate, sampled):
+    tracer = QATracer(MemorySink(), sample_rate=rate)
+
+    assert sum(trace.sampled for trace in traces(tracer, 10)) == sampled
+
+
+def test_a_question_is_sampled_when_the_draw_falls_under_the_rate(monkeypatch):
+    draws = iter([0.05, 0.25, 0.24, 0.9])
+    monkeypatch.setattr(qa_tracing.random, "random", lambda: next(draws))
+    tracer = QATracer(MemorySink(), sample_rate=0.25)
+
+    assert [trace.sampled for trace in traces(tracer, 4)] == [True, False, True, False]
+
+
+def test_only_sampled_traces_are_queued_and_a_full_queue_drops():
+    tracer = QATracer(MemorySink(), sample_rate=1.0, queue_size=2)
+    unsampled = QATracer(MemorySink(), sample_rate=0.0).new_trace(VIDEO, "?")
+
+    async def run():
+        tracer.record(unsampled)
+        for trace in traces(tracer, 3):
+            tracer.record(trace)
+        return tracer._queue.qsize()
+
+    assert asyncio.run(run()) == 2
+    assert tracer.dropped == 1
+    assert unsampled.total_ms is None
+
+
+def test_writer_sends_batches_and_stop_flushes_the_rest():
+    sink = MemorySink()
+    tracer = QATracer(sink, sample_rate=1.0, batch_size=2, flush_interval=0.05)
+
+    async def run():
+        tracer.start()
+        for trace in traces(tracer, 3):
+            trace.add("retrieval", 0.012)
+            tracer.record(trace)
+        await asyncio.sleep(0.2)
+        late = tracer.new_trace(VIDEO, "Dernière ?")
+        tracer.record(late)
+        await tracer.stop()
+
+    asyncio.run(run())
+
+    assert [len(batch) for batch in sink.batches[:2]] == [2, 1]
+    questions = [record["question"] for batch in sink.batches for record in batch]
+    assert questions == ["Question 0 ?", "Question 1 ?", "Question 2 ?", "Dernière ?"]
+    record = sink.batches[0][0]
+    assert record["video_id"] == str(VIDEO) and record["stages_ms"] == {"retrieval": 12.0}
+    assert record["total_ms"] is not None
+
+
+def test_record_lists_the_context_chunks_and_scores():
+    trace = QATracer(MemorySink(), sample_rate=1.0).new_trace(VIDEO, "Comment ?")
+    trace.query = "Comment ?"
+    trace.context_refs = {"mode": "hybrid", "chunks": [["c1", 0.03], ["c2", 0.016]]}
+
+    record = trace.to_record()
+
+    assert record["retrieval_mode"] == "hybrid"
+    assert record["chunk_ids"] == ["c1", "c2"] and record["scores"] == [0.03, 0.016]
+    # Only reported when the question was rewritten
+    assert record["query"] is None
+
+
+def test_sink_rotates_and_keeps_a_bounded_number_of_files(tmp_path):
+    sink = JsonlTraceSink(str(tmp_path), max_bytes=200, backups=2)
+    record = {"question": "x" * 80}
+
+    for _ in range(10):
+        sink.write([record])
+
+    files = sorted(os.listdir(tmp_path))
+    assert files == ["qa_traces.jsonl", "qa_traces.jsonl.1", "qa_traces.jsonl.2"]
+    assert all(os.path.getsize(tmp_path / name) <= 200 for name in files)
+    with open(sink.path, encoding="utf-8") as f:
+        assert json.loads(f.readline()) == record
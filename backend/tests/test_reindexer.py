@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from app.services import reindexer
+from app.services.chunking import Chunk
+from app.services.reindexer import chunk_ids, reindex_collection
+from fakes import FakeCollection, FakeEmbeddings
+
+BASE = {"video_id": "v1"}
+
+
+def chunks(*texts):
+    return [Chunk(text, i, start=float(10 * i), end=float(10 * i + 10)) for i, text in enumerate(texts)]
+
+
+def index(collection, embeddings, texts):
+    return asyncio.run(reindex_collection(collection, chunks(*texts), embeddings, BASE))
+
+
+@pytest.fixture
+def indexed():
+    collection, embeddings = FakeCollection(), FakeEmbeddings()
+    index(collection, embeddings, ["Intro.", "Partie un.", "Partie deux.", "Conclusion."])
+    embeddings.embedded.clear()
+    return collection, embeddings
+
+
+def test_ids_are_content_addressed_and_stable_under_insertion():
+    before = chunk_ids(chunks("a", "b", "a"))
+    after = chunk_ids(chunks("nouveau", "a", "b", "a"))
+
+    assert len(set(before)) == 3
+    assert before[2].startswith(before[0]) and before[2].endswith("-1")
+    assert after[1:] == before
+
+
+def test_first_index_embeds_every_chunk():
+    collection, embeddings = FakeCollection(), FakeEmbeddings()
+
+    report = index(collection, embeddings, ["Intro.", "Conclusion."])
+
+    assert report.as_dict() == {"added": 2, "updated": 0, "unchanged": 0, "deleted": 0, "embeddings_saved": 0}
+    assert embeddings.embedded == ["Intro.", "Conclusion."]
+    assert [item["metadata"] for item in collection.items.values()] == [
+        {"video_id": "v1", "chunk_index": 0, "start": 0.0, "end": 10.0},
+        {"video_id": "v1", "chunk_index": 1, "start": 10.0, "end": 20.0},
+    ]
+
+
+def test_same_chunks_change_nothing(indexed):
+    collection, embeddings = indexed
+
+    report = index(collection, embeddings, ["Intro.", "Partie un.", "Partie deux.", "Conclusion."])
+
+    assert not report.changed
+    assert report.unchanged == 4
+    assert embeddings.embedded == []
+
+
+def test_only_new_texts_are_embedded_and_moved_chunks_get_new_metadata(indexed):
+    collection, embeddings = indexed
+
+    report = index(collection, embeddings, ["Intro.", "Partie un corrigée.", "Ajout.", "Partie deux.", "Conclusion."])
+
+    assert embeddings.embedded == ["Partie un corrigée.", "Ajout."]
+    assert (report.added, report.updated, report.unchanged, report.deleted) == (2, 2, 1, 1)
+    assert report.embeddings_saved == 3
+    documents = {item["document"]: item["metadata"]["chunk_index"] for item in collection.items.values()}
+    assert documents == {"Intro.": 0, "Partie un corrigée.": 1, "Ajout.": 2, "Partie deux.": 3, "Conclusion.": 4}
+
+
+def test_failed_embedding_leaves_the_previous_version_whole(indexed):
+    collection, _ = indexed
+    previous = dict(collection.items)
+
+    class FailingEmbeddings:
+        async def embed_documents(self, texts, progress=None):
+            raise RuntimeError("quota")
+
+    with pytest.raises(RuntimeError):
+        index(collection, FailingEmbeddings(), ["Intro.", "Tout nouveau."])
+
+    assert collection.items == previous
+
+
+def test_existing_ids_are_listed_page_by_page(indexed, monkeypatch):
+    collection, embeddings = indexed
+    monkeypatch.setattr(reindexer, "_LIST_PAGE", 3)
+
+    report = index(collection, embeddings, ["Intro.", "Partie un.", "Partie deux."])
+
+    assert (report.unchanged, report.deleted) == (3, 1)
+    assert embeddings.embedded == []
@@ -0,0 +1,75 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.models.video import Video
+from app.services.search_service import SearchService
+from app.services.vector_store import EMBEDDING_MODEL_KEY, cosine_distance
+from fakes import FakeSession, FakeVectorStore
+
+
+def unit(*values) -> list:
+    vector = np.asarray(values, dtype=float)
+    return list(vector / np.linalg.norm(vector))
+
+
+QUERY = unit(1, 0, 0)
+
+
+class QueryEmbeddings:
+    model_name = "fake-embedding"
+
+    async def embed_query(self, text):
+        return QUERY
+
+
+def make_search(collections):
+    """One completed video per (space, {chunk id: embedding}), each in its own collection."""
+    vector_store = FakeVectorStore()
+    videos = []
+
+    async def index():
+        for i, (space, chunks) in enumerate(collections):
+            video = Video(id=uuid.uuid4(), title=f"Vidéo {i}", status="completed", chroma_collection_id=f"video_{i}")
+            videos.append(video)
+            metadata = {EMBEDDING_MODEL_KEY: "fake-embedding"}
+            if space is not None:
+                metadata["hnsw:space"] = space
+            collection = await vector_store.create_collection(video.chroma_collection_id, metadata)
+            await collection.upsert(
+                ids=list(chunks),
+                documents=list(chunks),
+                embeddings=list(chunks.values()),
+                metadatas=[{"start": float(j)} for j in range(len(chunks))],
+            )
+
+    asyncio.run(index())
+    resources = SimpleNamespace(embeddings=QueryEmbeddings(), vector_store=vector_store)
+    return SearchService(FakeSession({Video: videos}), resources), videos
+
+
+@pytest.mark.parametrize("space", ["l2", "cosine", "ip"])
+def test_distances_of_unit_vectors_are_on_the_cosine_scale_in_every_space(space):
+    a, b = np.asarray(unit(1, 2, 3)), np.asarray(unit(3, -1, 0.5))
+    raw = {"l2": float(np.sum((a - b) ** 2)), "cosine": float(1 - a @ b), "ip": float(1 - a @ b)}[space]
+
+    assert cosine_distance(space, raw) == pytest.approx(1 - a @ b)
+
+
+def test_hits_of_legacy_l2_and_cosine_collections_are_merged_on_one_scale():
+    # The legacy l2 collection (no hnsw:space) holds the closest chunk; its raw
+    # squared l2 distance (~0.084) is larger than the cosine one (~0.072) of a
+    # farther chunk, so raw distances would rank them the wrong way round
+    service, (legacy, rebuilt) = make_search([
+        (None, {"proche": unit(1, 0.3, 0)}),
+        ("cosine", {"loin": unit(1, 0.4, 0)}),
+    ])
+
+    response = asyncio.run(service.search("question", top_k=2))
+
+    assert [str(result.video_id) for result in response.results] == [str(legacy.id), str(rebuilt.id)]
+    for result, vector in zip(response.results, (unit(1, 0.3, 0), unit(1, 0.4, 0))):
+        assert result.best_distance == pytest.approx(1 - np.dot(QUERY, vector))
@@ -0,0 +1,88 @@
+import random
+import uuid
+
+import pytest
+
+from app.services import transcript_store
+from app.services.transcript_store import (
+    SEPARATOR, build_blocks, decode_segments, slice_blocks, transcript_text, untimed_segments
+)
+
+
+def timed_segments(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    segments, start = [], 0.0
+    for i in range(count):
+        words = " ".join(f"mot{i}_{j}" for j in range(rng.randint(1, 12)))
+        end = start + rng.uniform(0.5, 4.0)
+        segments.append({"start": start, "end": end, "text": words})
+        start = end
+    return segments
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(transcript_store, "BLOCK_MAX_CHARS", 200)
+
+
+def blocks_in_range(blocks, offset, limit):
+    """The blocks load_text_range selects in SQL, in block order."""
+    return [
+        (block.char_start, block.data)
+        for block in blocks
+        if block.char_start <= offset + limit and block.char_start + block.char_length >= offset
+    ]
+
+
+def test_block_offsets_address_the_full_text(small_blocks):
+    segments = timed_segments(120)
+    full = transcript_text(segments)
+
+    blocks = build_blocks(uuid.uuid4(), segments)
+
+    assert len(blocks) > 5
+    assert sum(block.segment_count for block in blocks) == len(segments)
+    for block in blocks:
+        text = transcript_text(decode_segments(block.data))
+        assert full[block.char_start:block.char_start + block.char_length] == text
+    for previous, following in zip(blocks, blocks[1:]):
+        assert following.char_start == previous.char_start + previous.char_length + len(SEPARATOR)
+    assert blocks[-1].char_start + blocks[-1].char_length == len(full)
+
+
+def test_block_time_bounds(small_blocks):
+    segments = timed_segments(60)
+
+    blocks = build_blocks(uuid.uuid4(), segments)
+
+    for block in blocks:
+        decoded = decode_segments(block.data)
+        assert block.start == decoded[0]["start"]
+        assert block.end == decoded[-1]["end"]
+
+
+def test_untimed_blocks_have_no_time_bounds(small_blocks):
+    blocks = build_blocks(uuid.uuid4(), untimed_segments("Une phrase. " * 100))
+
+    assert all(block.start is None and block.end is None for block in blocks)
+
+
+def test_text_ranges_match_the_full_text(small_blocks):
+    segments = timed_segments(80, seed=1)
+    full = transcript_text(segments)
+    blocks = build_blocks(uuid.uuid4(), segments)
+    rng = random.Random(2)
+    boundaries = [b.char_start for b in blocks] + [b.char_start + b.char_length for b in blocks]
+    offsets = boundaries + [b + 1 for b in boundaries] + [rng.randrange(len(full)) for _ in range(200)]
+
+    for offset in offsets:
+        if offset >= len(full):
+            continue
+        for limit in (1, 7, 199, 200, 201, 1000, len(full)):
+            rows = blocks_in_range(blocks, offset, limit)
+            assert slice_blocks(rows, offset, limit) == full[offset:offset + limit], (offset, limit)
+
+
+def test_empty_transcript():
+    assert build_blocks(uuid.uuid4(), []) == []
+    assert slice_blocks([], 0, 10) == ""
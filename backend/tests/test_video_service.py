@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.video import Video
+from app.schemas.video import VideoUpdate
+from app.services.chunking import SegmentChunker
+from app.services.keyword_index import KeywordIndexCache
+from app.services.video_service import VideoService
+from fakes import FakeEmbeddings, FakeIngestionPool, FakeSession, FakeVectorStore
+
+TRANSCRIPTION = " ".join(f"Phrase numéro {i} de la transcription, avec un peu de texte autour." for i in range(60))
+
+
+@pytest.fixture
+def service():
+    video = Video(
+        id=uuid.uuid4(), url="https://example.com/v", title="Titre", status="completed",
+        chroma_collection_id="video_test",
+    )
+    resources = SimpleNamespace(
+        vector_store=FakeVectorStore(),
+        embeddings=FakeEmbeddings(),
+        segment_chunker=SegmentChunker(chunk_size=300, chunk_overlap=0),
+        keyword_indexes=KeywordIndexCache(8),
+        answer_cache=None,
+    )
+    return VideoService(FakeSession({Video: video}), FakeIngestionPool(), resources), video
+
+
+def test_transcription_only_update_reembeds_only_the_changed_chunks(service):
+    video_service, video = service
+    embeddings = video_service.resources.embeddings
+    # The form is sent whole: same title and URL as stored
+    asyncio.run(video_service.update_video(
+        video.id, VideoUpdate(title=video.title, url=video.url, transcription=TRANSCRIPTION)
+    ))
+    collection = video_service.resources.vector_store.collections["video_test"]
+    indexed = len(collection.items)
+    embeddings.embedded.clear()
+
+    edited = TRANSCRIPTION.replace("Phrase numéro 30 ", "Phrase corrigée 30 ")
+    asyncio.run(video_service.update_video(
+        video.id, VideoUpdate(title=video.title, url=video.url, transcription=edited)
+    ))
+
+    assert indexed > 5
+    assert 1 <= len(embeddings.embedded) < indexed / 2
+    assert all("Phrase corrigée 30" in text for text in embeddings.embedded)
+    assert any("Phrase corrigée 30" in item["document"] for item in collection.items.values())
+    assert not any("Phrase numéro 30 " in item["document"] for item in collection.items.values())
+    assert video_service.ingestion_pool.submitted == []
+    assert video.status == "completed"
+
+
+def test_new_url_queues_ingestion(service):
+    video_service, video = service
+
+    asyncio.run(video_service.update_video(video.id, VideoUpdate(url="https://example.com/autre")))
+
+    assert video_service.ingestion_pool.submitted == [video.id]
+    assert video.status == "pending"
+    assert video_service.resources.embeddings.embedded == []
+
+
+def test_title_only_update_does_not_reindex(service):
+    video_service, video = service
+
+    asyncio.run(video_service.update_video(video.id, VideoUpdate(title="Nouveau titre")))
+
+    assert video.title == "Nouveau titre"
+    assert video.url == "https://example.com/v"
+    assert video_service.ingestion_pool.submitted == []
+    assert video_service.resources.embeddings.embedded == []
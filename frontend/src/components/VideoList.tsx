@@ -2,6 +2,7 @@ import React, { useState } from 'react';
 import VideoTranscription from './VideoTranscription';
 import AlertMessage from './AlertMessage';
 import { VideoQA } from './VideoQA';
+import { API_URL } from '../constants';
 
 interface Video {
   id: string;
@@ -9,7 +10,6 @@ interface Video {
   url: string;
   description: string;
   created_at: string;
-  transcription?: string;
   status: string;
 }
 
@@ -22,8 +22,38 @@ interface VideoListProps {
 const VideoList: React.FC<VideoListProps> = ({ videos, onEdit, onDelete }) => {
   const [expandedVideo, setExpandedVideo] = useState<string | null>(null);
   const [expandedChat, setExpandedChat] = useState<string | null>(null);
+  const [transcriptions, setTranscriptions] = useState<Record<string, string>>({});
+  const [transcriptionErrors, setTranscriptionErrors] = useState<Record<string, string>>({});
+
+  // The listing does not include transcriptions: they are fetched page by page when first shown
+  const fetchTranscription = async (videoId: string) => {
+    setTranscriptionErrors(({ [videoId]: _, ...others }) => others);
+    try {
+      let text = '';
+      let offset: number | null = 0;
+      while (offset !== null) {
+        const response = await fetch(`${API_URL}/videos/${videoId}/transcript?offset=${offset}`);
+        if (!response.ok) {
+          throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        const page = await response.json();
+        text += page.text;
+        offset = page.next_offset;
+      }
+      setTranscriptions((previous) => ({ ...previous, [videoId]: text }));
+    } catch (error) {
+      console.error('Erreur lors de la récupération de la transcription:', error);
+      setTranscriptionErrors((previous) => ({
+        ...previous,
+        [videoId]: 'Impossible de charger la transcription. Réessayez en la rouvrant.'
+      }));
+    }
+  };
 
   const toggleTranscription = (videoId: string) => {
+    if (expandedVideo !== videoId && transcriptions[videoId] === undefined) {
+      fetchTranscription(videoId);
+    }
     setExpandedVideo(expandedVideo === videoId ? null : videoId);
   };
 
@@ -116,12 +146,14 @@ const VideoList: React.FC<VideoListProps> = ({ videos, onEdit, onDelete }) => {
               </button>
             </div>
           </div>
-          {expandedVideo === video.id && (
+          {expandedVideo === video.id && (transcriptionErrors[video.id] ? (
+            <AlertMessage message={transcriptionErrors[video.id]} type="error" />
+          ) : (
             <VideoTranscription 
-              transcription={video.transcription || ''} 
-              isLoading={video.status === 'processing'}
+              transcription={transcriptions[video.id] || ''} 
+              isLoading={video.status === 'processing' || transcriptions[video.id] === undefined}
             />
-          )}
+          ))}
           {expandedChat === video.id && (
             <VideoQA 
               videoId={video.id}
@@ -12,17 +12,20 @@ interface Video {
 
 const VideosPage: React.FC = () => {
   const [videos, setVideos] = useState<Video[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isFormVisible, setIsFormVisible] = useState(false);
   const [editingVideo, setEditingVideo] = useState<Video | null>(null);
 
-  const fetchVideos = async () => {
+  const fetchVideos = async (cursor?: string) => {
     try {
-      const response = await fetch(`${API_URL}/videos`);
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`${API_URL}/videos${query}`);
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
       const data = await response.json();
-      setVideos(data);
+      setVideos(cursor ? (previous) => [...previous, ...data.items] : data.items);
+      setNextCursor(data.next_cursor);
     } catch (error) {
       console.error('Erreur lors de la récupération des vidéos:', error);
     }
@@ -115,6 +118,17 @@ const VideosPage: React.FC = () => {
         onEdit={handleEdit}
         onDelete={handleDelete}
       />
+
+      {nextCursor && (
+        <div className="mt-6 flex justify-center">
+          <button
+            onClick={() => fetchVideos(nextCursor)}
+            className="text-sm bg-gray-100 hover:bg-gray-200 text-gray-700 px-4 py-2 rounded"
+          >
+            Afficher plus de vidéos
+          </button>
+        </div>
+      )}
     </div>
   );
 };